@@ -0,0 +1,10 @@
+import os
+import sys
+
+# Os módulos usam imports absolutos a partir de src/ (core.*, gui.*)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "src"))
+
+from cli import main
+
+if __name__ == "__main__":
+    sys.exit(main())
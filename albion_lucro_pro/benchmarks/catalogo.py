@@ -0,0 +1,81 @@
+"""Compara memória e tempo de carga do catálogo: dict por item x Catalogo compacto
+
+Os dois formatos são gravados como snapshot (pickle) e recarregados, que é o
+caminho da abertura do aplicativo. A memória é a alocada pelo objeto
+recarregado (tracemalloc).
+
+Uso:
+    python benchmarks/catalogo.py                    # catálogo sintético
+    python benchmarks/catalogo.py --data-dir ./data  # banco local
+"""
+import argparse
+import gc
+import os
+import pickle
+import statistics
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+from core.catalogo import Catalogo  # noqa: E402
+from dados import TAMANHO_CATALOGO, itens_sinteticos  # noqa: E402
+
+
+def _medir(dados: bytes, rodadas: int):
+    """(mediana do tempo de carga, bytes alocados pelo objeto carregado)"""
+    tempos = []
+    for _ in range(rodadas):
+        gc.collect()
+        inicio = time.perf_counter()
+        pickle.loads(dados)
+        tempos.append(time.perf_counter() - inicio)
+
+    gc.collect()
+    tracemalloc.start()
+    objeto = pickle.loads(dados)
+    memoria = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del objeto
+    return statistics.median(tempos), memoria
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data-dir", help="Usa o albion.db local em vez do catálogo sintético")
+    parser.add_argument("--itens", type=int, default=TAMANHO_CATALOGO)
+    parser.add_argument("--rodadas", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    if args.data_dir:
+        from core.database import ItemDatabase
+        db = ItemDatabase(os.path.join(args.data_dir, "albion.db"),
+                          os.path.join(args.data_dir, "itens.json"),
+                          os.path.join(args.data_dir, "categorias.json"))
+        itens = db.load_items()
+        catalogo = db.load_catalogo()
+    else:
+        itens = itens_sinteticos(args.itens)
+        catalogo = Catalogo.de_dicts(itens)
+
+    formatos = {
+        "dict por item": pickle.dumps(itens, protocol=pickle.HIGHEST_PROTOCOL),
+        "Catalogo": pickle.dumps(catalogo, protocol=pickle.HIGHEST_PROTOCOL),
+    }
+
+    print(f"📦 {len(itens)} itens")
+    resultados = {}
+    for nome, dados in formatos.items():
+        tempo, memoria = _medir(dados, args.rodadas)
+        resultados[nome] = (tempo, memoria)
+        print(f"  {nome:<14} carga {tempo * 1000:7.1f} ms   memória {memoria / 2 ** 20:7.2f} MiB   "
+              f"snapshot {len(dados) / 2 ** 20:6.2f} MiB")
+
+    (t_dict, m_dict), (t_cat, m_cat) = resultados["dict por item"], resultados["Catalogo"]
+    print(f"  ganho: carga {t_dict / t_cat:.1f}x, memória {m_dict / m_cat:.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
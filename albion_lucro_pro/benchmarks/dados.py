@@ -0,0 +1,157 @@
+"""Dados sintéticos com o formato e o tamanho do catálogo real do Albion"""
+import json
+import random
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List
+
+CATEGORIAS = {
+    "weapon": ["sword", "axe", "mace", "hammer", "crossbow", "bow", "spear", "dagger",
+               "quarterstaff", "firestaff", "holystaff", "arcanestaff", "froststaff", "cursestaff"],
+    "armor": ["cloth_armor", "leather_armor", "plate_armor", "cloth_helmet", "leather_helmet",
+              "plate_helmet", "cloth_shoes", "leather_shoes", "plate_shoes"],
+    "resource": ["wood", "ore", "fiber", "hide", "rock", "planks", "metalbar", "cloth", "leather", "stoneblock"],
+    "consumable": ["potion", "cooked", "fish"],
+    "accessories": ["bag", "cape"],
+    "mount": ["horse", "ox", "armoredhorse"],
+    "offhand": ["shield", "torch", "book"],
+}
+PALAVRAS_PT = ["Espada", "Machado", "Maça", "Martelo", "Besta", "Arco", "Lança", "Adaga", "Bordão",
+               "Cajado", "Armadura", "Capuz", "Botas", "Bolsa", "Capa", "Poção", "Tábuas", "Barra"]
+QUALIFICADORES_PT = ["Longa", "Larga", "Pesada", "Leve", "do Mercenário", "do Caçador", "do Guardião",
+                     "Élfica", "Amaldiçoada", "Sagrada", "de Fogo", "de Gelo", "Arcana", "Grande"]
+PALAVRAS_EN = ["Sword", "Axe", "Mace", "Hammer", "Crossbow", "Bow", "Spear", "Dagger", "Staff",
+               "Armor", "Hood", "Boots", "Bag", "Cape", "Potion", "Planks", "Bar"]
+QUALIFICADORES_EN = ["Broad", "Heavy", "Light", "Mercenary", "Hunter", "Guardian", "Elven", "Cursed",
+                     "Holy", "Fire", "Frost", "Arcane", "Great", "Long"]
+TAMANHO_CATALOGO = 11_000  # Ordem de grandeza do dump oficial (itens com nome no mercado)
+
+
+def itens_sinteticos(n: int = TAMANHO_CATALOGO, semente: int = 42) -> Dict[str, dict]:
+    """Itens no formato de ItemDatabase.load_items(), com IDs T<tier>_<BASE>@<encantamento>"""
+    aleatorio = random.Random(semente)
+    atualizado = datetime(2026, 1, 1).isoformat()
+    itens = {}
+    base = 0
+    while len(itens) < n:
+        categoria = aleatorio.choice(list(CATEGORIAS))
+        subcategoria = aleatorio.choice(CATEGORIAS[categoria])
+        nome_pt = f"{aleatorio.choice(PALAVRAS_PT)} {aleatorio.choice(QUALIFICADORES_PT)} {base}"
+        nome_en = f"{aleatorio.choice(QUALIFICADORES_EN)} {aleatorio.choice(PALAVRAS_EN)} {base}"
+        for tier in range(4, 9):
+            for encantamento in range(0, 5):
+                item_id = f"T{tier}_{subcategoria.upper()}_{base}" + (f"@{encantamento}" if encantamento else "")
+                itens[item_id] = {
+                    "id": item_id,
+                    "nome": f"{nome_pt} (T{tier}.{encantamento})",
+                    "nome_en": f"{nome_en} (T{tier}.{encantamento})",
+                    "tier": f"T{tier}",
+                    "categoria": categoria,
+                    "subcategoria": subcategoria,
+                    "encantamento": encantamento,
+                    "qualidade": None,
+                    "img_url": f"https://render.albiononline.com/v1/item/{item_id}.png",
+                    "last_updated": atualizado,
+                }
+                if len(itens) >= n:
+                    return itens
+        base += 1
+    return itens
+
+
+# Categoria -> tipo do registro no items.json bruto
+TIPOS_BRUTOS = {"weapon": "weapon", "resource": "simpleitem", "consumable": "consumableitem",
+                "mount": "mount"}
+
+
+def dump_sintetico(n: int = TAMANHO_CATALOGO, semente: int = 42) -> List[dict]:
+    """Registros no formato do formatted/items.json do ao-bin-dumps (sem receitas)"""
+    return [
+        {
+            "UniqueName": item_id,
+            "LocalizedNames": {"PT-BR": dados["nome"], "EN-US": dados["nome_en"]},
+            "Tier": int(dados["tier"][1:]),
+            "ItemType": dados["categoria"],
+            "ItemGroup": dados["subcategoria"],
+            "EnchantmentLevel": dados["encantamento"],
+        }
+        for item_id, dados in itens_sinteticos(n, semente).items()
+    ]
+
+
+def _requisitos(aleatorio: random.Random, recursos: List[str], encantamento: int) -> dict:
+    """Um bloco craftingrequirements; recursos encantados levam @enchantmentlevel, como no bruto"""
+    requisito = {
+        "@silver": str(aleatorio.randint(0, 5000)),
+        "@time": "1",
+        "@craftingfocus": str(aleatorio.randint(100, 2000)),
+        "craftresource": [],
+    }
+    for recurso in aleatorio.sample(recursos, k=min(2, len(recursos))):
+        entrada = {"@uniquename": recurso, "@count": str(aleatorio.randint(4, 32))}
+        if encantamento:
+            entrada["@enchantmentlevel"] = str(encantamento)
+        requisito["craftresource"].append(entrada)
+    if aleatorio.random() < 0.1:
+        requisito["craftresource"].append(
+            {"@uniquename": f"{recurso.split('_', 1)[0]}_ARTEFACT_{aleatorio.randint(0, 99)}",
+             "@count": "1", "@maxreturnamount": "0"})
+    if len(requisito["craftresource"]) == 1:
+        requisito["craftresource"] = requisito["craftresource"][0]  # Objeto único, como no bruto
+    return requisito
+
+
+def dump_bruto_sintetico(n: int = TAMANHO_CATALOGO, semente: int = 42) -> dict:
+    """Receitas no formato do items.json bruto do ao-bin-dumps
+
+    Um registro por item base em items.<tipo> (lista, ou objeto único), com
+    atributos "@" e as variantes encantadas em enchantments.enchantment.
+    """
+    aleatorio = random.Random(semente)
+    itens = itens_sinteticos(n, semente)
+    recursos: Dict[str, List[str]] = {}
+    for item_id, dados in itens.items():
+        if dados["categoria"] == "resource" and not dados["encantamento"]:
+            recursos.setdefault(dados["tier"], []).append(item_id)
+
+    tipos: Dict[str, list] = {}
+    for item_id, dados in itens.items():
+        if dados["encantamento"]:
+            continue
+        registro = {"@uniquename": item_id, "@tier": dados["tier"][1:],
+                    "@shopcategory": dados["categoria"], "@shopsubcategory1": dados["subcategoria"]}
+        candidatos = recursos.get(dados["tier"])
+        if dados["categoria"] != "resource" and candidatos:
+            registro["craftingrequirements"] = _requisitos(aleatorio, candidatos, 0)
+            if aleatorio.random() < 0.05:  # Receitas alternativas viram lista
+                registro["craftingrequirements"] = [registro["craftingrequirements"],
+                                                    _requisitos(aleatorio, candidatos, 0)]
+            registro["enchantments"] = {"enchantment": [
+                {"@enchantmentlevel": str(nivel), "craftingrequirements": _requisitos(aleatorio, candidatos, nivel)}
+                for nivel in range(1, 5) if f"{item_id}@{nivel}" in itens
+            ]}
+        tipos.setdefault(TIPOS_BRUTOS.get(dados["categoria"], "equipmentitem"), []).append(registro)
+    return {"items": {
+        "@xmlns:xsi": "http://www.w3.org/2001/XMLSchema-instance",
+        "shopcategories": {"shopcategory": [{"@id": categoria} for categoria in CATEGORIAS]},
+        "hideoutitem": {"@uniquename": "UNIQUE_HIDEOUT", "@tier": "1"},
+        **tipos,
+    }}
+
+
+def _gravar(path: str, conteudo) -> Path:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(conteudo, f, ensure_ascii=False)
+    return path
+
+
+def gravar_dump(path: str, n: int = TAMANHO_CATALOGO, semente: int = 42) -> Path:
+    """Grava o dump formatado sintético (servido pelo stub em /formatted/items.json)"""
+    return _gravar(path, dump_sintetico(n, semente))
+
+
+def gravar_dump_bruto(path: str, n: int = TAMANHO_CATALOGO, semente: int = 42) -> Path:
+    """Grava o dump bruto sintético (servido pelo stub em /items.json)"""
+    return _gravar(path, dump_bruto_sintetico(n, semente))
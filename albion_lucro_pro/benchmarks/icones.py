@@ -0,0 +1,168 @@
+"""Verifica o IconService contra o render do stub local (sem rede)
+
+Checagens:
+    download       ícones baixados com paralelismo limitado e gravados no disco
+    disco          segunda instância lê do disco, sem requisições novas
+    ausente        404 vira None e o item não é pedido de novo
+    despejo        o cache em disco respeita max_bytes (URLs menos usadas saem primeiro)
+    cancelamento   solicitar() cancela pedidos que saíram da tela sem travar
+    miniatura      decodificação e redução (só com Pillow instalado)
+
+Sai com código 1 se alguma checagem falhar.
+
+Uso:
+    python benchmarks/icones.py
+"""
+import importlib.util
+import os
+import sys
+import tempfile
+import threading
+import time
+from typing import Callable, Dict, List
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+from stub_api import StubAlbionAPI  # noqa: E402
+
+PILLOW = importlib.util.find_spec("PIL") is not None
+TIMEOUT = 10.0
+
+
+def _com_timeout(fn: Callable, timeout: float = TIMEOUT):
+    """Roda fn numa thread; AssertionError se não voltar a tempo (trava)"""
+    resultado, erro = [], []
+
+    def alvo():
+        try:
+            resultado.append(fn())
+        except BaseException as e:  # noqa: BLE001
+            erro.append(e)
+
+    thread = threading.Thread(target=alvo, daemon=True)
+    thread.start()
+    thread.join(timeout)
+    assert not thread.is_alive(), f"não retornou em {timeout:.0f}s"
+    if erro:
+        raise erro[0]
+    return resultado[0]
+
+
+def _esperar(servico, item_ids: List[str]) -> Dict[str, object]:
+    """solicitar() e espera todos os callbacks"""
+    recebidos: Dict[str, object] = {}
+    pronto = threading.Event()
+    lock = threading.Lock()
+
+    def callback(item_id, miniatura):
+        with lock:
+            recebidos[item_id] = miniatura
+            if len(recebidos) == len(agendados):
+                pronto.set()
+
+    agendados = servico.solicitar(item_ids, callback)
+    if agendados:
+        assert pronto.wait(TIMEOUT), f"{len(agendados) - len(recebidos)} ícones sem resposta"
+    return recebidos
+
+
+def checar_download(stub, diretorio):
+    from core.icones import IconService
+    servico = IconService(diretorio, url=stub.render_url, max_paralelo=4)
+    item_ids = [f"T4_ITEM_{i}" for i in range(20)]
+    _esperar(servico, item_ids)
+    servico.fechar()
+    assert stub.renders == len(item_ids), f"{stub.renders} renders para {len(item_ids)} itens"
+    assert len(servico.disco) == len(item_ids), f"{len(servico.disco)} ícones no disco"
+    conteudo = servico._conteudo(item_ids[0])
+    assert conteudo.startswith(b"\x89PNG"), "conteúdo não é PNG"
+
+
+def checar_disco(stub, diretorio):
+    from core.icones import IconService
+    antes = stub.renders
+    servico = IconService(diretorio, url=stub.render_url)
+    assert len(servico.disco) == 20, f"índice recarregado com {len(servico.disco)} ícones"
+    for i in range(20):
+        assert servico._conteudo(f"T4_ITEM_{i}") is not None
+    servico.fechar()
+    assert stub.renders == antes, f"{stub.renders - antes} requisições com tudo em disco"
+
+
+def checar_ausente(stub, diretorio):
+    from core.icones import IconService
+    servico = IconService(diretorio, url=stub.render_url)
+    recebidos = _esperar(servico, ["T4_INEXISTENTE"])
+    assert recebidos == {"T4_INEXISTENTE": None}, recebidos
+    antes = stub.renders
+    assert servico.solicitar(["T4_INEXISTENTE"], lambda *_: None) == [], "404 pedido de novo"
+    servico.fechar()
+    assert stub.renders == antes
+
+
+def checar_despejo(stub, diretorio):
+    from core.icones import IconService
+    servico = IconService(os.path.join(diretorio, "pequeno"), url=stub.render_url, max_disco=1_000)
+    for i in range(30):
+        servico._conteudo(f"T5_ITEM_{i}")
+    disco = servico.disco
+    assert disco.total_bytes <= disco.max_bytes, f"{disco.total_bytes} > {disco.max_bytes} bytes"
+    assert servico.url("T5_ITEM_29") in disco._indice, "o mais recente foi despejado"
+    assert servico.url("T5_ITEM_0") not in disco._indice, "o mais antigo não foi despejado"
+    arquivos = [nome for _, _, nomes in os.walk(disco.diretorio) for nome in nomes if nome.endswith(".png")]
+    assert len(arquivos) == len(disco), f"{len(arquivos)} arquivos para {len(disco)} URLs"
+    servico.fechar()
+
+
+def checar_cancelamento(diretorio):
+    from core.icones import IconService
+    # Stub lento e um único worker: A roda, B e C ficam na fila e são cancelados
+    with StubAlbionAPI(latencia=0.3) as lento:
+        servico = IconService(os.path.join(diretorio, "lento"), url=lento.render_url, max_paralelo=1)
+        servico.solicitar(["T6_A", "T6_B", "T6_C"], lambda *_: None)
+        agendados = _com_timeout(lambda: servico.solicitar(["T6_D"], lambda *_: None))
+        assert agendados == ["T6_D"], agendados
+        assert set(servico._em_voo) <= {"T6_A", "T6_D"}, f"ainda em voo: {sorted(servico._em_voo)}"
+        _com_timeout(lambda: servico.executor.submit(lambda: None).result())
+        servico.fechar()
+        assert lento.renders == 2, f"{lento.renders} renders (B e C deveriam ter sido cancelados)"
+
+
+def checar_miniatura(stub, diretorio):
+    from core.icones import IconService
+    servico = IconService(diretorio, url=stub.render_url, tamanho=16)
+    recebidos = _esperar(servico, ["T4_ITEM_0"])
+    miniatura = recebidos["T4_ITEM_0"]
+    assert miniatura is not None and miniatura.size == (16, 16), miniatura
+    assert servico.obter("T4_ITEM_0") is miniatura
+    servico.fechar()
+
+
+def main() -> int:
+    falhas = 0
+    with tempfile.TemporaryDirectory(prefix="albion_icones_") as diretorio, StubAlbionAPI(latencia=0.01) as stub:
+        checagens = [
+            ("download", lambda: checar_download(stub, diretorio)),
+            ("disco", lambda: checar_disco(stub, diretorio)),
+            ("ausente", lambda: checar_ausente(stub, diretorio)),
+            ("despejo", lambda: checar_despejo(stub, diretorio)),
+            ("cancelamento", lambda: checar_cancelamento(diretorio)),
+        ]
+        if PILLOW:
+            checagens.append(("miniatura", lambda: checar_miniatura(stub, diretorio)))
+        else:
+            print("⏭️ miniatura: Pillow não instalado")
+        for nome, checagem in checagens:
+            inicio = time.perf_counter()
+            try:
+                checagem()
+            except AssertionError as e:
+                falhas += 1
+                print(f"❌ {nome}: {e}")
+            else:
+                print(f"✅ {nome} ({time.perf_counter() - inicio:.2f}s)")
+    return 1 if falhas else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
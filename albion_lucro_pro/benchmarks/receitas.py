@@ -0,0 +1,208 @@
+"""Verifica a extração de receitas contra registros no formato real do ao-bin-dumps (sem rede)
+
+O formatted/items.json só tem nomes e índices; as receitas vêm do items.json
+bruto, com os registros agrupados por tipo sob "items" e as variantes
+encantadas dentro do item base. A fixture abaixo copia esse formato
+(atributos "@", objeto único x lista, enchantments, artefatos).
+
+Checagens:
+    extracao       receitas_por_id gera os IDs do dump formatado (BASE@N e BASE_LEVELN@N)
+    streaming      o caminho com ijson lê os mesmos registros que o json.load
+    atualizacao    update_if_needed junta as receitas do bruto aos itens do formatado
+    condicional    sem mudanças não há diff; mudar só o bruto reprocessa os itens
+
+Sai com código 1 se alguma checagem falhar.
+
+Uso:
+    python benchmarks/receitas.py
+"""
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+from stub_api import StubAlbionAPI  # noqa: E402
+
+# Recorte do items.json bruto (ao-bin-dumps), reduzido aos campos lidos
+BRUTO = {"items": {
+    "@xmlns:xsi": "http://www.w3.org/2001/XMLSchema-instance",
+    "@xsi:noNamespaceSchemaLocation": "items.xsd",
+    "shopcategories": {"shopcategory": [{"@id": "resources", "@value": "1"}]},
+    "hideoutitem": {"@uniquename": "UNIQUE_HIDEOUT", "@tier": "1", "@shopcategory": "other"},
+    "simpleitem": [
+        {"@uniquename": "T4_WOOD", "@tier": "4", "@shopcategory": "resources"},
+        {
+            "@uniquename": "T4_PLANKS", "@tier": "4", "@shopcategory": "resources",
+            "craftingrequirements": {"@silver": "0", "@time": "1", "@craftingfocus": "31",
+                                     "craftresource": [{"@uniquename": "T4_WOOD", "@count": "2"},
+                                                       {"@uniquename": "T3_PLANKS", "@count": "1"}]},
+            "enchantments": {"enchantment": [
+                {"@enchantmentlevel": "1",
+                 "craftingrequirements": {"@silver": "0", "@time": "1", "@craftingfocus": "54",
+                                          "craftresource": [
+                                              {"@uniquename": "T4_WOOD_LEVEL1", "@count": "2",
+                                               "@enchantmentlevel": "1"},
+                                              {"@uniquename": "T3_PLANKS", "@count": "1"}]}},
+            ]},
+        },
+    ],
+    "consumableitem": {
+        "@uniquename": "T4_POTION_HEAL", "@tier": "4", "@shopcategory": "consumables",
+        "craftingrequirements": {"@silver": "0", "@time": "1", "@craftingfocus": "120", "@amountcrafted": "5",
+                                 "craftresource": {"@uniquename": "T4_BURDOCK", "@count": "24"}},
+    },
+    "weapon": [
+        {
+            "@uniquename": "T4_MAIN_SWORD", "@tier": "4", "@shopcategory": "melee",
+            "craftingrequirements": {"@silver": "0", "@time": "1", "@craftingfocus": "467",
+                                     "craftresource": [{"@uniquename": "T4_METALBAR", "@count": "16"},
+                                                       {"@uniquename": "T4_LEATHER", "@count": "8"}]},
+            "enchantments": {"enchantment": [
+                {"@enchantmentlevel": "1",
+                 "craftingrequirements": {"@silver": "0", "@time": "1", "@craftingfocus": "821",
+                                          "craftresource": [
+                                              {"@uniquename": "T4_METALBAR_LEVEL1", "@count": "16",
+                                               "@enchantmentlevel": "1"},
+                                              {"@uniquename": "T4_LEATHER_LEVEL1", "@count": "8",
+                                               "@enchantmentlevel": "1"}]},
+                 "upgraderequirements": {"upgraderesource": {"@uniquename": "T4_RUNE", "@count": "48"}}},
+            ]},
+        },
+        {
+            "@uniquename": "T4_MAIN_SCIMITAR_MORGANA", "@tier": "4", "@shopcategory": "melee",
+            "craftingrequirements": [
+                {"@silver": "0", "@time": "1", "@craftingfocus": "467",
+                 "craftresource": [{"@uniquename": "T4_METALBAR", "@count": "16"},
+                                   {"@uniquename": "T4_LEATHER", "@count": "8"},
+                                   {"@uniquename": "T4_ARTEFACT_MAIN_SCIMITAR_MORGANA", "@count": "1",
+                                    "@maxreturnamount": "0"}]},
+                {"@silver": "0", "@time": "1", "@craftingfocus": "467",
+                 "craftresource": [{"@uniquename": "T4_METALBAR", "@count": "8"},
+                                   {"@uniquename": "T4_METALBAR", "@count": "8"}]},
+            ],
+        },
+    ],
+}}
+
+FORMATADO = [
+    {"UniqueName": item_id, "LocalizedNames": {"EN-US": item_id, "PT-BR": item_id}, "Index": str(indice)}
+    for indice, item_id in enumerate([
+        "UNIQUE_HIDEOUT", "T4_WOOD", "T4_PLANKS", "T4_PLANKS_LEVEL1@1", "T4_POTION_HEAL",
+        "T4_MAIN_SWORD", "T4_MAIN_SWORD@1", "T4_MAIN_SCIMITAR_MORGANA",
+    ])
+]
+
+
+def _recursos(receita: dict) -> dict:
+    return {recurso["id"]: (recurso["quantidade"], recurso["artefato"]) for recurso in receita["recursos"]}
+
+
+def checar_extracao(diretorio):
+    from core.updater import AlbionDataUpdater, receitas_por_id
+    updater = AlbionDataUpdater(diretorio)
+    receitas = receitas_por_id(updater.iter_registros_brutos(_gravar(diretorio, "bruto.json", BRUTO)))
+    assert "T4_WOOD" not in receitas and "UNIQUE_HIDEOUT" not in receitas, sorted(receitas)
+
+    assert _recursos(receitas["T4_PLANKS"][0]) == {"T4_WOOD": (2, False), "T3_PLANKS": (1, False)}
+    # Recurso refinado encantado: ID do formatado é BASE_LEVELN@N, insumo encantado idem
+    assert _recursos(receitas["T4_PLANKS_LEVEL1@1"][0]) == {"T4_WOOD_LEVEL1@1": (2, False),
+                                                            "T3_PLANKS": (1, False)}
+    assert _recursos(receitas["T4_MAIN_SWORD@1"][0]) == {"T4_METALBAR_LEVEL1@1": (16, False),
+                                                         "T4_LEATHER_LEVEL1@1": (8, False)}
+    assert receitas["T4_MAIN_SWORD@1"][0]["focus"] == 821
+
+    pocao = receitas["T4_POTION_HEAL"]
+    assert len(pocao) == 1 and pocao[0]["quantidade"] == 5, pocao
+
+    cimitarra = receitas["T4_MAIN_SCIMITAR_MORGANA"]
+    assert len(cimitarra) == 2, cimitarra
+    assert _recursos(cimitarra[0])["T4_ARTEFACT_MAIN_SCIMITAR_MORGANA"] == (1, True)
+    assert _recursos(cimitarra[1]) == {"T4_METALBAR": (16, False)}, "recurso repetido não foi somado"
+
+
+def checar_streaming(diretorio):
+    import core.updater as updater_mod
+    from core.updater import AlbionDataUpdater
+    if updater_mod.ijson is None:
+        raise AssertionError("ijson não instalado")
+    updater = AlbionDataUpdater(diretorio)
+    path = _gravar(diretorio, "bruto.json", BRUTO)
+    com_ijson = list(updater.iter_registros_brutos(path))
+    updater_mod.ijson, ijson = None, updater_mod.ijson
+    try:
+        sem_ijson = list(updater.iter_registros_brutos(path))
+    finally:
+        updater_mod.ijson = ijson
+    assert com_ijson == sem_ijson, f"{len(com_ijson)} registros com ijson, {len(sem_ijson)} sem"
+
+
+def checar_atualizacao(stub, diretorio):
+    updater = _updater(stub, diretorio)
+    assert updater.update_if_needed(), "nada foi gravado"
+    receitas = updater.db.load_recipes()
+    esperados = {"T4_PLANKS", "T4_PLANKS_LEVEL1@1", "T4_POTION_HEAL", "T4_MAIN_SWORD", "T4_MAIN_SWORD@1",
+                 "T4_MAIN_SCIMITAR_MORGANA"}
+    assert set(receitas) == esperados, sorted(receitas)
+    assert len(updater.db.load_items()) == len(FORMATADO)
+
+
+def checar_condicional(stub, diretorio):
+    updater = _updater(stub, diretorio)
+    assert not updater.update_if_needed(), "reprocessou sem mudanças upstream"
+
+    bruto = json.loads(json.dumps(BRUTO))
+    bruto["items"]["consumableitem"]["craftingrequirements"]["@amountcrafted"] = "10"
+    _gravar(diretorio, "bruto.json", bruto)
+    os.utime(stub.bruto_path, ns=(time.time_ns(), time.time_ns() + 1_000_000))
+    updater = _updater(stub, diretorio)
+    assert updater.update_if_needed(), "mudança só no bruto não foi aplicada"
+    assert updater.db.load_recipes()["T4_POTION_HEAL"][0]["quantidade"] == 10
+
+
+def _gravar(diretorio, nome: str, conteudo) -> Path:
+    path = Path(diretorio) / nome
+    path.write_text(json.dumps(conteudo), encoding="utf-8")
+    return path
+
+
+def _updater(stub, diretorio):
+    from core.database import ItemDatabase
+    from core.updater import AlbionDataUpdater
+    dados = Path(diretorio) / "dados"
+    updater = AlbionDataUpdater(str(dados), db=ItemDatabase(str(dados / "albion.db")))
+    updater.data_url, updater.receitas_url = stub.dump_url, stub.receitas_url
+    if updater.last_update_file.exists():
+        updater.last_update_file.unlink()  # Força a verificação
+    return updater
+
+
+def main() -> int:
+    falhas = 0
+    with tempfile.TemporaryDirectory(prefix="albion_receitas_") as diretorio:
+        formatado = _gravar(diretorio, "formatado.json", FORMATADO)
+        bruto = _gravar(diretorio, "bruto.json", BRUTO)
+        with StubAlbionAPI(dump_path=str(formatado), bruto_path=str(bruto)) as stub:
+            checagens = [
+                ("extracao", lambda: checar_extracao(diretorio)),
+                ("streaming", lambda: checar_streaming(diretorio)),
+                ("atualizacao", lambda: checar_atualizacao(stub, diretorio)),
+                ("condicional", lambda: checar_condicional(stub, diretorio)),
+            ]
+            for nome, checagem in checagens:
+                inicio = time.perf_counter()
+                try:
+                    checagem()
+                except AssertionError as e:
+                    falhas += 1
+                    print(f"❌ {nome}: {e}")
+                else:
+                    print(f"✅ {nome} ({time.perf_counter() - inicio:.2f}s)")
+    return 1 if falhas else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,96 @@
+"""Mede o tempo de abertura do Albion Lucro Pro
+
+Cada rodada é um processo Python novo (imports a frio). Métricas:
+    importacao     importar main.py (customtkinter + módulos do projeto)
+    janela         do início do processo até a janela estar mapeada na tela
+    pesquisavel    do início do processo até o catálogo e o índice de busca carregarem
+
+Sem display (ex: CI), "janela" é omitida e "pesquisavel" mede a carga do
+catálogo sem interface.
+
+Uso:
+    python benchmarks/startup.py --data-dir ./data --rodadas 5
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+SRC = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+
+
+def _rodada(data_dir: str, gui: bool) -> dict:
+    """Executada no processo filho: mede uma abertura completa"""
+    inicio = time.perf_counter()
+    sys.path.insert(0, SRC)
+    import main  # noqa: F401  (mede o custo de importação do ponto de entrada)
+    from core.database import ItemDatabase
+    tempos = {"importacao": time.perf_counter() - inicio}
+
+    db = ItemDatabase(os.path.join(data_dir, "albion.db"),
+                      os.path.join(data_dir, "itens.json"),
+                      os.path.join(data_dir, "categorias.json"))
+
+    if not gui:
+        from core.tradutor import Tradutor
+        from core.facets import FacetIndex
+        tradutor = Tradutor(db)
+        FacetIndex.build(tradutor.itens)
+        tempos["pesquisavel"] = time.perf_counter() - inicio
+        return tempos
+
+    from core.api import AlbionPriceAPI
+    from gui.app import AlbionLucroApp
+    app = AlbionLucroApp(AlbionPriceAPI(), db)
+    while not app.winfo_ismapped():
+        app.update()
+    tempos["janela"] = time.perf_counter() - inicio
+    while not app.pronto:
+        app.update()
+        time.sleep(0.001)
+    tempos["pesquisavel"] = time.perf_counter() - inicio
+    app._fechar()
+    return tempos
+
+
+def _tem_display() -> bool:
+    if sys.platform.startswith("win") or sys.platform == "darwin":
+        return True
+    return bool(os.environ.get("DISPLAY") or os.environ.get("WAYLAND_DISPLAY"))
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data-dir", default="./data")
+    parser.add_argument("--rodadas", type=int, default=5)
+    parser.add_argument("--sem-gui", action="store_true", help="Mede só a carga do catálogo")
+    parser.add_argument("--filho", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    gui = not args.sem_gui and _tem_display()
+
+    if args.filho:
+        print(json.dumps(_rodada(args.data_dir, gui)))
+        return 0
+
+    comando = [sys.executable, os.path.abspath(__file__), "--filho", "--data-dir", args.data_dir]
+    if not gui:
+        comando.append("--sem-gui")
+
+    amostras = []
+    for _ in range(args.rodadas):
+        saida = subprocess.run(comando, capture_output=True, text=True, check=True).stdout
+        amostras.append(json.loads(saida.strip().splitlines()[-1]))
+
+    print(f"⏱️ Abertura ({args.rodadas} rodadas, {'com' if gui else 'sem'} interface)")
+    for metrica in amostras[0]:
+        valores = [a[metrica] * 1000 for a in amostras]
+        print(f"  {metrica:<12} mediana {statistics.median(valores):8.1f} ms   "
+              f"mín {min(valores):8.1f} ms   máx {max(valores):8.1f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,247 @@
+"""Servidor HTTP local que imita a Albion Data API (e o dump de itens)
+
+Rotas:
+    /api/v2/stats/prices/<ids>?locations=...&qualities=...
+    /api/v2/stats/history/<ids>?time-scale=...&date=...
+    /formatted/items.json                     dump formatado (nomes; com ETag / 304)
+    /items.json                               dump bruto (receitas; com ETag / 304)
+    /v1/item/<id>.png?size=...                render do ícone (PNG de cor sólida por item)
+
+Latência e a fração de respostas 429 (com Retry-After) são configuráveis.
+
+Uso:
+    with StubAlbionAPI(latencia=0.05, taxa_429=0.1) as stub:
+        api = AlbionPriceAPI(base_url=stub.base_url)
+"""
+import hashlib
+import http.server
+import json
+import random
+import struct
+import threading
+import time
+import urllib.parse
+import zlib
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Optional
+
+QUALIDADES = (1, 2, 3, 4, 5)
+SEM_DATA = "0001-01-01T00:00:00"  # Data que a API devolve para o lado sem ordens (preço 0)
+
+
+def _preco(item_id: str, cidade: str, qualidade: int, lado: str) -> int:
+    """Preço determinístico por (item, cidade, qualidade), estável entre execuções"""
+    semente = hashlib.blake2b(f"{item_id}|{cidade}|{qualidade}|{lado}".encode(), digest_size=4).digest()
+    base = int.from_bytes(semente, "little")
+    return 1_000 + base % 200_000
+
+
+def _png(item_id: str, tamanho: int) -> bytes:
+    """PNG RGBA de cor sólida determinística por item (sem depender do Pillow)"""
+    r, g, b = hashlib.blake2b(item_id.encode(), digest_size=3).digest()
+    linha = b"\x00" + bytes((r, g, b, 255)) * tamanho
+
+    def bloco(tipo: bytes, dados: bytes) -> bytes:
+        return struct.pack(">I", len(dados)) + tipo + dados + struct.pack(">I", zlib.crc32(tipo + dados))
+
+    return (b"\x89PNG\r\n\x1a\n"
+            + bloco(b"IHDR", struct.pack(">IIBBBBB", tamanho, tamanho, 8, 6, 0, 0, 0))
+            + bloco(b"IDAT", zlib.compress(linha * tamanho))
+            + bloco(b"IEND", b""))
+
+
+class _Handler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: "_Servidor"
+
+    def log_message(self, *args):
+        pass
+
+    def _responder(self, status: int, corpo: bytes = b"", cabecalhos: Optional[dict] = None):
+        self.send_response(status)
+        for nome, valor in (cabecalhos or {}).items():
+            self.send_header(nome, valor)
+        self.send_header("Content-Length", str(len(corpo)))
+        self.end_headers()
+        if corpo:
+            self.wfile.write(corpo)
+
+    def do_GET(self):
+        stub = self.server.stub
+        stub._contar("requisicoes")
+        if stub.latencia:
+            time.sleep(stub.latencia)
+
+        url = urllib.parse.urlparse(self.path)
+        query = urllib.parse.parse_qs(url.query)
+
+        if url.path == "/formatted/items.json":
+            return self._dump(stub.dump_path)
+        if url.path == "/items.json":
+            return self._dump(stub.bruto_path)
+        if url.path.startswith("/v1/item/"):
+            return self._render(url.path, query)
+
+        if stub.taxa_429 and stub._aleatorio() < stub.taxa_429:
+            stub._contar("respostas_429")
+            return self._responder(429, cabecalhos={"Retry-After": str(stub.retry_after)})
+
+        if "/prices/" in url.path:
+            corpo = self._precos(url.path.split("/prices/", 1)[1], query)
+        elif "/history/" in url.path:
+            corpo = self._historico(url.path.split("/history/", 1)[1], query)
+        else:
+            return self._responder(404)
+        self._responder(200, json.dumps(corpo).encode(), {"Content-Type": "application/json"})
+
+    def _precos(self, ids: str, query: dict) -> list:
+        cidades = query.get("locations", ["Caerleon"])[0].split(",")
+        qualidades = [int(q) for q in query["qualities"][0].split(",")] if "qualities" in query else QUALIDADES
+        data = (datetime.utcnow() - timedelta(minutes=10)).strftime("%Y-%m-%dT%H:%M:%S")
+        linhas = []
+        for item_id in urllib.parse.unquote(ids).split(","):
+            for cidade in cidades:
+                for qualidade in qualidades:
+                    compra = _preco(item_id, cidade, qualidade, "compra")
+                    if compra % 5 == 0:
+                        compra = 0  # Um lado sem ordens em ~20% das células, como na API real
+                    linhas.append({
+                        "item_id": item_id,
+                        "city": cidade,
+                        "quality": qualidade,
+                        "sell_price_min": _preco(item_id, cidade, qualidade, "venda"),
+                        "sell_price_min_date": data,
+                        "buy_price_max": compra,
+                        "buy_price_max_date": data if compra else SEM_DATA,
+                    })
+        return linhas
+
+    def _historico(self, ids: str, query: dict) -> list:
+        self.server.stub._contar("historicos")
+        agora = datetime.utcnow().replace(minute=0, second=0, microsecond=0)
+        # Sete dias de pontos por hora; "date" corta o início da janela, como na API real
+        desde = datetime.fromisoformat(query["date"][0]) if "date" in query else datetime.min
+        return [
+            {
+                "item_id": item_id,
+                "location": "Caerleon",
+                "quality": 1,
+                "data": [
+                    {"timestamp": (agora - timedelta(hours=h)).isoformat(),
+                     "avg_price": _preco(item_id, "Caerleon", h, "historico"), "item_count": 10 + h}
+                    for h in range(24 * 7)
+                    if agora - timedelta(hours=h) >= desde
+                ],
+            }
+            for item_id in urllib.parse.unquote(ids).split(",")
+        ]
+
+    def _render(self, caminho: str, query: dict):
+        stub = self.server.stub
+        stub._contar("renders")
+        item_id = urllib.parse.unquote(caminho.rsplit("/", 1)[1]).removesuffix(".png")
+        if "INEXISTENTE" in item_id:
+            return self._responder(404)
+        tamanho = min(int(query.get("size", ["217"])[0]), 217)
+        self._responder(200, _png(item_id, tamanho), {"Content-Type": "image/png"})
+
+    def _dump(self, path: Optional[Path]):
+        if path is None:
+            return self._responder(404)
+        etag = f'"{path.stat().st_mtime_ns:x}"'
+        if self.headers.get("If-None-Match") == etag:
+            return self._responder(304, cabecalhos={"ETag": etag})
+        self._responder(200, path.read_bytes(), {"Content-Type": "application/json", "ETag": etag})
+
+
+class _Servidor(http.server.ThreadingHTTPServer):
+    daemon_threads = True
+
+
+class StubAlbionAPI:
+    """Sobe o servidor em uma thread; usado como context manager"""
+
+    def __init__(self, latencia: float = 0.0, taxa_429: float = 0.0, retry_after: float = 0.05,
+                 dump_path: Optional[str] = None, semente: int = 0, porta: int = 0,
+                 bruto_path: Optional[str] = None):
+        self.latencia = latencia
+        self.taxa_429 = taxa_429
+        self.retry_after = retry_after
+        self.dump_path = Path(dump_path) if dump_path else None
+        self.bruto_path = Path(bruto_path) if bruto_path else None
+        self.requisicoes = 0
+        self.respostas_429 = 0
+        self.renders = 0
+        self.historicos = 0
+        self._random = random.Random(semente)
+        self._lock = threading.Lock()
+        self._servidor = _Servidor(("127.0.0.1", porta), _Handler)
+        self._servidor.stub = self
+        self._thread: Optional[threading.Thread] = None
+
+    def _contar(self, contador: str):
+        with self._lock:
+            setattr(self, contador, getattr(self, contador) + 1)
+
+    def _aleatorio(self) -> float:
+        with self._lock:
+            return self._random.random()
+
+    @property
+    def endereco(self) -> str:
+        host, porta = self._servidor.server_address[:2]
+        return f"http://{host}:{porta}"
+
+    @property
+    def base_url(self) -> str:
+        return f"{self.endereco}/api/v2/stats"
+
+    @property
+    def dump_url(self) -> str:
+        return f"{self.endereco}/formatted/items.json"
+
+    @property
+    def receitas_url(self) -> str:
+        return f"{self.endereco}/items.json"
+
+    @property
+    def render_url(self) -> str:
+        """Modelo de URL dos ícones (ALBION_RENDER_URL)"""
+        return f"{self.endereco}/v1/item/{{}}.png"
+
+    def iniciar(self) -> "StubAlbionAPI":
+        self._thread = threading.Thread(target=self._servidor.serve_forever, daemon=True,
+                                        name="stub-albion-api")
+        self._thread.start()
+        return self
+
+    def parar(self):
+        self._servidor.shutdown()
+        self._servidor.server_close()
+
+    def __enter__(self) -> "StubAlbionAPI":
+        return self.iniciar()
+
+    def __exit__(self, *exc):
+        self.parar()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Stub local da Albion Data API")
+    parser.add_argument("--porta", type=int, default=8765)
+    parser.add_argument("--latencia", type=float, default=0.0, help="Segundos por requisição")
+    parser.add_argument("--taxa-429", type=float, default=0.0, help="Fração de respostas 429")
+    parser.add_argument("--dump", help="Arquivo servido em /formatted/items.json")
+    parser.add_argument("--bruto", help="Arquivo servido em /items.json (receitas)")
+    args = parser.parse_args()
+
+    stub = StubAlbionAPI(args.latencia, args.taxa_429, dump_path=args.dump, porta=args.porta,
+                         bruto_path=args.bruto)
+    print(f"🛰️ Stub em {stub.base_url} (ALBION_API_URL)")
+    try:
+        stub._servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
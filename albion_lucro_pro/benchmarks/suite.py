@@ -0,0 +1,276 @@
+"""Suíte de benchmarks dos caminhos críticos, com comparação contra um baseline
+
+Casos:
+    catalogo   ItemDatabase.save_all_data / load_items / load_catalog
+    updater    AlbionDataUpdater: download dos dumps (stub), receitas, process_items (serial x pool), diff_items
+    busca      Tradutor.buscar_por_nome (latência p50/p95)
+    scan       AlbionPriceAPI.get_prices_bulk contra o stub (com latência e 429s)
+    lucro      ProfitEngine.opportunities / melhores_por_item sobre o scan (frame e PriceMatrix)
+
+Tudo roda contra dados sintéticos do tamanho do dump real e um servidor
+local, sem rede. Tempos são medianas de várias rodadas; "pico" é o pico de
+memória alocada (tracemalloc) em uma rodada extra.
+
+Uso:
+    python benchmarks/suite.py --salvar baseline.json
+    python benchmarks/suite.py --comparar baseline.json --tolerancia 0.25
+"""
+import argparse
+import gc
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Dict, List
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+from dados import TAMANHO_CATALOGO, gravar_dump, gravar_dump_bruto, itens_sinteticos  # noqa: E402
+from stub_api import StubAlbionAPI  # noqa: E402
+
+CIDADES = ["Caerleon", "Bridgewatch", "Thetford", "Fort Sterling", "Martlock", "Lymhurst"]
+TERMOS_BUSCA = ["espada longa", "machado", "botas do guardiao", "capa", "arcane staff", "bolsa 12",
+                "pocao de fogo", "armadura pesada", "elven bow", "martelo grande", "tabuas", "xyz"]
+
+# Sufixo da métrica -> True se maior é melhor
+SENTIDO = {"_ms": False, "_mib": False, "_por_s": True}
+
+
+def _tempo(fn: Callable, rodadas: int) -> List[float]:
+    tempos = []
+    for _ in range(rodadas):
+        gc.collect()
+        inicio = time.perf_counter()
+        fn()
+        tempos.append(time.perf_counter() - inicio)
+    return tempos
+
+
+def _pico(fn: Callable) -> float:
+    """Pico de memória alocada durante uma execução de fn, em MiB"""
+    gc.collect()
+    tracemalloc.start()
+    fn()
+    pico = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return pico / 2 ** 20
+
+
+def _medir(nome: str, fn: Callable, rodadas: int, metricas: Dict[str, float]):
+    metricas[f"{nome}_ms"] = statistics.median(_tempo(fn, rodadas)) * 1000
+    metricas[f"{nome}_pico_mib"] = _pico(fn)
+
+
+def caso_catalogo(ctx: dict, rodadas: int) -> Dict[str, float]:
+    from core.database import ItemDatabase
+    itens = itens_sinteticos(ctx["itens"])
+    db = ItemDatabase(str(ctx["dir"] / "albion.db"), str(ctx["dir"] / "itens.json"),
+                      str(ctx["dir"] / "categorias.json"))
+    metricas: Dict[str, float] = {}
+    _medir("save_all_data", lambda: db.save_all_data(itens, {}), rodadas, metricas)
+    _medir("load_items", db.load_items, rodadas, metricas)
+    db.write_snapshot()
+    _medir("load_catalog", db.load_catalog, rodadas, metricas)
+    ctx["db"] = db
+    return metricas
+
+
+def _processar_lote(registros: List[dict]) -> List[dict]:
+    from core.updater import processar_registro
+    return [processar_registro(registro) for registro in registros]
+
+
+def _process_items_pool(updater, dump: Path, processos: int) -> int:
+    """process_items com um pool de processos (registros enviados por pickle)
+
+    Só para comparação com o caminho serial do updater: mede a criação do
+    pool, a serialização dos registros e a volta dos itens processados.
+    """
+    from multiprocessing import Pool
+    registros = list(updater.iter_items(dump))
+    tamanho = max(1, len(registros) // (processos * 4))
+    with Pool(processos) as pool:
+        lotes = pool.map(_processar_lote, [registros[i:i + tamanho] for i in range(0, len(registros), tamanho)])
+    return sum(len(lote) for lote in lotes)
+
+
+def caso_updater(ctx: dict, rodadas: int) -> Dict[str, float]:
+    from core.search import SearchIndex
+    from core.updater import AlbionDataUpdater
+    dump = gravar_dump(ctx["dir"] / "items_dump.json", ctx["itens"])
+    bruto = gravar_dump_bruto(ctx["dir"] / "items_bruto.json", ctx["itens"])
+    metricas: Dict[str, float] = {}
+    with StubAlbionAPI(dump_path=str(dump), bruto_path=str(bruto)) as stub:
+        updater = AlbionDataUpdater(str(ctx["dir"]), db=ctx["db"])
+        updater.data_url = stub.dump_url
+
+        def download():
+            ctx["db"].set_meta("dump_etag", None)
+            caminho = updater.download_all_items()
+            caminho.unlink()
+
+        _medir("download_dump", download, rodadas, metricas)
+    receitas = {}
+    _medir("load_recipes", lambda: receitas.update(updater.ler_receitas(bruto)), rodadas, metricas)
+    _medir("process_items", lambda: updater.process_items(updater.iter_items(dump), receitas), rodadas, metricas)
+    metricas["process_items_por_s"] = ctx["itens"] / (metricas["process_items_ms"] / 1000)
+    # O pico de memória do pool não inclui os processos filhos (tracemalloc só vê este)
+    metricas["pool_processos"] = processos = os.cpu_count() or 1
+    _medir("process_items_pool", lambda: _process_items_pool(updater, dump, processos), rodadas, metricas)
+    _medir("diff_items", lambda: updater.diff_items(updater.iter_items(dump), receitas), rodadas, metricas)
+    # Índice de busca montado na passada do diff (update_if_needed) x reconstruído do catálogo
+    _medir("diff_items_com_indice",
+           lambda: updater.diff_items(updater.iter_items(dump), receitas, SearchIndex()).__len__(),
+           rodadas, metricas)
+    _medir("indice_do_catalogo", lambda: SearchIndex.build(ctx["db"].load_catalog()), rodadas, metricas)
+    return metricas
+
+
+def caso_busca(ctx: dict, rodadas: int) -> Dict[str, float]:
+    from core.tradutor import Tradutor
+    inicio = time.perf_counter()
+    tradutor = Tradutor(ctx["db"])
+    metricas = {"tradutor_init_ms": (time.perf_counter() - inicio) * 1000}
+    tradutor.buscar_por_nome("aquecimento")  # importa o fuzzywuzzy fora da medição
+
+    latencias = []
+    for _ in range(rodadas):
+        for termo in TERMOS_BUSCA:
+            inicio = time.perf_counter()
+            tradutor.buscar_por_nome(termo)
+            latencias.append((time.perf_counter() - inicio) * 1000)
+    latencias.sort()
+    metricas["busca_p50_ms"] = statistics.median(latencias)
+    metricas["busca_p95_ms"] = latencias[int(len(latencias) * 0.95) - 1]
+    metricas["busca_pico_mib"] = _pico(lambda: [tradutor.buscar_por_nome(t) for t in TERMOS_BUSCA])
+    ctx["item_ids"] = list(tradutor.itens)
+    return metricas
+
+
+def caso_scan(ctx: dict, rodadas: int) -> Dict[str, float]:
+    from core.api import AlbionPriceAPI
+    from core.resilience import TokenBucket
+    item_ids = ctx["item_ids"][:ctx["scan"]]
+    metricas: Dict[str, float] = {}
+
+    for nome, taxa_429 in (("scan", 0.0), ("scan_429", ctx["taxa_429"])):
+        with StubAlbionAPI(latencia=ctx["latencia"], taxa_429=taxa_429, retry_after=0.01) as stub:
+            # Limitador folgado: mede o cliente, não o limite público da API
+            api = AlbionPriceAPI(max_workers=8, base_url=stub.base_url,
+                                 limitador=TokenBucket(taxa=10_000, capacidade=1_000))
+            resultado = {}
+
+            def scan():
+                resultado["precos"] = api.get_prices_bulk(item_ids, CIDADES)
+
+            _medir(nome, scan, rodadas, metricas)
+            metricas[f"{nome}_por_s"] = len(item_ids) / (metricas[f"{nome}_ms"] / 1000)
+            metricas[f"{nome}_requisicoes"] = api.requisicoes / (rodadas + 1)
+            metricas[f"{nome}_retentativas"] = api.http.retentativas / (rodadas + 1)
+            ctx.setdefault("precos", resultado["precos"])
+    return metricas
+
+
+def caso_lucro(ctx: dict, rodadas: int) -> Dict[str, float]:
+    from core.price_matrix import PriceMatrix
+    from core.profit import ProfitEngine
+    engine = ProfitEngine()
+    precos = ctx["precos"]
+    metricas: Dict[str, float] = {}
+    _medir("opportunities", lambda: engine.opportunities(precos, top_n=100), rodadas, metricas)
+    _medir("melhores_por_item", lambda: engine.melhores_por_item(precos), rodadas, metricas)
+    _medir("matriz_atualizar", lambda: PriceMatrix.de_frame(precos), rodadas, metricas)
+    matriz = PriceMatrix.de_frame(precos)
+    _medir("melhores_por_item_matriz", lambda: engine.melhores_por_item(matriz), rodadas, metricas)
+    item_ids = ctx["item_ids"][:1000]
+    _medir("melhor_compra_x1000", lambda: [matriz.melhor_compra(item_id) for item_id in item_ids], rodadas, metricas)
+    metricas["opportunities_linhas"] = float(len(precos))
+    return metricas
+
+
+CASOS = {
+    "catalogo": caso_catalogo,
+    "updater": caso_updater,
+    "busca": caso_busca,
+    "scan": caso_scan,
+    "lucro": caso_lucro,
+}
+# Casos que preparam o contexto (banco, IDs, preços) usado por cada caso
+DEPENDENCIAS = {
+    "updater": ("catalogo",),
+    "busca": ("catalogo",),
+    "scan": ("catalogo", "busca"),
+    "lucro": ("catalogo", "busca", "scan"),
+}
+
+
+def comparar(atual: Dict[str, float], baseline: Dict[str, float], tolerancia: float) -> List[str]:
+    """Imprime a variação de cada métrica e retorna as que pioraram além da tolerância"""
+    regressoes = []
+    print(f"\n📊 Comparação com o baseline (tolerância {tolerancia:.0%})")
+    for metrica, valor in atual.items():
+        if metrica not in baseline or not baseline[metrica]:
+            continue
+        sentido = next((maior for sufixo, maior in SENTIDO.items() if metrica.endswith(sufixo)), None)
+        variacao = valor / baseline[metrica] - 1
+        piorou = sentido is not None and (variacao < -tolerancia if sentido else variacao > tolerancia)
+        marca = "❌" if piorou else "  "
+        print(f"{marca} {metrica:<28} {baseline[metrica]:12.2f} -> {valor:12.2f}  ({variacao:+.1%})")
+        if piorou:
+            regressoes.append(metrica)
+    return regressoes
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--casos", default=",".join(CASOS), help="Casos separados por vírgula")
+    parser.add_argument("--itens", type=int, default=TAMANHO_CATALOGO, help="Tamanho do catálogo sintético")
+    parser.add_argument("--scan", type=int, default=2_000, help="Itens consultados no caso scan")
+    parser.add_argument("--latencia", type=float, default=0.02, help="Latência do stub (segundos)")
+    parser.add_argument("--taxa-429", type=float, default=0.2, help="Fração de 429 no caso scan_429")
+    parser.add_argument("--rodadas", type=int, default=5)
+    parser.add_argument("--salvar", help="Grava as métricas em JSON (novo baseline)")
+    parser.add_argument("--comparar", help="Baseline JSON para detectar regressões")
+    parser.add_argument("--tolerancia", type=float, default=0.25)
+    args = parser.parse_args(argv)
+
+    selecionados = {caso.strip() for caso in args.casos.split(",") if caso.strip()}
+    for caso in selecionados - set(CASOS):
+        parser.error(f"caso desconhecido: {caso}")
+    necessarios = selecionados.union(*(DEPENDENCIAS.get(caso, ()) for caso in selecionados))
+    casos = [caso for caso in CASOS if caso in necessarios]
+
+    metricas: Dict[str, float] = {}
+    with tempfile.TemporaryDirectory(prefix="albion_bench_") as diretorio:
+        ctx = {"dir": Path(diretorio), "itens": args.itens, "scan": args.scan,
+               "latencia": args.latencia, "taxa_429": args.taxa_429}
+        for caso in casos:
+            inicio = time.perf_counter()
+            resultado = CASOS[caso](ctx, args.rodadas)
+            print(f"⏱️ {caso} ({time.perf_counter() - inicio:.1f}s)")
+            for metrica, valor in resultado.items():
+                print(f"   {metrica:<28} {valor:12.2f}")
+            metricas.update(resultado)
+
+    if args.salvar:
+        with open(args.salvar, "w", encoding="utf-8") as f:
+            json.dump({"metricas": metricas, "parametros": vars(args)}, f, indent=2, default=str)
+        print(f"💾 Baseline salvo em {args.salvar}")
+
+    if args.comparar:
+        with open(args.comparar, "r", encoding="utf-8") as f:
+            baseline = json.load(f)["metricas"]
+        regressoes = comparar(metricas, baseline, args.tolerancia)
+        if regressoes:
+            print(f"❌ {len(regressoes)} regressões: {', '.join(regressoes)}")
+            return 1
+        print("✅ Sem regressões")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,248 @@
+import argparse
+import sys
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import List
+
+import pandas as pd
+from dotenv import load_dotenv
+
+from core.api import AlbionPriceAPI
+from core.crafting import CraftingCalculator
+from core.database import ItemDatabase
+from core.metrics import METRICAS, PERFILADOR, ServidorMetricas
+from core.profit import ProfitEngine
+from core.regions import REGIOES, RegionalPriceAPI
+from core.tradutor import Tradutor
+from core.watchlist import INTERVALO_PADRAO, MARGEM_ALERTA, VARIACAO_MINIMA, Watchlist
+
+CIDADES_PADRAO = "Caerleon,Bridgewatch,Thetford,Fort Sterling,Martlock,Lymhurst"
+FORMATOS = ("csv", "parquet", "jsonl")
+
+
+def _lista(valor: str) -> List[str]:
+    return [parte.strip() for parte in valor.split(",") if parte.strip()] if valor else []
+
+
+def criar_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="albion_lucro_pro", description="Albion Lucro Pro (modo headless)")
+    subparsers = parser.add_subparsers(dest="comando", required=True)
+
+    scan = subparsers.add_parser("scan", help="Varre preços e ranqueia rotas de arbitragem")
+    scan.add_argument("--itens", help="IDs separados por vírgula (ex: T4_BAG,T5_BAG)")
+    scan.add_argument("--busca", help="Nome do item (busca fuzzy no catálogo)")
+    scan.add_argument("--categorias", help="Categorias separadas por vírgula")
+    scan.add_argument("--tier", help="Tier (ex: T4 ou 4)")
+    scan.add_argument("--encantamento", type=int)
+    scan.add_argument("--cidades", default=CIDADES_PADRAO)
+    scan.add_argument("--regioes", help=f"Servidores consultados em paralelo ({','.join(REGIOES)}); "
+                                        "padrão: ALBION_API_URL")
+    scan.add_argument("--top", type=int, default=100, help="Quantidade de rotas no resultado")
+    scan.add_argument("--min-margem", type=float, default=0.0)
+    scan.add_argument("--sem-premium", action="store_true")
+    scan.add_argument("--concorrencia", type=int, default=8, help="Requisições simultâneas")
+    scan.add_argument("--saida", default="scan_{ts}.csv",
+                      help="Arquivo de saída; {ts} é substituído pelo horário da execução")
+    scan.add_argument("--formato", choices=FORMATOS, help="Padrão: deduzido pela extensão")
+    scan.add_argument("--intervalo", type=int, default=0,
+                      help="Segundos entre execuções (0 = executa uma vez)")
+    scan.add_argument("--data-dir", default="./data")
+    scan.add_argument("--metricas-porta", type=int, help="Expõe /metrics (Prometheus) nesta porta")
+    scan.add_argument("--metricas-json", help="Grava as métricas neste arquivo após cada execução")
+    scan.add_argument("--perfil", action="store_true",
+                      help="Captura um cProfile da primeira execução (lotes HTTP paralelos entram por amostragem)")
+
+    craft = subparsers.add_parser("craft", help="Ranqueia o lucro de fabricação/refino por receita e cidade")
+    craft.add_argument("--itens", help="IDs dos produtos separados por vírgula (ex: T4_PLANKS,T5_PLANKS)")
+    craft.add_argument("--busca", help="Nome do produto (busca fuzzy no catálogo)")
+    craft.add_argument("--categorias", help="Categorias separadas por vírgula")
+    craft.add_argument("--tier", help="Tier (ex: T4 ou 4)")
+    craft.add_argument("--encantamento", type=int)
+    craft.add_argument("--cidades", default=CIDADES_PADRAO)
+    craft.add_argument("--top", type=int, default=100, help="Quantidade de receitas no resultado")
+    craft.add_argument("--focus", action="store_true", help="Calcula o retorno de recursos usando foco")
+    craft.add_argument("--sem-premium", action="store_true")
+    craft.add_argument("--concorrencia", type=int, default=8, help="Requisições simultâneas")
+    craft.add_argument("--saida", default="craft_{ts}.csv",
+                       help="Arquivo de saída; {ts} é substituído pelo horário da execução")
+    craft.add_argument("--formato", choices=FORMATOS, help="Padrão: deduzido pela extensão")
+    craft.add_argument("--data-dir", default="./data")
+
+    watch = subparsers.add_parser("watch", help="Vigia itens e imprime só o que mudou (alertas em alertas.jsonl)")
+    watch.add_argument("--adicionar", help="IDs separados por vírgula para incluir na watchlist")
+    watch.add_argument("--remover", help="IDs separados por vírgula para retirar da watchlist")
+    watch.add_argument("--cidades", help="Cidades vigiadas (padrão: as salvas na watchlist)")
+    watch.add_argument("--regioes", help=f"Servidores consultados em paralelo ({','.join(REGIOES)})")
+    watch.add_argument("--intervalo", type=int, default=INTERVALO_PADRAO, help="Segundos entre consultas")
+    watch.add_argument("--margem", type=float, default=MARGEM_ALERTA, help="Margem que dispara alerta")
+    watch.add_argument("--variacao", type=float, default=VARIACAO_MINIMA,
+                       help="Variação de preço que faz o item ser reimpresso")
+    watch.add_argument("--sem-premium", action="store_true")
+    watch.add_argument("--concorrencia", type=int, default=8, help="Requisições simultâneas")
+    watch.add_argument("--data-dir", default="./data")
+    watch.add_argument("--metricas-porta", type=int, help="Expõe /metrics (Prometheus) nesta porta")
+    return parser
+
+
+def selecionar_itens(args, db: ItemDatabase) -> List[str]:
+    """Resolve os filtros da linha de comando para a lista de IDs a consultar"""
+    if args.itens:
+        return _lista(args.itens)
+    if args.busca:
+        return [item["id"] for item in Tradutor(db).buscar_por_nome(args.busca)]
+    return list(db.get_items_filtered(_lista(args.categorias) or None, args.tier, args.encantamento))
+
+
+def escrever(resultado: pd.DataFrame, destino: str, formato: str = None):
+    """Grava o ranking em CSV, Parquet ou JSON lines"""
+    path = Path(destino)
+    formato = formato or {".parquet": "parquet", ".jsonl": "jsonl"}.get(path.suffix, "csv")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if formato == "parquet":
+        resultado.to_parquet(path, index=False)
+    elif formato == "jsonl":
+        resultado.to_json(path, orient="records", lines=True, force_ascii=False)
+    else:
+        resultado.to_csv(path, index=False)
+
+
+def executar_scan(args, api: AlbionPriceAPI, db: ItemDatabase, engine: ProfitEngine) -> pd.DataFrame:
+    inicio = time.perf_counter()
+    requisicoes_antes = api.requisicoes
+
+    with PERFILADOR.capturar():
+        item_ids = selecionar_itens(args, db)
+    if not item_ids:
+        print("⚠️ Nenhum item corresponde aos filtros.")
+        return pd.DataFrame()
+
+    # Fora do capturar(): assim o perfil pega as threads que baixam os lotes, não esta esperando por elas
+    precos = api.get_prices_bulk(item_ids, _lista(args.cidades))
+    with PERFILADOR.capturar():
+        resultado = engine.opportunities(precos, top_n=args.top, min_margem=args.min_margem)
+        nomes = {item_id: dados["nome"] for item_id, dados in db.get_items_by_ids(resultado["item_id"]).items()}
+        resultado.insert(1, "nome", resultado["item_id"].map(nomes))
+
+        destino = args.saida.format(ts=datetime.now().strftime("%Y%m%d_%H%M%S"))
+        escrever(resultado, destino, args.formato)
+
+    duracao = time.perf_counter() - inicio
+    print(
+        f"✅ {len(item_ids)} itens, {len(precos)} preços, {len(resultado)} rotas em {duracao:.2f}s "
+        f"({api.requisicoes - requisicoes_antes} requisições) -> {destino}"
+    )
+    return resultado
+
+
+def executar_craft(args, api: AlbionPriceAPI, db: ItemDatabase) -> pd.DataFrame:
+    """Lucro de cada receita dos itens selecionados, com insumos comprados na própria cidade"""
+    inicio = time.perf_counter()
+    receitas = db.load_recipes()
+    produtos = [item_id for item_id in selecionar_itens(args, db) if item_id in receitas]
+    if not produtos:
+        print("⚠️ Nenhum item selecionado tem receita (atualize o catálogo).")
+        return pd.DataFrame()
+
+    calculadora = CraftingCalculator({item_id: receitas[item_id] for item_id in produtos},
+                                     premium=not args.sem_premium, usar_focus=args.focus)
+    item_ids = sorted(calculadora.insumos(produtos))
+    precos = api.get_prices_bulk(item_ids, _lista(args.cidades))
+    calculadora.atualizar_precos(precos)
+    resultado = calculadora.resultados(top_n=args.top)
+    nomes = {item_id: dados["nome"] for item_id, dados in db.get_items_by_ids(resultado["item_id"]).items()}
+    resultado.insert(1, "nome", resultado["item_id"].map(nomes))
+
+    destino = args.saida.format(ts=datetime.now().strftime("%Y%m%d_%H%M%S"))
+    escrever(resultado, destino, args.formato)
+    print(f"✅ {len(produtos)} produtos, {len(item_ids)} itens consultados, {len(resultado)} receitas "
+          f"em {time.perf_counter() - inicio:.2f}s -> {destino}")
+    return resultado
+
+
+def executar_watch(args, api: AlbionPriceAPI, engine: ProfitEngine) -> int:
+    watchlist = Watchlist(api, engine, path=str(Path(args.data_dir) / "watchlist.json"),
+                          log_path=str(Path(args.data_dir) / "alertas.jsonl"),
+                          margem_alerta=args.margem, variacao_minima=args.variacao)
+    if args.cidades:
+        watchlist.cidades = _lista(args.cidades)
+        watchlist.salvar()
+    if args.remover:
+        watchlist.remover(_lista(args.remover))
+    if args.adicionar:
+        watchlist.adicionar(_lista(args.adicionar))
+    if not len(watchlist):
+        print("⚠️ Watchlist vazia: use --adicionar T4_BAG,T5_BAG")
+        return 1
+
+    def imprimir(alteradas: pd.DataFrame, alertas: list):
+        horario = datetime.now().strftime("%H:%M:%S")
+        for linha in alteradas.itertuples(index=False):
+            if pd.isna(linha.lucro):
+                print(f"[{horario}] {linha.item_id}: sem rota lucrativa")
+            else:
+                print(f"[{horario}] {linha.item_id}: {linha.buy_city} {linha.buy_price:,.0f} -> "
+                      f"{linha.sell_city} {linha.sell_price:,.0f} (lucro {linha.lucro:,.0f}, margem {linha.margem:.1%})")
+        for alerta in alertas:
+            print(f"🔔 {alerta['mensagem']}")
+
+    print(f"👁 Vigiando {len(watchlist)} itens em {len(watchlist.cidades)} cidades a cada {args.intervalo}s")
+    parar = threading.Event()
+    try:
+        watchlist.executar(imprimir, args.intervalo, parar)
+    except KeyboardInterrupt:
+        parar.set()
+    return 0
+
+
+def main(argv: List[str] = None) -> int:
+    load_dotenv()
+    args = criar_parser().parse_args(argv)
+
+    db = ItemDatabase(str(Path(args.data_dir) / "albion.db"),
+                      str(Path(args.data_dir) / "itens.json"),
+                      str(Path(args.data_dir) / "categorias.json"))
+    if getattr(args, "regioes", None):
+        api = RegionalPriceAPI(_lista(args.regioes), max_workers=args.concorrencia)
+    else:
+        api = AlbionPriceAPI(max_workers=args.concorrencia)
+    engine = ProfitEngine(premium=not args.sem_premium)
+    if getattr(args, "metricas_porta", None):
+        print(f"📊 Métricas em {ServidorMetricas(METRICAS, args.metricas_porta).url}")
+    if args.comando == "craft":
+        try:
+            executar_craft(args, api, db)
+        except Exception as e:
+            print(f"❌ Falha no cálculo de fabricação: {str(e)}")
+            return 1
+        return 0
+    if args.comando == "watch":
+        return executar_watch(args, api, engine)
+    if args.perfil:
+        PERFILADOR.diretorio = Path(args.data_dir) / "perfis"
+        PERFILADOR.armar()
+
+    while True:
+        PERFILADOR.iniciar("scan")
+        try:
+            with METRICAS.cronometrar("cli.scan"):
+                executar_scan(args, api, db, engine)
+        except Exception as e:
+            print(f"❌ Falha no scan: {str(e)}")
+            if not args.intervalo:
+                return 1
+        finally:
+            PERFILADOR.finalizar()
+            if args.metricas_json:
+                METRICAS.salvar_json(args.metricas_json)
+        if not args.intervalo:
+            return 0
+        try:
+            time.sleep(args.intervalo)
+        except KeyboardInterrupt:
+            return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
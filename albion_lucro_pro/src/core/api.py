@@ -1,24 +1,272 @@
-import requests
-import pandas as pd
+from __future__ import annotations
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
 from dotenv import load_dotenv
+from typing import Dict, Iterable, List, Optional
+from core.cache import STALE, PriceCache
+from core.historico import PriceWarehouse, pontos_historico, series_historico
+from core.metrics import METRICAS, PERFILADOR
+from core.resilience import CircuitoAberto, ClienteHTTP, TokenBucket
 import os
+from core.lazy import lazy_import
+
+requests = lazy_import("requests")
+pd = lazy_import("pandas")
 
 load_dotenv()
 
+MAX_URL_LENGTH = 4096  # Limite conservador aceito pelo servidor da Albion Data
+MAX_WORKERS = 8  # Requisições simultâneas em buscas em lote
+QUALIDADES = (1, 2, 3, 4, 5)  # Qualidades retornadas pela API quando nenhuma é informada
+SEM_LINHA: dict = {}  # Valor em cache de célula pedida que a API não devolveu (sem ordens)
+JANELA_HISTORICO = timedelta(days=7)  # Período devolvido pelo /history sem o parâmetro date
+
+
 class AlbionPriceAPI:
-    def __init__(self):
-        self.base_url = os.getenv("ALBION_API_URL")
-        
+    def __init__(self, max_workers: int = MAX_WORKERS, cache: Optional[PriceCache] = None,
+                 warehouse: Optional[PriceWarehouse] = None, limitador: Optional[TokenBucket] = None,
+                 base_url: Optional[str] = None):
+        self.base_url = base_url or os.getenv("ALBION_API_URL")
+        self.max_workers = max_workers
+        self.http = ClienteHTTP(limitador=limitador, criar_sessao=self._criar_sessao)
+        self.cache = cache
+        if cache is not None:
+            METRICAS.registrar_medidor("cache_taxa_acerto", lambda: cache.taxa_acerto, origem=self.base_url)
+            METRICAS.registrar_medidor("cache_entradas", lambda: len(cache), origem=self.base_url)
+        self._revalidacao = ThreadPoolExecutor(max_workers=1)
+        self._revalidando = set()
+        self._revalidando_lock = threading.Lock()
+        self.warehouse = warehouse
+        self._persistencia = ThreadPoolExecutor(max_workers=1)  # Gravações no warehouse
+
+    @property
+    def session(self) -> requests.Session:
+        return self.http.session
+
+    def _criar_sessao(self) -> requests.Session:
+        """Cria uma sessão keep-alive compartilhada por todas as requisições"""
+        session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=self.max_workers, pool_maxsize=self.max_workers)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    @property
+    def requisicoes(self) -> int:
+        """Total de requisições HTTP feitas por esta instância (inclui retentativas)"""
+        return self.http.requisicoes
+
+    def _get_json(self, url: str, params: dict = None) -> list:
+        return self.http.get_json(url, params=params)
+
+    def _baixar_lote(self, url: str) -> list:
+        # Roda no pool: sem isso o perfil de uma ação só veria a thread que espera os lotes
+        with PERFILADOR.capturar():
+            return self._get_json(url)
+
     def get_prices(self, item_id: str, locations: str = "Caerleon,Martlock") -> pd.DataFrame:
         """Busca preços atuais nas cidades especificadas"""
-        url = f"{self.base_url}/prices/{item_id}?locations={locations}"
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
-        return pd.DataFrame(response.json())
-    
+        return self.get_prices_bulk([item_id], locations.split(","))
+
+    def _arquivar(self, metodo: str, dados):
+        """Grava no warehouse em segundo plano, sem atrasar a resposta"""
+        if self.warehouse is None or dados is None or len(dados) == 0:
+            return
+
+        def tarefa():
+            try:
+                getattr(self.warehouse, metodo)(dados)
+            except Exception as e:
+                print(f"⚠️ Falha ao gravar no histórico local: {str(e)}")
+
+        self._persistencia.submit(tarefa)
+
+    def _montar_lotes(self, item_ids: List[str], query: str) -> List[List[str]]:
+        """Agrupa IDs em lotes cuja URL final respeita MAX_URL_LENGTH"""
+        base_len = len(f"{self.base_url}/prices/?{query}")
+        lotes, atual, tamanho = [], [], base_len
+        for item_id in item_ids:
+            extra = len(item_id) + (1 if atual else 0)
+            if atual and tamanho + extra > MAX_URL_LENGTH:
+                lotes.append(atual)
+                atual, tamanho = [], base_len
+                extra = len(item_id)
+            atual.append(item_id)
+            tamanho += extra
+        if atual:
+            lotes.append(atual)
+        return lotes
+
+    def _buscar_bulk(self, item_ids: List[str], locations: List[str],
+                     qualities: Optional[List[int]]) -> List[dict]:
+        """Baixa os preços de vários itens em lotes paralelos"""
+        query = f"locations={','.join(locations)}"
+        if qualities:
+            query += f"&qualities={','.join(str(q) for q in qualities)}"
+
+        urls = [
+            f"{self.base_url}/prices/{','.join(lote)}?{query}"
+            for lote in self._montar_lotes(item_ids, query)
+        ]
+
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(urls))) as executor:
+            respostas = list(executor.map(self._baixar_lote, urls))
+
+        linhas = [linha for resposta in respostas for linha in resposta]
+        if self.warehouse is not None:
+            self._arquivar("append_prices", pd.DataFrame(linhas))
+        if self.cache is not None:
+            recebidas = set()
+            for linha in linhas:
+                chave = (linha.get("item_id"), linha.get("city"), linha.get("quality"), "prices")
+                self.cache.set(chave, linha)
+                recebidas.add(chave)
+            # A API omite células sem ordens (comum em qualidades altas); sem o cache
+            # negativo o item nunca fica completo no cache e é buscado de novo toda vez
+            for item_id in item_ids:
+                for cidade in locations:
+                    for qualidade in qualities or QUALIDADES:
+                        chave = (item_id, cidade, qualidade, "prices")
+                        if chave not in recebidas:
+                            self.cache.set(chave, SEM_LINHA)
+        return linhas
+
+    def _revalidar(self, item_ids: List[str], locations: List[str],
+                   qualities: Optional[List[int]]):
+        """Atualiza em segundo plano itens servidos a partir de entradas vencidas"""
+        with self._revalidando_lock:
+            pendentes = [item_id for item_id in item_ids if item_id not in self._revalidando]
+            self._revalidando.update(pendentes)
+        if not pendentes:
+            return
+
+        def tarefa():
+            try:
+                self._buscar_bulk(pendentes, locations, qualities)
+            except Exception as e:
+                print(f"⚠️ Falha ao revalidar preços em cache: {str(e)}")
+            finally:
+                with self._revalidando_lock:
+                    self._revalidando.difference_update(pendentes)
+
+        self._revalidacao.submit(tarefa)
+
+    def _linhas_em_cache(self, item_ids: List[str], locations: List[str],
+                         qualities: Optional[List[int]]) -> List[dict]:
+        linhas = []
+        for item_id in item_ids:
+            for cidade in locations:
+                for qualidade in qualities or QUALIDADES:
+                    linha = self.cache.peek((item_id, cidade, qualidade, "prices"))
+                    if linha:  # None (fora do cache) ou SEM_LINHA
+                        linhas.append(linha)
+        return linhas
+
+    @METRICAS.cronometrado("api.get_prices_bulk")
+    def get_prices_bulk(self, item_ids: Iterable[str], locations: Iterable[str],
+                        qualities: Optional[Iterable[int]] = None, forcar: bool = False) -> pd.DataFrame:
+        """Busca preços de vários itens com poucas requisições simultâneas
+
+        forcar=True ignora entradas ainda válidas do cache (usado pela watchlist);
+        o cache continua sendo atualizado e serve de reserva se a API cair.
+        """
+        item_ids = list(dict.fromkeys(item_ids))
+        locations = list(locations)
+        qualities = list(qualities) if qualities else None
+        if not item_ids:
+            return pd.DataFrame()
+
+        if self.cache is None:
+            return pd.DataFrame(self._buscar_bulk(item_ids, locations, qualities))
+
+        linhas, faltando, vencidos = [], [], []
+        for item_id in ([] if forcar else item_ids):
+            linhas_item, estados = [], set()
+            for cidade in locations:
+                for qualidade in qualities or QUALIDADES:
+                    linha, estado = self.cache.get((item_id, cidade, qualidade, "prices"))
+                    estados.add(estado)
+                    linhas_item.append(linha)
+
+            if None in estados:
+                faltando.append(item_id)
+            else:
+                linhas.extend(linha for linha in linhas_item if linha)
+                if STALE in estados:
+                    vencidos.append(item_id)
+        if forcar:
+            faltando = item_ids
+
+        if faltando:
+            try:
+                linhas.extend(self._buscar_bulk(faltando, locations, qualities))
+            except CircuitoAberto:
+                # API fora do ar: serve o que houver em cache, mesmo vencido
+                linhas.extend(self._linhas_em_cache(faltando, locations, qualities))
+                if not linhas:
+                    raise
+        if vencidos:
+            self._revalidar(vencidos, locations, qualities)
+
+        return pd.DataFrame(linhas)
+
+    def _baixar_historico(self, item_id: str, time_scale: int) -> list:
+        """Histórico da janela atual: o trecho já gravado no warehouse é lido do disco
+        e só a cauda posterior ao último ponto salvo é pedida à API"""
+        url = f"{self.base_url}/history/{item_id}?time-scale={time_scale}"
+        if self.warehouse is None:
+            historico = self._get_json(url)
+            self._arquivar("append_history", historico)
+            return historico
+
+        agora = datetime.utcnow()
+        local = self.warehouse.query([item_id], inicio=agora - JANELA_HISTORICO)
+        if not local.empty:
+            ultimo = local["timestamp"].max()
+            # O próximo ponto só é publicado time_scale horas depois do último
+            if agora - ultimo < timedelta(hours=time_scale):
+                return series_historico(local)
+            url += f"&date={ultimo:%Y-%m-%dT%H:%M:%S}"
+
+        try:
+            cauda = self._get_json(url)
+        except CircuitoAberto:
+            if local.empty:
+                raise
+            return series_historico(local)
+        self._arquivar("append_history", cauda)
+        if local.empty:
+            return cauda
+        pontos = pd.concat([local, pontos_historico(cauda)], ignore_index=True)
+        return series_historico(pontos.drop_duplicates(["location", "quality", "timestamp"], keep="last"))
+
+    @METRICAS.cronometrado("api.get_historical_prices")
     def get_historical_prices(self, item_id: str, time_scale: int = 7) -> pd.DataFrame:
         """Busca histórico de preços"""
-        url = f"{self.base_url}/history/{item_id}?time-scale={time_scale}"
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
-        return pd.DataFrame(response.json())
\ No newline at end of file
+        chave = (item_id, "", 0, f"history:{time_scale}")
+        if self.cache is None:
+            return pd.DataFrame(self._baixar_historico(item_id, time_scale))
+
+        def baixar():
+            historico = self._baixar_historico(item_id, time_scale)
+            self.cache.set(chave, historico)
+            return historico
+
+        historico, estado = self.cache.get(chave)
+        if estado == STALE:
+            self._revalidacao.submit(baixar)
+        if estado is None:
+            try:
+                historico = baixar()
+            except CircuitoAberto:
+                historico = self.cache.peek(chave)
+                if historico is None:
+                    raise
+        return pd.DataFrame(historico)
+
+    @property
+    def cache_stats(self) -> Dict[str, int]:
+        """Contadores de hit/miss/eviction do cache de preços"""
+        return self.cache.stats if self.cache is not None else {}
@@ -0,0 +1,144 @@
+import atexit
+import os
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+# TTL padrão (segundos) por endpoint da Albion Data API
+DEFAULT_TTLS = {
+    "prices": 5 * 60,
+    "history": 60 * 60,
+}
+# Janela de vencidas: com stale_while_revalidate, get() ainda serve entradas com até
+# TTL * STALE_FACTOR de idade; depois disso contam como miss, mas ficam na memória
+# (peek ainda as lê) até o LRU removê-las. Só o load() descarta as mais velhas que isso.
+STALE_FACTOR = 12
+
+FRESH = "fresh"
+STALE = "stale"
+
+
+class PriceCache:
+    """Cache LRU com TTL por endpoint para as respostas da AlbionPriceAPI
+
+    As chaves seguem o formato (item_id, cidade, qualidade, endpoint). O endpoint
+    pode ter um sufixo após ":" (ex: "history:7"); o TTL é escolhido pelo prefixo.
+    """
+
+    def __init__(self, ttls: Dict[str, int] = None, max_entries: int = 50_000,
+                 persist_path: Optional[str] = None, stale_while_revalidate: bool = False):
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self.max_entries = max_entries
+        self.persist_path = Path(persist_path) if persist_path else None
+        self.stale_while_revalidate = stale_while_revalidate
+
+        self._entries: "OrderedDict[Hashable, Tuple[Any, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        if self.persist_path:
+            self.load()
+            atexit.register(self.save)
+
+    def _ttl(self, key: Tuple) -> int:
+        endpoint = key[3].split(":", 1)[0]
+        return self.ttls.get(endpoint, DEFAULT_TTLS["prices"])
+
+    def get(self, key: Tuple) -> Tuple[Any, Optional[str]]:
+        """Retorna (valor, estado) onde estado é FRESH, STALE ou None (miss)"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None, None
+
+            value, stored_at = entry
+            idade = time.time() - stored_at
+            ttl = self._ttl(key)
+
+            if idade <= ttl:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value, FRESH
+
+            if self.stale_while_revalidate and idade <= ttl * STALE_FACTOR:
+                self._entries.move_to_end(key)
+                self.stale_hits += 1
+                return value, STALE
+
+            # Entradas expiradas ficam até serem removidas pelo LRU (ver peek)
+            self.misses += 1
+            return None, None
+
+    def peek(self, key: Tuple) -> Any:
+        """Valor armazenado independente da idade (usado quando a API está fora do ar)"""
+        with self._lock:
+            entry = self._entries.get(key)
+        return entry[0] if entry is not None else None
+
+    def set(self, key: Tuple, value: Any, stored_at: float = None):
+        """Armazena um valor, removendo os menos usados se o limite for atingido"""
+        with self._lock:
+            self._entries[key] = (value, stored_at if stored_at is not None else time.time())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def taxa_acerto(self) -> float:
+        """Fração das consultas servidas pelo cache (frescas ou vencidas)"""
+        acertos = self.hits + self.stale_hits
+        total = acertos + self.misses
+        return acertos / total if total else 0.0
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """Contadores para dimensionar o cache"""
+        return {
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+        }
+
+    def save(self):
+        """Persiste o cache em disco (escrita atômica)"""
+        if not self.persist_path:
+            return
+        with self._lock:
+            snapshot = list(self._entries.items())
+        self.persist_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.persist_path.with_suffix(".tmp")
+        with open(tmp_path, "wb") as f:
+            pickle.dump(snapshot, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, self.persist_path)
+
+    def load(self):
+        """Recarrega o cache salvo, descartando entradas com mais de TTL * STALE_FACTOR"""
+        try:
+            with open(self.persist_path, "rb") as f:
+                snapshot = pickle.load(f)
+        except (FileNotFoundError, EOFError, pickle.UnpicklingError):
+            return
+
+        agora = time.time()
+        with self._lock:
+            for key, (value, stored_at) in snapshot[-self.max_entries:]:
+                if agora - stored_at <= self._ttl(key) * STALE_FACTOR:
+                    self._entries[key] = (value, stored_at)
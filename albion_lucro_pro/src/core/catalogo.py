@@ -0,0 +1,195 @@
+import sys
+from array import array
+from collections.abc import Mapping
+from typing import Dict, Iterable, Iterator, List, Optional
+
+IMG_URL = "https://render.albiononline.com/v1/item/{}.png"
+
+_SEM_VALOR = -1  # tier/qualidade desconhecidos nas colunas de inteiros
+
+
+class _Tabela:
+    """Strings internadas: cada valor distinto é guardado uma vez e referenciado por código"""
+
+    __slots__ = ("valores", "_codigos")
+
+    def __init__(self, valores: Iterable[Optional[str]] = (None,)):
+        self.valores: List[Optional[str]] = list(valores)
+        self._codigos = {valor: codigo for codigo, valor in enumerate(self.valores)}
+
+    def codigo(self, valor: Optional[str]) -> int:
+        codigo = self._codigos.get(valor)
+        if codigo is None:
+            codigo = self._codigos[valor] = len(self.valores)
+            self.valores.append(sys.intern(valor) if isinstance(valor, str) else valor)
+        return codigo
+
+    def __getstate__(self):
+        return self.valores
+
+    def __setstate__(self, valores):
+        self.__init__(valores)
+
+
+class _Textos:
+    """Lista de strings guardada como um único buffer UTF-8 + offsets"""
+
+    __slots__ = ("buffer", "offsets")
+
+    def __init__(self):
+        self.buffer = bytearray()
+        self.offsets = array("I", [0])
+
+    def append(self, texto: str):
+        self.buffer += texto.encode("utf-8")
+        self.offsets.append(len(self.buffer))
+
+    def __getitem__(self, posicao: int) -> str:
+        return self.buffer[self.offsets[posicao]:self.offsets[posicao + 1]].decode("utf-8")
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def lista(self) -> List[str]:
+        texto, offsets = bytes(self.buffer), self.offsets
+        return [texto[offsets[i]:offsets[i + 1]].decode("utf-8") for i in range(len(offsets) - 1)]
+
+    def __getstate__(self):
+        return bytes(self.buffer), self.offsets
+
+    def __setstate__(self, estado):
+        buffer, self.offsets = estado
+        self.buffer = bytearray(buffer)
+
+
+class Catalogo(Mapping):
+    """Catálogo de itens em colunas compactas
+
+    Em vez de um dict por item, cada campo é uma coluna: nomes em buffers
+    UTF-8, tier, encantamento e qualidade em arrays de inteiros pequenos;
+    categoria, subcategoria e data de atualização como códigos de tabelas
+    internadas; img_url derivada do ID.
+    `catalogo[item_id]` monta o dict no formato de ItemDatabase.load_items()
+    sob demanda, então Tradutor, a GUI e o CLI continuam usando as mesmas chaves.
+    """
+
+    __slots__ = ("ids", "nomes", "nomes_en", "tiers", "encantamentos", "qualidades",
+                 "categorias", "subcategorias", "atualizacoes",
+                 "_cod_categoria", "_cod_subcategoria", "_cod_atualizacao", "_posicoes")
+
+    def __init__(self):
+        self.ids: List[str] = []
+        self.nomes = _Textos()
+        self.nomes_en = _Textos()
+        self.tiers = array("b")
+        self.encantamentos = array("b")
+        self.qualidades = array("b")
+        self.categorias = _Tabela()
+        self.subcategorias = _Tabela()
+        self.atualizacoes = _Tabela()
+        self._cod_categoria = array("I")
+        self._cod_subcategoria = array("I")
+        self._cod_atualizacao = array("I")
+        self._posicoes: Dict[str, int] = {}
+
+    @classmethod
+    def de_dicts(cls, itens: Dict[str, dict]) -> "Catalogo":
+        """Compacta um dict {item_id: dados} (formato de load_items/process_items)"""
+        catalogo = cls()
+        for item_id, dados in itens.items():
+            tier = str(dados.get("tier") or "").upper().lstrip("T")
+            catalogo.adicionar(
+                item_id, dados.get("nome"), dados.get("nome_en"),
+                int(tier) if tier.isdigit() else None, dados.get("categoria"),
+                dados.get("subcategoria"), dados.get("encantamento"),
+                dados.get("qualidade"), dados.get("last_updated")
+            )
+        return catalogo
+
+    def adicionar(self, item_id: str, nome: Optional[str], nome_en: Optional[str], tier: Optional[int],
+                  categoria: Optional[str], subcategoria: Optional[str], encantamento: Optional[int],
+                  qualidade: Optional[int], last_updated: Optional[str]):
+        """Acrescenta um item ao fim das colunas"""
+        if item_id in self._posicoes:
+            raise ValueError(f"Item duplicado no catálogo: {item_id}")
+        self._posicoes[item_id] = len(self.ids)
+        self.ids.append(sys.intern(item_id))
+        self.nomes.append(nome or item_id)
+        self.nomes_en.append(nome_en or "")
+        self.tiers.append(_SEM_VALOR if tier is None else tier)
+        self.encantamentos.append(encantamento or 0)
+        self.qualidades.append(_SEM_VALOR if qualidade is None else qualidade)
+        self._cod_categoria.append(self.categorias.codigo(categoria))
+        self._cod_subcategoria.append(self.subcategorias.codigo(subcategoria))
+        self._cod_atualizacao.append(self.atualizacoes.codigo(last_updated))
+
+    # ---------- Mapping ----------
+
+    def __getitem__(self, item_id: str) -> dict:
+        return self.registro(self._posicoes[item_id])
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.ids)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __contains__(self, item_id) -> bool:
+        return item_id in self._posicoes
+
+    def posicao(self, item_id: str) -> Optional[int]:
+        return self._posicoes.get(item_id)
+
+    def registro(self, posicao: int) -> dict:
+        """Dict no formato de ItemDatabase.load_items(), montado na hora"""
+        item_id = self.ids[posicao]
+        tier = self.tiers[posicao]
+        qualidade = self.qualidades[posicao]
+        return {
+            "id": item_id,
+            "nome": self.nomes[posicao],
+            "nome_en": self.nomes_en[posicao],
+            "tier": f"T{tier}" if tier != _SEM_VALOR else "T?",
+            "categoria": self.categorias.valores[self._cod_categoria[posicao]],
+            "subcategoria": self.subcategorias.valores[self._cod_subcategoria[posicao]],
+            "encantamento": self.encantamentos[posicao],
+            "qualidade": qualidade if qualidade != _SEM_VALOR else None,
+            "img_url": IMG_URL.format(item_id),
+            "last_updated": self.atualizacoes.valores[self._cod_atualizacao[posicao]],
+        }
+
+    def coluna(self, campo: str) -> list:
+        """Valores de um campo na ordem de `ids`, sem montar os registros"""
+        if campo == "tier":
+            rotulos = {tier: f"T{tier}" if tier != _SEM_VALOR else "T?" for tier in set(self.tiers)}
+            return [rotulos[tier] for tier in self.tiers]
+        if campo == "encantamento":
+            return list(self.encantamentos)
+        if campo == "nome":
+            return self.nomes.lista()
+        if campo == "nome_en":
+            return self.nomes_en.lista()
+        tabelas = {
+            "categoria": (self.categorias, self._cod_categoria),
+            "subcategoria": (self.subcategorias, self._cod_subcategoria),
+            "last_updated": (self.atualizacoes, self._cod_atualizacao),
+        }
+        if campo in tabelas:
+            tabela, codigos = tabelas[campo]
+            return [tabela.valores[codigo] for codigo in codigos]
+        return [self.registro(posicao).get(campo) for posicao in range(len(self.ids))]
+
+    def mapa_categorias(self) -> Dict[str, str]:
+        """item_id -> categoria (formato de ItemDatabase.load_categories)"""
+        return {item_id: categoria for item_id, categoria in zip(self.ids, self.coluna("categoria"))
+                if categoria is not None}
+
+    # ---------- pickle (snapshot do catálogo) ----------
+
+    def __getstate__(self):
+        return {nome: getattr(self, nome) for nome in self.__slots__ if nome != "_posicoes"}
+
+    def __setstate__(self, estado):
+        for nome, valor in estado.items():
+            setattr(self, nome, valor)
+        self._posicoes = {item_id: i for i, item_id in enumerate(self.ids)}
@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from core.profit import TAXA_MERCADO, TAXA_MERCADO_PREMIUM, TAXA_SETUP
+from core.lazy import lazy_import
+
+pd = lazy_import("pandas")
+
+# Bônus de produção (somados) e a taxa de retorno que geram, 1 - 1 / (1 + bônus).
+# Conferidos com a tabela de retorno de recursos do jogo (Albion Online Wiki, "Resource
+# Return Rate"): cidade real 15,3%; cidade especializada no refino 36,7%; com foco,
+# 43,5% e 53,9%. Os +15% de especialização de fabricação por categoria não entram aqui.
+BONUS_BASE = 0.18  # Qualquer cidade real -> 15,3%
+BONUS_ESPECIALIZACAO = 0.40  # Cidade especializada no recurso refinado -> 36,7% (com a base)
+BONUS_FOCUS = 0.59  # Foco -> 43,5% (com a base) ou 53,9% (com base e especialização)
+
+# Cidade -> trechos de ID que recebem o bônus de especialização de refino
+ESPECIALIZACOES = {
+    "Fort Sterling": ("_PLANKS",),
+    "Lymhurst": ("_CLOTH",),
+    "Bridgewatch": ("_STONEBLOCK",),
+    "Martlock": ("_LEATHER",),
+    "Thetford": ("_METALBAR",),
+}
+
+ChaveReceita = Tuple[str, int]  # (item produzido, variante)
+
+
+def taxa_retorno(bonus: float) -> float:
+    """Taxa de retorno de recursos para um bônus de produção"""
+    return 1.0 - 1.0 / (1.0 + bonus)
+
+
+class CraftingCalculator:
+    """Lucro de fabricação/refino por receita, com recálculo incremental
+
+    Os resultados ficam memorizados por (cidade, receita). Ao receber um novo
+    snapshot de preços, apenas as receitas cujo produto ou algum insumo mudou
+    de preço naquela cidade são recalculadas.
+    """
+
+    def __init__(self, receitas: Dict[str, List[dict]], premium: bool = True,
+                 usar_focus: bool = False, especializacoes: Dict[str, tuple] = None):
+        self.receitas = receitas
+        self.premium = premium
+        self.usar_focus = usar_focus
+        self.especializacoes = especializacoes if especializacoes is not None else ESPECIALIZACOES
+
+        # item (produto ou insumo) -> receitas que dependem do seu preço
+        self._dependentes: Dict[str, Set[ChaveReceita]] = {}
+        for item_id, variantes in receitas.items():
+            for variante, receita in enumerate(variantes):
+                chave = (item_id, variante)
+                self._dependentes.setdefault(item_id, set()).add(chave)
+                for recurso in receita["recursos"]:
+                    self._dependentes.setdefault(recurso["id"], set()).add(chave)
+
+        self._precos: Dict[Tuple[str, str], float] = {}  # (cidade, item) -> preço
+        self._resultados: Dict[Tuple[str, ChaveReceita], dict] = {}
+
+    @property
+    def taxa_venda(self) -> float:
+        return (TAXA_MERCADO_PREMIUM if self.premium else TAXA_MERCADO) + TAXA_SETUP
+
+    def taxa_retorno_cidade(self, cidade: str, item_id: str) -> float:
+        """Taxa de retorno aplicada ao fabricar `item_id` em `cidade`"""
+        bonus = BONUS_BASE
+        if any(trecho in item_id for trecho in self.especializacoes.get(cidade, ())):
+            bonus += BONUS_ESPECIALIZACAO
+        if self.usar_focus:
+            bonus += BONUS_FOCUS
+        return taxa_retorno(bonus)
+
+    def _calcular(self, cidade: str, chave: ChaveReceita) -> Optional[dict]:
+        item_id, variante = chave
+        receita = self.receitas[item_id][variante]
+
+        preco_venda = self._precos.get((cidade, item_id))
+        if not preco_venda:
+            return None
+
+        retorno = self.taxa_retorno_cidade(cidade, item_id)
+        custo = float(receita.get("silver", 0))
+        for recurso in receita["recursos"]:
+            preco = self._precos.get((cidade, recurso["id"]))
+            if not preco:
+                return None
+            quantidade = recurso["quantidade"]
+            if not recurso.get("artefato"):
+                quantidade *= 1.0 - retorno
+            custo += quantidade * preco
+
+        receita_bruta = preco_venda * receita.get("quantidade", 1)
+        lucro = receita_bruta * (1.0 - self.taxa_venda) - custo
+        return {
+            "item_id": item_id,
+            "variante": variante,
+            "cidade": cidade,
+            "custo": custo,
+            "venda": receita_bruta,
+            "lucro": lucro,
+            "margem": lucro / custo if custo else None,
+            "focus": receita.get("focus", 0) if self.usar_focus else 0,
+        }
+
+    def atualizar_precos(self, precos: pd.DataFrame, coluna: str = "sell_price_min") -> int:
+        """Aplica um novo snapshot de preços e recalcula só as receitas afetadas
+
+        Retorna o número de receitas recalculadas.
+        """
+        if precos is None or precos.empty:
+            return 0
+        if "quality" in precos:
+            precos = precos[precos["quality"] == 1]
+
+        novos = {
+            (cidade, item_id): float(preco)
+            for cidade, item_id, preco in zip(precos["city"], precos["item_id"], precos[coluna])
+        }
+
+        sujos: Set[Tuple[str, ChaveReceita]] = set()
+        for (cidade, item_id), preco in novos.items():
+            if self._precos.get((cidade, item_id)) != preco:
+                self._precos[(cidade, item_id)] = preco
+                for chave in self._dependentes.get(item_id, ()):
+                    sujos.add((cidade, chave))
+
+        for cidade, chave in sujos:
+            resultado = self._calcular(cidade, chave)
+            if resultado is None:
+                self._resultados.pop((cidade, chave), None)
+            else:
+                self._resultados[(cidade, chave)] = resultado
+        return len(sujos)
+
+    def insumos(self, item_ids: Iterable[str]) -> Set[str]:
+        """IDs de todos os itens cujo preço é necessário para as receitas informadas"""
+        necessarios = set()
+        for item_id in item_ids:
+            if item_id not in self.receitas:
+                continue
+            necessarios.add(item_id)
+            for receita in self.receitas[item_id]:
+                necessarios.update(recurso["id"] for recurso in receita["recursos"])
+        return necessarios
+
+    def resultados(self, cidade: Optional[str] = None, top_n: Optional[int] = None) -> pd.DataFrame:
+        """Receitas calculadas, da mais para a menos lucrativa"""
+        linhas = [
+            resultado for (cidade_resultado, _), resultado in self._resultados.items()
+            if cidade is None or cidade_resultado == cidade
+        ]
+        df = pd.DataFrame(linhas, columns=[
+            "item_id", "variante", "cidade", "custo", "venda", "lucro", "margem", "focus"
+        ])
+        df = df.sort_values("lucro", ascending=False, ignore_index=True)
+        return df.head(top_n) if top_n is not None else df
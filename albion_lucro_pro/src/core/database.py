@@ -1,43 +1,352 @@
 import json
 import os
-from typing import Dict, List
+import pickle
+import sqlite3
+import threading
+from typing import Dict, Iterable, List, Optional
 from pathlib import Path
 
+from core.catalogo import IMG_URL, Catalogo
+from core.metrics import METRICAS
+
+SNAPSHOT_VERSION = 2
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS categorias (
+    id INTEGER PRIMARY KEY,
+    nome TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS itens (
+    id TEXT PRIMARY KEY,
+    tier INTEGER,
+    categoria_id INTEGER REFERENCES categorias(id),
+    subcategoria TEXT,
+    encantamento INTEGER NOT NULL DEFAULT 0,
+    qualidade INTEGER,
+    last_updated TEXT
+);
+CREATE TABLE IF NOT EXISTS nomes (
+    item_id TEXT NOT NULL REFERENCES itens(id) ON DELETE CASCADE,
+    idioma TEXT NOT NULL,
+    nome TEXT NOT NULL,
+    PRIMARY KEY (item_id, idioma)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS meta (
+    chave TEXT PRIMARY KEY,
+    valor TEXT
+);
+CREATE TABLE IF NOT EXISTS receitas (
+    id INTEGER PRIMARY KEY,
+    item_id TEXT NOT NULL REFERENCES itens(id) ON DELETE CASCADE,
+    variante INTEGER NOT NULL,
+    silver INTEGER NOT NULL DEFAULT 0,
+    focus INTEGER NOT NULL DEFAULT 0,
+    quantidade INTEGER NOT NULL DEFAULT 1,
+    UNIQUE (item_id, variante)
+);
+CREATE TABLE IF NOT EXISTS receita_recursos (
+    receita_id INTEGER NOT NULL REFERENCES receitas(id) ON DELETE CASCADE,
+    recurso_id TEXT NOT NULL,
+    quantidade INTEGER NOT NULL,
+    artefato INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (receita_id, recurso_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_receita_recursos_recurso ON receita_recursos(recurso_id);
+CREATE INDEX IF NOT EXISTS idx_itens_tier ON itens(tier);
+CREATE INDEX IF NOT EXISTS idx_itens_categoria ON itens(categoria_id);
+CREATE INDEX IF NOT EXISTS idx_itens_encantamento ON itens(encantamento);
+CREATE INDEX IF NOT EXISTS idx_itens_filtros ON itens(categoria_id, tier, encantamento);
+"""
+
+SELECT_ITENS = """
+SELECT i.id, i.tier, c.nome, i.subcategoria, i.encantamento, i.qualidade, i.last_updated,
+       pt.nome, en.nome
+FROM itens i
+LEFT JOIN categorias c ON c.id = i.categoria_id
+LEFT JOIN nomes pt ON pt.item_id = i.id AND pt.idioma = 'PT-BR'
+LEFT JOIN nomes en ON en.item_id = i.id AND en.idioma = 'EN-US'
+"""
+
+
+def _tier_para_int(tier) -> Optional[int]:
+    """Converte "T4"/4 para 4 (None se desconhecido)"""
+    if tier is None:
+        return None
+    texto = str(tier).upper().lstrip("T")
+    return int(texto) if texto.isdigit() else None
+
+
 class ItemDatabase:
-    def __init__(self, items_path: str = "./data/itens.json", 
+    def __init__(self, db_path: str = "./data/albion.db",
+                 items_path: str = "./data/itens.json",
                  categories_path: str = "./data/categorias.json"):
+        self.db_path = db_path
+        # Cópia binária do catálogo para a abertura não depender dos JOINs do SQLite
+        self.snapshot_path = Path(db_path).with_name("catalogo.pkl")
+        # Caches JSON legados, importados uma única vez para o SQLite
         self.items_path = items_path
         self.categories_path = categories_path
         self._ensure_data_dir()
 
+        self._lock = threading.RLock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA foreign_keys=ON")
+        self.conn.executescript(SCHEMA)
+        self._migrar_json()
+
     def _ensure_data_dir(self):
         """Garante que o diretório data existe"""
-        Path("./data").mkdir(exist_ok=True)
+        Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
 
-    def load_items(self) -> Dict[str, dict]:
-        """Carrega itens do cache local"""
+    def _migrar_json(self):
+        """Importa o itens.json legado quando o banco ainda está vazio"""
+        if not self.needs_initial_load() or not os.path.exists(self.items_path):
+            return
         try:
             with open(self.items_path, "r", encoding="utf-8") as f:
-                return json.load(f)
-        except (FileNotFoundError, json.JSONDecodeError):
-            return {}
+                items = json.load(f)
+        except json.JSONDecodeError:
+            return
+        if items:
+            self.save_all_data(items, {})
+
+    def _categoria_id(self, nome: Optional[str]) -> Optional[int]:
+        if not nome:
+            return None
+        self.conn.execute("INSERT OR IGNORE INTO categorias (nome) VALUES (?)", (nome,))
+        return self.conn.execute("SELECT id FROM categorias WHERE nome = ?", (nome,)).fetchone()[0]
+
+    def _upsert(self, item_id: str, data: dict, categoria: Optional[str] = None):
+        self.conn.execute(
+            """INSERT INTO itens (id, tier, categoria_id, subcategoria, encantamento, qualidade, last_updated)
+               VALUES (?, ?, ?, ?, ?, ?, ?)
+               ON CONFLICT(id) DO UPDATE SET
+                   tier = excluded.tier,
+                   categoria_id = excluded.categoria_id,
+                   subcategoria = excluded.subcategoria,
+                   encantamento = excluded.encantamento,
+                   qualidade = excluded.qualidade,
+                   last_updated = excluded.last_updated""",
+            (
+                item_id,
+                _tier_para_int(data.get("tier")),
+                self._categoria_id(data.get("categoria") or categoria),
+                data.get("subcategoria"),
+                data.get("encantamento") or 0,
+                data.get("qualidade"),
+                data.get("last_updated"),
+            )
+        )
+        nomes = [("PT-BR", data.get("nome")), ("EN-US", data.get("nome_en"))]
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO nomes (item_id, idioma, nome) VALUES (?, ?, ?)",
+            [(item_id, idioma, nome) for idioma, nome in nomes if nome]
+        )
+        if "receitas" in data:
+            self._salvar_receitas(item_id, data["receitas"])
+
+    def _salvar_receitas(self, item_id: str, receitas: List[dict]):
+        self.conn.execute("DELETE FROM receitas WHERE item_id = ?", (item_id,))
+        for variante, receita in enumerate(receitas):
+            receita_id = self.conn.execute(
+                "INSERT INTO receitas (item_id, variante, silver, focus, quantidade) VALUES (?, ?, ?, ?, ?)",
+                (item_id, variante, receita.get("silver", 0), receita.get("focus", 0),
+                 receita.get("quantidade", 1))
+            ).lastrowid
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO receita_recursos (receita_id, recurso_id, quantidade, artefato) "
+                "VALUES (?, ?, ?, ?)",
+                [(receita_id, r["id"], r["quantidade"], int(r.get("artefato", False)))
+                 for r in receita.get("recursos", [])]
+            )
+
+    def _incrementar_revisao(self):
+        self.conn.execute(
+            """INSERT INTO meta (chave, valor) VALUES ('revisao', '1')
+               ON CONFLICT(chave) DO UPDATE SET valor = CAST(valor AS INTEGER) + 1"""
+        )
+
+    def _linhas_para_dict(self, linhas: Iterable[tuple]) -> Dict[str, dict]:
+        items = {}
+        for item_id, tier, categoria, subcategoria, encantamento, qualidade, updated, nome, nome_en in linhas:
+            items[item_id] = {
+                "id": item_id,
+                "nome": nome or item_id,
+                "nome_en": nome_en or "",
+                "tier": f"T{tier}" if tier is not None else "T?",
+                "categoria": categoria,
+                "subcategoria": subcategoria,
+                "encantamento": encantamento,
+                "qualidade": qualidade,
+                "img_url": IMG_URL.format(item_id),
+                "last_updated": updated,
+            }
+        return items
+
+    @METRICAS.cronometrado("db.query")
+    def _query(self, where: str = "", params: tuple = ()) -> Dict[str, dict]:
+        with self._lock:
+            linhas = self.conn.execute(f"{SELECT_ITENS} {where}", params).fetchall()
+        return self._linhas_para_dict(linhas)
+
+    def load_items(self) -> Dict[str, dict]:
+        """Carrega todos os itens do banco local"""
+        return self._query()
 
     def load_categories(self) -> Dict[str, str]:
-        """Carrega categorias do cache local"""
+        """Carrega o mapeamento item -> categoria"""
+        with self._lock:
+            linhas = self.conn.execute(
+                "SELECT i.id, c.nome FROM itens i JOIN categorias c ON c.id = i.categoria_id"
+            ).fetchall()
+        return dict(linhas)
+
+    @METRICAS.cronometrado("db.load_catalogo")
+    def load_catalogo(self) -> Catalogo:
+        """Todos os itens no formato compacto (sem um dict por item)"""
+        catalogo = Catalogo()
+        with self._lock:
+            linhas = self.conn.execute(SELECT_ITENS).fetchall()
+        for item_id, tier, categoria, subcategoria, encantamento, qualidade, updated, nome, nome_en in linhas:
+            catalogo.adicionar(item_id, nome, nome_en, tier, categoria, subcategoria,
+                               encantamento, qualidade, updated)
+        return catalogo
+
+    @METRICAS.cronometrado("db.write_snapshot")
+    def write_snapshot(self) -> Catalogo:
+        """Grava o catálogo atual em catalogo.pkl (escrita atômica) e o retorna"""
+        with self._lock:
+            revisao = self.revisao()
+            catalogo = self.load_catalogo()
+        tmp_path = self.snapshot_path.with_suffix(".tmp")
+        with open(tmp_path, "wb") as f:
+            pickle.dump({"versao": SNAPSHOT_VERSION, "revisao": revisao, "catalogo": catalogo},
+                        f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, self.snapshot_path)
+        return catalogo
+
+    @METRICAS.cronometrado("db.load_catalog")
+    def load_catalog(self) -> Catalogo:
+        """Catálogo a partir do snapshot binário, regravando-o se estiver desatualizado"""
         try:
-            with open(self.categories_path, "r", encoding="utf-8") as f:
-                return json.load(f)
-        except (FileNotFoundError, json.JSONDecodeError):
-            return {}
+            with open(self.snapshot_path, "rb") as f:
+                snapshot = pickle.load(f)
+            if snapshot.get("versao") == SNAPSHOT_VERSION and snapshot.get("revisao") == self.revisao():
+                return snapshot["catalogo"]
+        except (OSError, EOFError, pickle.UnpicklingError, AttributeError):
+            pass
+        try:
+            return self.write_snapshot()
+        except OSError:
+            return self.load_catalogo()
 
+    @METRICAS.cronometrado("db.save_all_data")
     def save_all_data(self, items: Dict[str, dict], categories: Dict[str, str]):
-        """Salva todos os dados no cache"""
-        with open(self.items_path, "w", encoding="utf-8") as f:
-            json.dump(items, f, indent=4, ensure_ascii=False)
-        
-        with open(self.categories_path, "w", encoding="utf-8") as f:
-            json.dump(categories, f, indent=4, ensure_ascii=False)
+        """Substitui todo o catálogo em uma única transação"""
+        with self._lock, self.conn:
+            self.conn.execute("DELETE FROM nomes")
+            self.conn.execute("DELETE FROM itens")
+            for item_id, data in items.items():
+                self._upsert(item_id, data, categories.get(item_id))
+            self.conn.execute(
+                "DELETE FROM categorias WHERE id NOT IN (SELECT DISTINCT categoria_id FROM itens "
+                "WHERE categoria_id IS NOT NULL)"
+            )
+            self._incrementar_revisao()
+
+    def save_item(self, item_id: str, item_data: dict):
+        """Insere ou atualiza um único item"""
+        with self._lock, self.conn:
+            self._upsert(item_id, item_data)
+            self._incrementar_revisao()
+
+    @METRICAS.cronometrado("db.apply_changes")
+    def apply_changes(self, upserts: Dict[str, dict], deletes: Iterable[str] = ()):
+        """Aplica inserções/atualizações e remoções em uma única transação"""
+        deletes = list(deletes)
+        if not upserts and not deletes:
+            return
+        with self._lock, self.conn:
+            for item_id, data in upserts.items():
+                self._upsert(item_id, data)
+            self.conn.executemany("DELETE FROM itens WHERE id = ?", [(i,) for i in deletes])
+            self._incrementar_revisao()
+
+    def get_item(self, item_id: str) -> Optional[dict]:
+        return self._query("WHERE i.id = ?", (item_id,)).get(item_id)
+
+    def get_items_by_ids(self, item_ids: Iterable[str]) -> Dict[str, dict]:
+        item_ids = list(dict.fromkeys(item_ids))
+        if not item_ids:
+            return {}
+        return self._query(f"WHERE i.id IN ({','.join('?' * len(item_ids))})", tuple(item_ids))
+
+    def get_items_by_category(self, categoria: str) -> Dict[str, dict]:
+        """Itens de uma categoria (busca pelo índice de categoria)"""
+        return self._query("WHERE c.nome = ?", (categoria,))
+
+    def get_items_by_tier(self, tier) -> Dict[str, dict]:
+        """Itens de um tier, aceitando "T4" ou 4"""
+        return self._query("WHERE i.tier = ?", (_tier_para_int(tier),))
+
+    def get_items_by_enchantment(self, encantamento: int) -> Dict[str, dict]:
+        return self._query("WHERE i.encantamento = ?", (encantamento,))
+
+    def get_items_filtered(self, categorias: Optional[List[str]] = None, tier=None,
+                           encantamento: Optional[int] = None) -> Dict[str, dict]:
+        """Combina os filtros de categoria, tier e encantamento em uma única consulta"""
+        condicoes, params = [], []
+        if categorias:
+            condicoes.append(f"c.nome IN ({','.join('?' * len(categorias))})")
+            params.extend(categorias)
+        if tier is not None:
+            condicoes.append("i.tier = ?")
+            params.append(_tier_para_int(tier))
+        if encantamento is not None:
+            condicoes.append("i.encantamento = ?")
+            params.append(encantamento)
+        where = f"WHERE {' AND '.join(condicoes)}" if condicoes else ""
+        return self._query(where, tuple(params))
+
+    @METRICAS.cronometrado("db.load_recipes")
+    def load_recipes(self) -> Dict[str, List[dict]]:
+        """Carrega as receitas de fabricação/refino agrupadas por item produzido"""
+        with self._lock:
+            linhas = self.conn.execute(
+                """SELECT r.item_id, r.variante, r.silver, r.focus, r.quantidade,
+                          rr.recurso_id, rr.quantidade, rr.artefato
+                   FROM receitas r
+                   JOIN receita_recursos rr ON rr.receita_id = r.id
+                   ORDER BY r.item_id, r.variante, rr.recurso_id"""
+            ).fetchall()
+
+        receitas: Dict[str, List[dict]] = {}
+        for item_id, variante, silver, focus, quantidade, recurso_id, qtd, artefato in linhas:
+            variantes = receitas.setdefault(item_id, [])
+            if len(variantes) <= variante:
+                variantes.append({"silver": silver, "focus": focus, "quantidade": quantidade, "recursos": []})
+            variantes[variante]["recursos"].append(
+                {"id": recurso_id, "quantidade": qtd, "artefato": bool(artefato)}
+            )
+        return receitas
+
+    def get_meta(self, chave: str) -> Optional[str]:
+        with self._lock:
+            linha = self.conn.execute("SELECT valor FROM meta WHERE chave = ?", (chave,)).fetchone()
+        return linha[0] if linha else None
+
+    def set_meta(self, chave: str, valor: Optional[str]):
+        with self._lock, self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO meta (chave, valor) VALUES (?, ?)", (chave, valor)
+            )
+
+    def revisao(self) -> str:
+        """Contador incrementado a cada escrita (usado para invalidar índices derivados)"""
+        return self.get_meta("revisao") or "0"
 
     def needs_initial_load(self) -> bool:
         """Verifica se precisa carregar dados iniciais"""
-        return not (os.path.exists(self.items_path) and os.path.exists(self.categories_path))
\ No newline at end of file
+        with self._lock:
+            return self.conn.execute("SELECT 1 FROM itens LIMIT 1").fetchone() is None
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+from typing import Dict, Iterable, List, Mapping, Optional
+from core.catalogo import Catalogo
+from core.lazy import lazy_import
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+FACETAS = ("categoria", "tier", "encantamento", "cidade")
+
+
+class FacetIndex:
+    """Máscaras booleanas pré-computadas por valor de faceta sobre o catálogo
+
+    Cada valor (ex: categoria "weapon", tier "T4") guarda um vetor de bits do
+    tamanho do catálogo. Filtros combinam máscaras com OR dentro da faceta e
+    AND entre facetas, sem percorrer os itens em Python.
+    """
+
+    def __init__(self, item_ids: List[str]):
+        self.item_ids = np.asarray(item_ids, dtype=object)
+        self.posicoes = {item_id: pos for pos, item_id in enumerate(item_ids)}
+        self.mascaras: Dict[str, Dict[object, np.ndarray]] = {faceta: {} for faceta in FACETAS}
+        # Itens com preços já consultados; os demais não são excluídos pelo filtro de cidade
+        self.consultados = np.zeros(len(item_ids), dtype=bool)
+
+    @classmethod
+    def build(cls, itens: Mapping[str, dict]) -> "FacetIndex":
+        """Constrói as máscaras de categoria, tier e encantamento"""
+        index = cls(list(itens))
+        for faceta, campo in (("categoria", "categoria"), ("tier", "tier"), ("encantamento", "encantamento")):
+            if isinstance(itens, Catalogo):
+                coluna = itens.coluna(campo)
+            else:
+                coluna = [dados.get(campo) for dados in itens.values()]
+            codigos, valores = pd.factorize(pd.Series(coluna))
+            for codigo, valor in enumerate(valores):
+                index.mascaras[faceta][valor] = codigos == codigo
+        return index
+
+    def _vazia(self) -> np.ndarray:
+        return np.zeros(len(self.item_ids), dtype=bool)
+
+    def marcar_disponibilidade(self, precos: pd.DataFrame):
+        """Marca os itens com ordens de venda em cada cidade a partir de um frame de preços"""
+        if precos is None or precos.empty:
+            return
+        self.consultados[[self.posicoes[i] for i in precos["item_id"].unique() if i in self.posicoes]] = True
+        com_preco = precos[precos["sell_price_min"] > 0]
+        cidades = self.mascaras["cidade"]
+        for cidade, item_ids in com_preco.groupby("city")["item_id"]:
+            posicoes = [self.posicoes[i] for i in item_ids.unique() if i in self.posicoes]
+            mascara = cidades.setdefault(cidade, self._vazia())
+            mascara[posicoes] = True
+
+    def _mascara_faceta(self, faceta: str, valores: Optional[Iterable]) -> Optional[np.ndarray]:
+        """OR das máscaras dos valores selecionados (None = sem filtro)"""
+        if valores is None:
+            return None
+        valores = list(valores)
+        if not valores:
+            return None
+        resultado = ~self.consultados if faceta == "cidade" else self._vazia()
+        for valor in valores:
+            mascara = self.mascaras[faceta].get(valor)
+            if mascara is not None:
+                resultado |= mascara
+        return resultado
+
+    def _combinar(self, selecao: Dict[str, Optional[Iterable]], ignorar: str = None) -> np.ndarray:
+        resultado = np.ones(len(self.item_ids), dtype=bool)
+        for faceta in FACETAS:
+            if faceta == ignorar:
+                continue
+            mascara = self._mascara_faceta(faceta, selecao.get(faceta))
+            if mascara is not None:
+                resultado &= mascara
+        return resultado
+
+    def filtrar(self, **selecao) -> List[str]:
+        """IDs dos itens que atendem a todos os filtros (ex: categoria=["weapon"], tier=["T4"])"""
+        return self.item_ids[self._combinar(selecao)].tolist()
+
+    def contagens(self, **selecao) -> Dict[str, Dict[object, int]]:
+        """Quantos itens cada valor de faceta teria, mantendo os filtros das outras facetas"""
+        contagens = {}
+        for faceta in FACETAS:
+            base = self._combinar(selecao, ignorar=faceta)
+            contagens[faceta] = {
+                valor: int(np.count_nonzero(base & mascara))
+                for valor, mascara in self.mascaras[faceta].items()
+            }
+        return contagens
+
+    def valores(self, faceta: str) -> List:
+        """Valores conhecidos de uma faceta, ordenados"""
+        return sorted((v for v in self.mascaras[faceta] if v is not None), key=str)
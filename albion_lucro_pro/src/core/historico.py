@@ -0,0 +1,228 @@
+from __future__ import annotations
+
+import os
+import re
+import threading
+from datetime import date, datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set
+from core.lazy import lazy_import
+
+pd = lazy_import("pandas")
+pa = lazy_import("pyarrow")
+feather = lazy_import("pyarrow.feather")
+pq = lazy_import("pyarrow.parquet")
+
+# Chaves que identificam um ponto; reescritas de janelas sobrepostas ficam com a última versão
+CHAVE_HISTORICO = ["location", "quality", "timestamp"]
+CHAVE_PRECOS = ["city", "quality", "sell_price_min_date", "buy_price_max_date"]
+FREQUENCIAS = {"hora": "1h", "dia": "1D"}
+
+_INSEGURO = re.compile(r"[^A-Za-z0-9_@.-]")
+
+
+def _escrever_parquet(df: pd.DataFrame, path: Path):
+    """Grava um Parquet via arquivo temporário + rename"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(".tmp")
+    pq.write_table(pa.Table.from_pandas(df, preserve_index=False), tmp_path)
+    os.replace(tmp_path, path)
+
+
+def _ler_parquet(path: Path) -> pd.DataFrame:
+    return pq.read_table(path, memory_map=True).to_pandas()
+
+
+def _escrever_arrow(df: pd.DataFrame, path: Path):
+    """Grava um arquivo Arrow IPC sem compressão (lido via memory-map)"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(".tmp")
+    feather.write_feather(pa.Table.from_pandas(df, preserve_index=False), tmp_path,
+                          compression="uncompressed")
+    os.replace(tmp_path, path)
+
+
+def _ler_arrow(path: Path) -> pa.Table:
+    return feather.read_table(path, memory_map=True)
+
+
+def pontos_historico(historico: list) -> pd.DataFrame:
+    """Achata a resposta do /history (séries com "data") em um ponto por linha"""
+    linhas = [
+        {
+            "item_id": serie["item_id"],
+            "location": serie["location"],
+            "quality": serie.get("quality", 1),
+            "timestamp": ponto["timestamp"],
+            "avg_price": ponto.get("avg_price"),
+            "item_count": ponto.get("item_count", 0),
+        }
+        for serie in historico
+        for ponto in serie.get("data", [])
+    ]
+    df = pd.DataFrame(linhas, columns=["item_id", "location", "quality", "timestamp", "avg_price", "item_count"])
+    df["timestamp"] = pd.to_datetime(df["timestamp"], errors="coerce", format="ISO8601")
+    return df
+
+
+def series_historico(pontos: pd.DataFrame) -> list:
+    """Inverso de pontos_historico: volta ao formato de resposta do /history"""
+    series = []
+    for (item_id, location, quality), grupo in pontos.groupby(["item_id", "location", "quality"], sort=False):
+        grupo = grupo.sort_values("timestamp")
+        series.append({
+            "item_id": item_id,
+            "location": location,
+            "quality": int(quality),
+            "data": [
+                {"timestamp": ts.isoformat(), "avg_price": preco, "item_count": int(volume)}
+                for ts, preco, volume in zip(grupo["timestamp"], grupo["avg_price"].tolist(),
+                                             grupo["item_count"].tolist())
+            ],
+        })
+    return series
+
+
+class PriceWarehouse:
+    """Armazém local de séries de preço em Parquet, particionado por item e dia
+
+    Layout:
+        <base>/historico/<item>/<AAAA-MM-DD>.parquet   pontos do /history
+        <base>/precos/<item>/<AAAA-MM-DD>.parquet      snapshots do /prices (dia da coleta)
+        <base>/rollups/<hora|dia>/<item>.arrow         min/avg/max e volume agregados
+
+    Os pontos brutos ficam em Parquet (compacto); os rollups, lidos a cada
+    gráfico, ficam em Arrow IPC sem compressão para leitura via memory-map.
+    """
+
+    def __init__(self, base_path: str = "./data/warehouse"):
+        self.base_path = Path(base_path)
+        self._lock = threading.Lock()
+
+    def _dir(self, conjunto: str, item_id: str) -> Path:
+        return self.base_path / conjunto / _INSEGURO.sub("_", item_id)
+
+    def _rollup_path(self, frequencia: str, item_id: str) -> Path:
+        return self.base_path / "rollups" / frequencia / f"{_INSEGURO.sub('_', item_id)}.arrow"
+
+    # ---------- escrita ----------
+
+    def _anexar(self, conjunto: str, df: pd.DataFrame, coluna_data: str,
+                chave: List[str]) -> Dict[str, Set[date]]:
+        """Mescla os pontos novos nas partições (item, dia) e retorna os dias alterados por item"""
+        df = df.dropna(subset=[coluna_data])
+        alterados: Dict[str, Set[date]] = {}
+        for (item_id, dia), novos in df.groupby(["item_id", df[coluna_data].dt.date]):
+            path = self._dir(conjunto, item_id) / f"{dia.isoformat()}.parquet"
+            if path.exists():
+                existentes = _ler_parquet(path)
+                novos = pd.concat([existentes, novos], ignore_index=True)
+            novos = novos.drop_duplicates(subset=chave, keep="last").sort_values(coluna_data)
+            _escrever_parquet(novos, path)
+            alterados.setdefault(item_id, set()).add(dia)
+        return alterados
+
+    def append_history(self, historico: list):
+        """Grava a resposta crua do endpoint /history"""
+        df = pontos_historico(historico)
+        if df.empty:
+            return
+
+        with self._lock:
+            alterados = self._anexar("historico", df, "timestamp", CHAVE_HISTORICO)
+            for item_id, dias in alterados.items():
+                self._atualizar_rollups(item_id, dias)
+
+    def append_prices(self, precos: pd.DataFrame):
+        """Grava um snapshot de preços atuais (frame do /prices), particionado pelo dia da coleta"""
+        if precos is None or precos.empty:
+            return
+        df = precos.copy()
+        # Datas "0001-01-01" indicam que o lado não tem ordens; a linha fica se o outro lado tiver
+        valida = pd.Series(False, index=df.index)
+        for coluna in ("sell_price_min_date", "buy_price_max_date"):
+            if coluna in df:
+                df[coluna] = pd.to_datetime(df[coluna], errors="coerce", format="ISO8601")
+                valida |= df[coluna] > pd.Timestamp("2000-01-01")
+        df = df[valida]
+        if df.empty:
+            return
+        # UTC sem fuso, como as datas da API
+        df["coletado_em"] = pd.Timestamp.now(tz="UTC").tz_localize(None)
+        chave = [c for c in CHAVE_PRECOS if c in df]
+        with self._lock:
+            self._anexar("precos", df, "coletado_em", chave)
+
+    def _atualizar_rollups(self, item_id: str, dias: Set[date]):
+        """Recalcula os agregados por hora e por dia apenas dos dias alterados"""
+        pontos = pd.concat(
+            [_ler_parquet(self._dir("historico", item_id) / f"{dia.isoformat()}.parquet") for dia in dias],
+            ignore_index=True
+        )
+        for nome, frequencia in FREQUENCIAS.items():
+            agrupado = pontos.groupby(
+                ["location", "quality", pd.Grouper(key="timestamp", freq=frequencia)]
+            ).agg(
+                preco_min=("avg_price", "min"),
+                preco_medio=("avg_price", "mean"),
+                preco_max=("avg_price", "max"),
+                volume=("item_count", "sum"),
+            ).reset_index()
+            agrupado.insert(0, "item_id", item_id)
+
+            path = self._rollup_path(nome, item_id)
+            if path.exists():
+                anterior = _ler_arrow(path).to_pandas()
+                anterior = anterior[~anterior["timestamp"].dt.date.isin(dias)]
+                agrupado = pd.concat([anterior, agrupado], ignore_index=True)
+            _escrever_arrow(agrupado.sort_values("timestamp", kind="stable"), path)
+
+    # ---------- leitura ----------
+
+    def _ler_intervalo(self, conjunto: str, item_id: str, inicio: Optional[datetime],
+                       fim: Optional[datetime]) -> pd.DataFrame:
+        diretorio = self._dir(conjunto, item_id)
+        if not diretorio.exists():
+            return pd.DataFrame()
+        dia_inicio = inicio.date().isoformat() if inicio else ""
+        dia_fim = fim.date().isoformat() if fim else "9999"
+        # Os nomes AAAA-MM-DD ordenam lexicograficamente, então o filtro não abre arquivos
+        particoes = sorted(
+            p for p in diretorio.glob("*.parquet") if dia_inicio <= p.stem <= dia_fim
+        )
+        if not particoes:
+            return pd.DataFrame()
+        return pd.concat([_ler_parquet(p) for p in particoes], ignore_index=True)
+
+    def query(self, item_ids: Iterable[str], inicio: Optional[datetime] = None,
+              fim: Optional[datetime] = None, frequencia: Optional[str] = None,
+              location: Optional[str] = None, quality: Optional[int] = None) -> pd.DataFrame:
+        """Consulta local do histórico; frequencia "hora"/"dia" lê os rollups"""
+        if frequencia is None:
+            frames = [self._ler_intervalo("historico", item_id, inicio, fim) for item_id in item_ids]
+            frames = [df for df in frames if not df.empty]
+            if not frames:
+                return pd.DataFrame()
+            df = pd.concat(frames, ignore_index=True)
+        else:
+            paths = [self._rollup_path(frequencia, item_id) for item_id in item_ids]
+            tabelas = [_ler_arrow(path) for path in paths if path.exists()]
+            if not tabelas:
+                return pd.DataFrame()
+            df = pa.concat_tables(tabelas).to_pandas()
+
+        mascara = pd.Series(True, index=df.index)
+        if inicio is not None:
+            mascara &= df["timestamp"] >= pd.Timestamp(inicio)
+        if fim is not None:
+            mascara &= df["timestamp"] <= pd.Timestamp(fim)
+        if location is not None:
+            mascara &= df["location"] == location
+        if quality is not None:
+            mascara &= df["quality"] == quality
+        return df[mascara].reset_index(drop=True)
+
+    def query_prices(self, item_id: str, inicio: Optional[datetime] = None,
+                     fim: Optional[datetime] = None) -> pd.DataFrame:
+        """Snapshots de preços atuais gravados para um item, filtrados pelo dia da coleta"""
+        return self._ler_intervalo("precos", item_id, inicio, fim)
@@ -0,0 +1,269 @@
+from __future__ import annotations
+
+import atexit
+import hashlib
+import io
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional
+from urllib.parse import quote
+
+from core.catalogo import IMG_URL
+from core.lazy import lazy_import
+from core.metrics import METRICAS
+from core.resilience import ClienteHTTP, TokenBucket
+
+Image = lazy_import("PIL.Image")
+
+TAMANHO_RENDER = 64  # Lado (px) pedido ao render.albiononline.com (?size=)
+TAMANHO_MINIATURA = 20  # Lado (px) das miniaturas mantidas em memória
+MAX_PARALELO = 8  # Downloads simultâneos
+MAX_MEMORIA = 1_000  # Miniaturas decodificadas mantidas em memória
+MAX_DISCO = 100 * 2 ** 20  # Bytes de PNGs guardados em disco
+TAXA_RENDER = 20  # Requisições por segundo ao serviço de renders (separado da Data API)
+
+
+class DiscoIcones:
+    """Cache de PNGs em disco endereçado pelo conteúdo, com despejo por tamanho
+
+    Cada arquivo é gravado com o SHA-256 do conteúdo como nome, então URLs com
+    a mesma imagem compartilham o arquivo. O índice (URL -> hash) fica em ordem
+    de uso; ao passar de `max_bytes`, as URLs menos usadas saem primeiro e um
+    arquivo só é apagado quando nenhuma URL aponta mais para ele.
+    """
+
+    def __init__(self, diretorio: str = "./data/icones", max_bytes: int = MAX_DISCO):
+        self.diretorio = Path(diretorio)
+        self.max_bytes = max_bytes
+        self.indice_path = self.diretorio / "indice.json"
+        self.total_bytes = 0
+        self._indice: "OrderedDict[str, str]" = OrderedDict()  # URL -> hash, do menos ao mais usado
+        self._tamanhos: Dict[str, int] = {}  # hash -> bytes
+        self._referencias: Dict[str, int] = {}  # hash -> URLs que apontam para ele
+        self._lock = threading.Lock()
+        self._alterado = False
+        self.carregar()
+        atexit.register(self.salvar)
+
+    def _path(self, hash_: str) -> Path:
+        return self.diretorio / hash_[:2] / f"{hash_}.png"
+
+    def _referenciar(self, url: str, hash_: str, tamanho: int):
+        self._indice[url] = hash_
+        self._referencias[hash_] = self._referencias.get(hash_, 0) + 1
+        if hash_ not in self._tamanhos:
+            self._tamanhos[hash_] = tamanho
+            self.total_bytes += tamanho
+
+    def _soltar(self, url: str) -> Optional[str]:
+        """Remove a URL do índice; retorna o hash se o arquivo ficou sem referências"""
+        hash_ = self._indice.pop(url)
+        self._referencias[hash_] -= 1
+        if self._referencias[hash_]:
+            return None
+        del self._referencias[hash_]
+        self.total_bytes -= self._tamanhos.pop(hash_)
+        return hash_
+
+    def carregar(self):
+        if not self.indice_path.exists():
+            return
+        try:
+            with open(self.indice_path, "r", encoding="utf-8") as f:
+                entradas = json.load(f)
+        except (json.JSONDecodeError, OSError):
+            return
+        with self._lock:
+            for url, hash_ in entradas:
+                try:
+                    tamanho = self._path(hash_).stat().st_size
+                except OSError:
+                    continue  # Arquivo apagado por fora: a URL é baixada de novo
+                self._referenciar(url, hash_, tamanho)
+
+    def salvar(self):
+        """Persiste o índice em ordem de uso (escrita atômica)"""
+        with self._lock:
+            if not self._alterado:
+                return
+            entradas = list(self._indice.items())
+            self._alterado = False
+        self.diretorio.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.indice_path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(entradas, f)
+        os.replace(tmp_path, self.indice_path)
+
+    def get(self, url: str) -> Optional[bytes]:
+        with self._lock:
+            hash_ = self._indice.get(url)
+            if hash_ is None:
+                return None
+            self._indice.move_to_end(url)
+            self._alterado = True
+        try:
+            return self._path(hash_).read_bytes()
+        except OSError:
+            with self._lock:
+                if self._indice.get(url) == hash_:
+                    self._soltar(url)
+            return None
+
+    def put(self, url: str, conteudo: bytes) -> str:
+        hash_ = hashlib.sha256(conteudo).hexdigest()
+        path = self._path(hash_)
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=".icone.")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(conteudo)
+                os.replace(tmp_path, path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+
+        apagar = []
+        with self._lock:
+            if url in self._indice:
+                apagar.append(self._soltar(url))
+            self._referenciar(url, hash_, len(conteudo))
+            while self.total_bytes > self.max_bytes and len(self._indice) > 1:
+                apagar.append(self._soltar(next(iter(self._indice))))
+            self._alterado = True
+            # Um hash despejado pode ter voltado a ser referenciado (mesmo conteúdo)
+            apagar = [h for h in apagar if h is not None and h not in self._referencias]
+
+        for hash_apagado in apagar:
+            try:
+                self._path(hash_apagado).unlink()
+            except OSError:
+                pass
+        return hash_
+
+    def __len__(self) -> int:
+        return len(self._indice)
+
+
+class IconService:
+    """Ícones dos itens: download concorrente limitado, cache em disco e miniaturas em memória
+
+    solicitar() agenda os ícones que ainda não estão em memória; o download, a
+    decodificação e a redução rodam no pool próprio do serviço e o callback é
+    chamado nessa thread com a miniatura (PIL.Image) ou None. A criação de
+    imagens do Tk fica por conta de quem chama, na thread da interface.
+    """
+
+    def __init__(self, diretorio: str = "./data/icones", tamanho: int = TAMANHO_MINIATURA,
+                 url: Optional[str] = None, tamanho_render: int = TAMANHO_RENDER,
+                 max_paralelo: int = MAX_PARALELO, max_memoria: int = MAX_MEMORIA,
+                 max_disco: int = MAX_DISCO, http: Optional[ClienteHTTP] = None):
+        self.tamanho = tamanho
+        # ALBION_RENDER_URL troca o serviço de renders (ex: stub local); "{}" recebe o ID do item
+        self.url_modelo = url or os.getenv("ALBION_RENDER_URL") or IMG_URL
+        self.tamanho_render = tamanho_render
+        self.max_memoria = max_memoria
+        self.disco = DiscoIcones(diretorio, max_disco)
+        self.http = http or ClienteHTTP(limitador=TokenBucket(taxa=TAXA_RENDER, capacidade=max_paralelo * 2),
+                                        tentativas=3)
+        self.executor = ThreadPoolExecutor(max_workers=max_paralelo, thread_name_prefix="albion-icones")
+        self._memoria: "OrderedDict[str, Image.Image]" = OrderedDict()
+        self._em_voo: Dict[str, Future] = {}
+        self._ausentes = set()  # Itens sem render (404): não são pedidos de novo nesta sessão
+        self._lock = threading.Lock()
+        METRICAS.registrar_medidor("icones_disco_bytes", lambda: self.disco.total_bytes)
+
+    def url(self, item_id: str) -> str:
+        return f"{self.url_modelo.format(quote(item_id))}?size={self.tamanho_render}"
+
+    def _conteudo(self, item_id: str) -> Optional[bytes]:
+        url = self.url(item_id)
+        conteudo = self.disco.get(url)
+        if conteudo is not None:
+            METRICAS.incrementar("icones_total", origem="disco")
+            return conteudo
+
+        response = self.http.get(url)
+        if response.status_code == 404:
+            METRICAS.incrementar("icones_total", origem="ausente")
+            return None
+        response.raise_for_status()
+        METRICAS.incrementar("icones_total", origem="rede")
+        self.disco.put(url, response.content)
+        return response.content
+
+    def _miniatura(self, item_id: str) -> Optional[Image.Image]:
+        """Roda no pool: baixa (ou lê do disco), decodifica e reduz o ícone"""
+        conteudo = self._conteudo(item_id)
+        if conteudo is None:
+            with self._lock:
+                self._ausentes.add(item_id)
+            return None
+
+        with METRICAS.cronometrar("icones.decodificar"):
+            with Image.open(io.BytesIO(conteudo)) as imagem:
+                miniatura = imagem.convert("RGBA")
+            miniatura.thumbnail((self.tamanho, self.tamanho), Image.LANCZOS)
+
+        with self._lock:
+            self._memoria[item_id] = miniatura
+            self._memoria.move_to_end(item_id)
+            while len(self._memoria) > self.max_memoria:
+                self._memoria.popitem(last=False)
+        return miniatura
+
+    def obter(self, item_id: str) -> Optional[Image.Image]:
+        """Miniatura já em memória (não faz I/O)"""
+        with self._lock:
+            miniatura = self._memoria.get(item_id)
+            if miniatura is not None:
+                self._memoria.move_to_end(item_id)
+            return miniatura
+
+    def solicitar(self, item_ids: Iterable[str], callback: Callable[[str, Optional[Image.Image]], None],
+                  cancelar_outros: bool = True) -> List[str]:
+        """Agenda os ícones que faltam; retorna os IDs agendados
+
+        Com cancelar_outros=True, pedidos anteriores que ainda não começaram e não
+        estão na lista são cancelados (linhas que saíram da tela com a rolagem).
+        """
+        item_ids = list(dict.fromkeys(item_ids))
+        agendados: Dict[str, Future] = {}
+        with self._lock:
+            if cancelar_outros:
+                manter = set(item_ids)
+                for item_id, future in list(self._em_voo.items()):
+                    if item_id not in manter and future.cancel():
+                        del self._em_voo[item_id]
+
+            for item_id in item_ids:
+                if item_id in self._memoria or item_id in self._ausentes or item_id in self._em_voo:
+                    continue
+                agendados[item_id] = self._em_voo[item_id] = self.executor.submit(self._miniatura, item_id)
+
+        # Fora do lock: se a tarefa já terminou, o callback roda aqui mesmo
+        for item_id, future in agendados.items():
+            future.add_done_callback(lambda f, i=item_id: self._concluir(i, f, callback))
+        return list(agendados)
+
+    def _concluir(self, item_id: str, future: Future, callback: Callable):
+        # Cancelados saem de _em_voo em solicitar(), que chama cancel() segurando o lock
+        # (o callback roda dentro do cancel): tomar o lock aqui travaria
+        if future.cancelled():
+            return
+        with self._lock:
+            if self._em_voo.get(item_id) is future:
+                del self._em_voo[item_id]
+        erro = future.exception()
+        if erro is not None:
+            METRICAS.incrementar("icones_erros_total", tipo=type(erro).__name__)
+        callback(item_id, None if erro is not None else future.result())
+
+    def fechar(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        self.disco.salvar()
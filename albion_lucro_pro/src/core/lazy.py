@@ -0,0 +1,44 @@
+import importlib
+import threading
+from types import ModuleType
+
+
+class _ModuloPreguicoso(ModuleType):
+    """Substituto de um módulo que só o importa no primeiro acesso a um atributo"""
+
+    def __init__(self, nome: str):
+        super().__init__(nome)
+        self.__dict__["_modulo"] = None
+        self.__dict__["_lock"] = threading.Lock()
+
+    def _carregar(self) -> ModuleType:
+        modulo = self.__dict__["_modulo"]
+        if modulo is None:
+            # Várias threads (GUI e workers) podem tocar o módulo ao mesmo tempo
+            with self.__dict__["_lock"]:
+                modulo = self.__dict__["_modulo"]
+                if modulo is None:
+                    modulo = importlib.import_module(self.__name__)
+                    self.__dict__["_modulo"] = modulo
+        return modulo
+
+    def __getattr__(self, atributo: str):
+        return getattr(self._carregar(), atributo)
+
+    def __dir__(self):
+        return dir(self._carregar())
+
+    def __repr__(self) -> str:
+        estado = "carregado" if self.__dict__["_modulo"] is not None else "não carregado"
+        return f"<módulo preguiçoso {self.__name__!r} ({estado})>"
+
+
+def lazy_import(nome: str) -> ModuleType:
+    """Importa `nome` apenas quando for usado pela primeira vez
+
+    Usado para pandas, numpy, requests, pyarrow e fuzzywuzzy, que somam boa
+    parte do tempo de abertura da janela. Os módulos que o usam precisam de
+    `from __future__ import annotations`, senão as anotações de tipo já
+    disparam a importação.
+    """
+    return _ModuloPreguicoso(nome)
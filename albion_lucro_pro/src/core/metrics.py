@@ -0,0 +1,350 @@
+import cProfile
+import http.server
+import io
+import json
+import math
+import os
+import pstats
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from datetime import datetime
+from functools import wraps
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+PREFIXO = "albion"
+# Limites (segundos) dos baldes dos histogramas, no estilo do Prometheus
+BALDES = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, math.inf)
+
+Rotulos = Tuple[Tuple[str, str], ...]
+
+
+def _rotulos(rotulos: Dict[str, object]) -> Rotulos:
+    return tuple(sorted((chave, str(valor)) for chave, valor in rotulos.items()))
+
+
+def _formatar_rotulos(rotulos: Rotulos, extra: Rotulos = ()) -> str:
+    pares = rotulos + extra
+    if not pares:
+        return ""
+    return "{" + ",".join(f'{chave}="{valor}"' for chave, valor in pares) + "}"
+
+
+class _Histograma:
+    __slots__ = ("contagens", "soma", "total")
+
+    def __init__(self):
+        self.contagens = [0] * len(BALDES)
+        self.soma = 0.0
+        self.total = 0
+
+    def observar(self, valor: float):
+        self.contagens[bisect_left(BALDES, valor)] += 1
+        self.soma += valor
+        self.total += 1
+
+    def quantil(self, q: float) -> float:
+        """Estimativa pelo limite superior do balde (interpolado dentro dele)"""
+        if not self.total:
+            return 0.0
+        alvo, acumulado, anterior = q * self.total, 0, 0.0
+        for limite, contagem in zip(BALDES, self.contagens):
+            if contagem and acumulado + contagem >= alvo:
+                if math.isinf(limite):
+                    return anterior
+                return anterior + (limite - anterior) * (alvo - acumulado) / contagem
+            acumulado += contagem
+            anterior = limite if not math.isinf(limite) else anterior
+        return anterior
+
+    def resumo(self) -> dict:
+        return {
+            "contagem": self.total,
+            "soma_s": self.soma,
+            "media_ms": self.soma / self.total * 1000 if self.total else 0.0,
+            "p50_ms": self.quantil(0.5) * 1000,
+            "p95_ms": self.quantil(0.95) * 1000,
+        }
+
+
+class Metricas:
+    """Registro de contadores, histogramas de duração e medidores, seguro entre threads"""
+
+    def __init__(self):
+        self._contadores: Dict[str, Dict[Rotulos, float]] = {}
+        self._histogramas: Dict[str, Dict[Rotulos, _Histograma]] = {}
+        self._medidores: Dict[str, Dict[Rotulos, Callable[[], float]]] = {}
+        self._lock = threading.Lock()
+
+    # ---------- coleta ----------
+
+    def incrementar(self, nome: str, valor: float = 1, **rotulos):
+        chave = _rotulos(rotulos)
+        with self._lock:
+            serie = self._contadores.setdefault(nome, {})
+            serie[chave] = serie.get(chave, 0) + valor
+
+    def observar(self, nome: str, segundos: float, **rotulos):
+        chave = _rotulos(rotulos)
+        with self._lock:
+            serie = self._histogramas.setdefault(nome, {})
+            histograma = serie.get(chave)
+            if histograma is None:
+                histograma = serie[chave] = _Histograma()
+            histograma.observar(segundos)
+
+    def registrar_medidor(self, nome: str, fn: Callable[[], float], **rotulos):
+        """Medidor calculado na exportação (ex: taxa de acerto do cache)"""
+        with self._lock:
+            self._medidores.setdefault(nome, {})[_rotulos(rotulos)] = fn
+
+    @contextmanager
+    def cronometrar(self, operacao: str) -> Iterator[None]:
+        """Mede a duração do bloco em operacao_segundos{operacao=...}"""
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observar("operacao_segundos", time.perf_counter() - inicio, operacao=operacao)
+
+    def cronometrado(self, operacao: str):
+        """Decorador equivalente a cronometrar()"""
+        def decorador(fn):
+            @wraps(fn)
+            def envoltorio(*args, **kwargs):
+                with self.cronometrar(operacao):
+                    return fn(*args, **kwargs)
+            return envoltorio
+        return decorador
+
+    def limpar(self):
+        with self._lock:
+            self._contadores.clear()
+            self._histogramas.clear()
+
+    # ---------- leitura ----------
+
+    def _valores_medidores(self) -> Dict[str, Dict[Rotulos, float]]:
+        with self._lock:
+            medidores = {nome: dict(serie) for nome, serie in self._medidores.items()}
+        valores = {}
+        for nome, serie in medidores.items():
+            for rotulos, fn in serie.items():
+                try:
+                    valores.setdefault(nome, {})[rotulos] = float(fn())
+                except Exception:
+                    continue
+        return valores
+
+    def contador(self, nome: str, **rotulos) -> float:
+        """Soma das séries de `nome` que contêm os rótulos informados"""
+        filtro = set(_rotulos(rotulos))
+        with self._lock:
+            return sum(valor for chave, valor in self._contadores.get(nome, {}).items()
+                       if filtro <= set(chave))
+
+    def resumo(self) -> dict:
+        """Estado atual em estruturas simples (exportação JSON e painel da GUI)"""
+        with self._lock:
+            contadores = {
+                nome: [{"rotulos": dict(chave), "valor": valor} for chave, valor in serie.items()]
+                for nome, serie in self._contadores.items()
+            }
+            histogramas = {
+                nome: [{"rotulos": dict(chave), **histograma.resumo()} for chave, histograma in serie.items()]
+                for nome, serie in self._histogramas.items()
+            }
+        medidores = {
+            nome: [{"rotulos": dict(chave), "valor": valor} for chave, valor in serie.items()]
+            for nome, serie in self._valores_medidores().items()
+        }
+        return {"contadores": contadores, "histogramas": histogramas, "medidores": medidores}
+
+    # ---------- exportação ----------
+
+    def prometheus(self) -> str:
+        """Formato texto de exposição do Prometheus"""
+        linhas: List[str] = []
+        with self._lock:
+            contadores = {nome: dict(serie) for nome, serie in self._contadores.items()}
+            histogramas = {
+                nome: {chave: (list(h.contagens), h.soma, h.total) for chave, h in serie.items()}
+                for nome, serie in self._histogramas.items()
+            }
+
+        for nome, serie in sorted(contadores.items()):
+            linhas.append(f"# TYPE {PREFIXO}_{nome} counter")
+            linhas += [f"{PREFIXO}_{nome}{_formatar_rotulos(chave)} {valor:g}" for chave, valor in serie.items()]
+
+        for nome, serie in sorted(histogramas.items()):
+            linhas.append(f"# TYPE {PREFIXO}_{nome} histogram")
+            for chave, (contagens, soma, total) in serie.items():
+                acumulado = 0
+                for limite, contagem in zip(BALDES, contagens):
+                    acumulado += contagem
+                    le = "+Inf" if math.isinf(limite) else f"{limite:g}"
+                    linhas.append(f"{PREFIXO}_{nome}_bucket{_formatar_rotulos(chave, (('le', le),))} {acumulado}")
+                linhas.append(f"{PREFIXO}_{nome}_sum{_formatar_rotulos(chave)} {soma:g}")
+                linhas.append(f"{PREFIXO}_{nome}_count{_formatar_rotulos(chave)} {total}")
+
+        for nome, serie in sorted(self._valores_medidores().items()):
+            linhas.append(f"# TYPE {PREFIXO}_{nome} gauge")
+            linhas += [f"{PREFIXO}_{nome}{_formatar_rotulos(chave)} {valor:g}" for chave, valor in serie.items()]
+        return "\n".join(linhas) + "\n"
+
+    def salvar_json(self, path: str):
+        """Grava o resumo em JSON (escrita atômica)"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"gerado_em": datetime.now().isoformat(), **self.resumo()}, f, indent=2,
+                      ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+
+class ServidorMetricas:
+    """Endpoint HTTP local: /metrics (Prometheus) e /metrics.json"""
+
+    def __init__(self, metricas: Metricas, porta: int = 9464, host: str = "127.0.0.1"):
+        class Handler(http.server.BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                if self.path.startswith("/metrics.json"):
+                    corpo, tipo = json.dumps(metricas.resumo(), ensure_ascii=False).encode(), "application/json"
+                elif self.path.startswith("/metrics"):
+                    corpo, tipo = metricas.prometheus().encode(), "text/plain; version=0.0.4"
+                else:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", tipo)
+                self.send_header("Content-Length", str(len(corpo)))
+                self.end_headers()
+                self.wfile.write(corpo)
+
+        self._servidor = http.server.ThreadingHTTPServer((host, porta), Handler)
+        self._servidor.daemon_threads = True
+        threading.Thread(target=self._servidor.serve_forever, daemon=True, name="albion-metricas").start()
+
+    @property
+    def url(self) -> str:
+        host, porta = self._servidor.server_address[:2]
+        return f"http://{host}:{porta}/metrics"
+
+    def parar(self):
+        self._servidor.shutdown()
+        self._servidor.server_close()
+
+
+class Perfilador:
+    """Captura cProfile de uma única ação, somando as threads que trabalharam nela
+
+    armar() vale para a próxima ação: iniciar() abre a sessão, cada tarefa da
+    ação roda dentro de capturar() e finalizar() grava o .prof e imprime as
+    funções mais caras.
+
+    Só uma thread é perfilada por vez: no Python 3.12+ o cProfile usa
+    sys.monitoring e um segundo enable() simultâneo levanta ValueError. Trechos
+    que começam com outra thread já perfilada rodam sem perfil e são contados
+    no relatório, então o perfil de tarefas paralelas é uma amostra delas.
+    """
+
+    def __init__(self, diretorio: str = "./data/perfis", linhas: int = 20):
+        self.diretorio = Path(diretorio)
+        self.linhas = linhas
+        self.armado = False
+        self.ultimo: Optional[Path] = None
+        self._acao: Optional[str] = None
+        self._stats: Optional[pstats.Stats] = None
+        self._dono: Optional[int] = None  # Thread com o cProfile ativo
+        self._trechos = 0
+        self._sem_perfil = 0
+        self._lock = threading.Lock()
+
+    @property
+    def ativo(self) -> bool:
+        return self._acao is not None
+
+    def armar(self):
+        self.armado = True
+
+    def iniciar(self, acao: str) -> bool:
+        """Abre a sessão se o perfilador estiver armado (retorna se abriu)"""
+        with self._lock:
+            if not self.armado:
+                return False
+            self.armado = False
+            self._acao, self._stats = acao, None
+            self._trechos = self._sem_perfil = 0
+            return True
+
+    def _assumir(self) -> Optional[cProfile.Profile]:
+        """Liga o cProfile nesta thread se nenhuma outra estiver sendo perfilada"""
+        with self._lock:
+            if self._acao is None or self._dono == threading.get_ident():
+                return None  # Sem sessão, ou trecho aninhado já coberto pelo perfil desta thread
+            if self._dono is not None:
+                self._sem_perfil += 1
+                return None
+            self._dono = threading.get_ident()
+        perfil = cProfile.Profile()
+        try:
+            perfil.enable()
+        except ValueError:  # Outra ferramenta de profiling ativa (sys.monitoring, 3.12+)
+            with self._lock:
+                self._dono = None
+                self._sem_perfil += 1
+            return None
+        return perfil
+
+    @contextmanager
+    def capturar(self) -> Iterator[None]:
+        if self._acao is None:
+            yield
+            return
+        perfil = self._assumir()
+        if perfil is None:
+            yield
+            return
+        try:
+            yield
+        finally:
+            perfil.disable()
+            with self._lock:
+                self._dono = None
+                if self._acao is not None:
+                    self._trechos += 1
+                    if self._stats is None:
+                        self._stats = pstats.Stats(perfil)
+                    else:
+                        self._stats.add(perfil)
+
+    def finalizar(self) -> Optional[Path]:
+        """Grava o perfil da sessão e imprime o topo por tempo acumulado"""
+        with self._lock:
+            acao, stats = self._acao, self._stats
+            trechos, sem_perfil = self._trechos, self._sem_perfil
+            self._acao, self._stats = None, None
+        if stats is None:
+            return None
+
+        self.diretorio.mkdir(parents=True, exist_ok=True)
+        path = self.diretorio / f"{acao}_{datetime.now():%Y%m%d_%H%M%S}.prof"
+        stats.dump_stats(str(path))
+        saida = io.StringIO()
+        stats.stream = saida
+        stats.sort_stats("cumulative").print_stats(self.linhas)
+        amostra = f" ({trechos} trechos perfilados, {sem_perfil} em paralelo ficaram de fora)" if sem_perfil else ""
+        print(f"🔬 Perfil de \"{acao}\" salvo em {path}{amostra}\n{saida.getvalue()}")
+        self.ultimo = path
+        return path
+
+
+# Registro e perfilador compartilhados pelo aplicativo, CLI e módulos core
+METRICAS = Metricas()
+PERFILADOR = Perfilador()
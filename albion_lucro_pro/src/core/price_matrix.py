@@ -0,0 +1,387 @@
+from __future__ import annotations
+
+import threading
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from core.lazy import lazy_import
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+ENCANTAMENTOS = 5  # Níveis 0 a 4 (sufixo "@N" do ID)
+QUALIDADES = 5  # Normal, Bom, Notável, Excelente, Obra-prima (1 a 5)
+CAPACIDADE_INICIAL = 256  # Itens base reservados antes de o array precisar crescer
+
+# Colunas da Albion Data API guardadas na matriz: coluna -> (array de preços, array de datas)
+LADOS = {
+    "sell_price_min": ("_venda_min", "_data_venda"),
+    "buy_price_max": ("_compra_max", "_data_compra"),
+}
+
+
+def separar_id(item_id: str) -> Tuple[str, int]:
+    """'T4_BAG@2' -> ('T4_BAG', 2); IDs sem sufixo (ou fora da faixa) têm encantamento 0"""
+    base, separador, nivel = item_id.partition("@")
+    if separador and nivel.isdigit() and 0 < int(nivel) < ENCANTAMENTOS:
+        return base, int(nivel)
+    return item_id, 0
+
+
+def juntar_id(base: str, encantamento: int) -> str:
+    return f"{base}@{encantamento}" if encantamento else base
+
+
+def segundos_epoca(datas: pd.Series) -> np.ndarray:
+    """Datas da API (texto ISO 8601) em segundos desde a época (UTC); NaN sem data
+
+    Converte direto para segundos: subtrair pd.Timestamp(0) força nanossegundos e
+    estoura com "0001-01-01", a data que a API usa quando não tem data para a célula.
+    """
+    datas = pd.to_datetime(datas, errors="coerce", format="ISO8601")
+    if datas.dt.tz is not None:
+        datas = datas.dt.tz_convert(None)
+    segundos = datas.astype("datetime64[s]").to_numpy().astype(np.int64).astype(float)
+    segundos[segundos < 0] = np.nan  # Antes de 1970 (o sentinela) e NaT
+    return segundos
+
+
+class PriceMatrix:
+    """Preços em arrays densos do NumPy indexados por (item base, encantamento, qualidade, cidade)
+
+    Cada célula guarda o menor preço de venda, o maior de compra e a data de
+    cada um (NaN = sem ordens). Atualizações parciais são mescladas célula a
+    célula, mantendo sempre o preço mais recente. O melhor preço de compra e de
+    venda de cada item (entre cidades e qualidades) fica pré-calculado e é
+    refeito só para os itens tocados por cada atualização.
+    """
+
+    def __init__(self, cidades: Sequence[str] = ()):
+        self.bases: List[str] = []
+        self.cidades: List[str] = []
+        self._posicao_base: Dict[str, int] = {}
+        self._posicao_cidade: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+        forma = (CAPACIDADE_INICIAL, ENCANTAMENTOS, QUALIDADES, max(len(cidades), 1))
+        self._venda_min = np.full(forma, np.nan)
+        self._compra_max = np.full(forma, np.nan)
+        self._data_venda = np.full(forma, np.nan)  # Segundos desde a época (UTC)
+        self._data_compra = np.full(forma, np.nan)
+        self._presente = np.zeros(forma[:2], dtype=bool)  # (base, encantamento) já recebeu alguma linha
+        # Posição achatada (qualidade * n_cidades + cidade) do melhor preço de cada item, -1 = nenhum
+        self._melhor_compra = np.full(forma[:2], -1, dtype=np.int64)
+        self._melhor_venda = np.full(forma[:2], -1, dtype=np.int64)
+        for cidade in cidades:
+            self._cidade(cidade)
+
+    @classmethod
+    def de_frame(cls, precos: pd.DataFrame, cidades: Sequence[str] = ()) -> "PriceMatrix":
+        matriz = cls(cidades)
+        matriz.atualizar(precos)
+        return matriz
+
+    # ---------- posições ----------
+
+    def _redimensionar(self, bases: int, cidades: int):
+        """Cresce os arrays (capacidade dobrada) preservando o conteúdo"""
+        atual_bases, _, _, atual_cidades = self._venda_min.shape
+        if bases <= atual_bases and cidades <= atual_cidades:
+            return
+        novas_bases, novas_cidades = atual_bases, max(atual_cidades, cidades)
+        while novas_bases < bases:
+            novas_bases *= 2
+        for nome in ("_venda_min", "_compra_max", "_data_venda", "_data_compra"):
+            antigo = getattr(self, nome)
+            novo = np.full((novas_bases, ENCANTAMENTOS, QUALIDADES, novas_cidades), np.nan)
+            novo[:atual_bases, :, :, :atual_cidades] = antigo
+            setattr(self, nome, novo)
+        for nome, vazio in (("_presente", False), ("_melhor_compra", -1), ("_melhor_venda", -1)):
+            antigo = getattr(self, nome)
+            novo = np.full((novas_bases, ENCANTAMENTOS), vazio, dtype=antigo.dtype)
+            novo[:atual_bases] = antigo
+            setattr(self, nome, novo)
+        if novas_cidades != atual_cidades:
+            # As posições achatadas dependem do número de cidades
+            self._recalcular(np.flatnonzero(self._presente))
+
+    def _base(self, base: str) -> int:
+        posicao = self._posicao_base.get(base)
+        if posicao is None:
+            posicao = self._posicao_base[base] = len(self.bases)
+            self.bases.append(base)
+        return posicao
+
+    def _cidade(self, cidade: str) -> int:
+        posicao = self._posicao_cidade.get(cidade)
+        if posicao is None:
+            posicao = self._posicao_cidade[cidade] = len(self.cidades)
+            self.cidades.append(cidade)
+        return posicao
+
+    def posicao(self, item_id: str) -> Optional[Tuple[int, int]]:
+        """(base, encantamento) do item na matriz, ou None se nunca recebeu preço"""
+        base, encantamento = separar_id(item_id)
+        posicao = self._posicao_base.get(base)
+        if posicao is None or not self._presente[posicao, encantamento]:
+            return None
+        return posicao, encantamento
+
+    def __contains__(self, item_id: str) -> bool:
+        return self.posicao(item_id) is not None
+
+    def __len__(self) -> int:
+        return int(self._presente.sum())
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.item_ids())
+
+    def item_ids(self) -> List[str]:
+        bases, encantamentos = np.nonzero(self._presente)
+        return [juntar_id(self.bases[b], int(e)) for b, e in zip(bases, encantamentos)]
+
+    # ---------- atualização ----------
+
+    def atualizar(self, precos: pd.DataFrame) -> int:
+        """Mescla um frame de preços (formato da Albion Data API); retorna as linhas aplicadas
+
+        Células ausentes do frame são preservadas. Uma linha só substitui a
+        célula se não for mais antiga que o valor guardado; preço 0 significa
+        "sem ordens" e limpa a célula. O frame deve ser de uma única região.
+        """
+        if precos is None or precos.empty:
+            return 0
+        if "region" in precos and precos["region"].nunique() > 1:
+            # Rotas só fazem sentido dentro de um servidor: uma matriz por região
+            raise ValueError("Frame com várias regiões: use uma PriceMatrix por região")
+
+        codigos, item_ids = pd.factorize(precos["item_id"])
+        codigos_cidade, cidades = pd.factorize(precos["city"])
+        qualidades = (precos["quality"].to_numpy(dtype=np.int64) if "quality" in precos
+                      else np.ones(len(precos), dtype=np.int64))
+        validas = (qualidades >= 1) & (qualidades <= QUALIDADES)
+
+        with self._lock:
+            separados = [separar_id(item_id) for item_id in item_ids]
+            pos_bases = np.array([self._base(base) for base, _ in separados], dtype=np.int64)
+            pos_encantamentos = np.array([encantamento for _, encantamento in separados], dtype=np.int64)
+            pos_cidades = np.array([self._cidade(cidade) for cidade in cidades], dtype=np.int64)
+            self._redimensionar(len(self.bases), len(self.cidades))
+
+            b = pos_bases[codigos][validas]
+            e = pos_encantamentos[codigos][validas]
+            q = qualidades[validas] - 1
+            c = pos_cidades[codigos_cidade][validas]
+
+            for coluna, (nome_precos, nome_datas) in LADOS.items():
+                if coluna not in precos:
+                    continue
+                valores = precos[coluna].to_numpy(dtype=float)[validas]
+                valores[~(valores > 0)] = np.nan
+                if f"{coluna}_date" in precos:
+                    segundos = segundos_epoca(precos[f"{coluna}_date"])[validas]
+                else:
+                    segundos = np.full(len(valores), np.nan)
+
+                self._aplicar(nome_precos, nome_datas, (b, e, q, c), valores, segundos)
+
+            self._presente[b, e] = True
+            self._recalcular(np.unique(b * ENCANTAMENTOS + e))
+        return int(validas.sum())
+
+    def _aplicar(self, nome_precos: str, nome_datas: str, celulas: Tuple[np.ndarray, ...],
+                 valores: np.ndarray, segundos: np.ndarray):
+        """Grava um lado nas células (b, e, q, c) que não ficariam mais antigas"""
+        b, e, q, c = celulas
+        matriz_precos, matriz_datas = getattr(self, nome_precos), getattr(self, nome_datas)
+        # Comparação com NaN é falsa: sem data de algum dos lados, o valor novo prevalece
+        aplicar = ~(segundos < matriz_datas[b, e, q, c])
+        matriz_precos[b[aplicar], e[aplicar], q[aplicar], c[aplicar]] = valores[aplicar]
+        matriz_datas[b[aplicar], e[aplicar], q[aplicar], c[aplicar]] = segundos[aplicar]
+
+    def mesclar(self, outra: "PriceMatrix") -> int:
+        """Mescla outra matriz (ex: o resultado de um lote) nesta; retorna as células aplicadas
+
+        Cada lado é mesclado só onde a outra matriz tem preço ou data: uma célula
+        com apenas ordens de compra não apaga a ordem de venda guardada aqui.
+        """
+        with outra._lock:
+            bases, cidades = list(outra.bases), list(outra.cidades)
+            presente = outra._presente[:len(bases)].copy()
+            lados = {
+                nomes: (getattr(outra, nomes[0])[:len(bases), :, :, :len(cidades)].copy(),
+                        getattr(outra, nomes[1])[:len(bases), :, :, :len(cidades)].copy())
+                for nomes in LADOS.values()
+            }
+        if not presente.any():
+            return 0
+
+        with self._lock:
+            pos_bases = np.array([self._base(base) for base in bases], dtype=np.int64)
+            pos_cidades = np.array([self._cidade(cidade) for cidade in cidades], dtype=np.int64)
+            self._redimensionar(len(self.bases), len(self.cidades))
+
+            celulas = np.zeros(presente.shape + (QUALIDADES, len(cidades)), dtype=bool)
+            for (nome_precos, nome_datas), (precos, datas) in lados.items():
+                tem_valor = ~np.isnan(precos) | ~np.isnan(datas)
+                b, e, q, c = np.nonzero(tem_valor)
+                self._aplicar(nome_precos, nome_datas, (pos_bases[b], e, q, pos_cidades[c]),
+                              precos[b, e, q, c], datas[b, e, q, c])
+                celulas |= tem_valor
+
+            b, e = np.nonzero(presente)
+            self._presente[pos_bases[b], e] = True
+            self._recalcular(np.unique(pos_bases[b] * ENCANTAMENTOS + e))
+        return int(celulas.sum())
+
+    def _recalcular(self, itens: np.ndarray):
+        """Refaz o melhor preço de compra/venda dos (base * ENCANTAMENTOS + encantamento) informados"""
+        if not len(itens):
+            return
+        n_celulas = QUALIDADES * self._venda_min.shape[3]
+        venda = self._venda_min.reshape(-1, n_celulas)[itens]
+        compra = self._compra_max.reshape(-1, n_celulas)[itens]
+
+        # Comprar: menor ordem de venda; vender: maior ordem de compra
+        menor = np.where(np.isnan(venda), np.inf, venda).argmin(axis=1)
+        maior = np.where(np.isnan(compra), -np.inf, compra).argmax(axis=1)
+        linhas = np.arange(len(itens))
+        self._melhor_compra.reshape(-1)[itens] = np.where(np.isnan(venda[linhas, menor]), -1, menor)
+        self._melhor_venda.reshape(-1)[itens] = np.where(np.isnan(compra[linhas, maior]), -1, maior)
+
+    # ---------- consultas ----------
+
+    def _idades(self, datas: np.ndarray, agora: Optional[float]) -> np.ndarray:
+        agora = pd.Timestamp.now(tz="UTC").timestamp() if agora is None else agora
+        return (agora - datas) / 60
+
+    def idade_min(self, lado: str = "sell_price_min", agora: Optional[float] = None) -> np.ndarray:
+        """Idade (minutos) de cada célula de um lado, com a mesma forma da matriz"""
+        return self._idades(getattr(self, LADOS[lado][1])[:len(self.bases), :, :, :len(self.cidades)], agora)
+
+    def obsoletos(self, max_idade_min: float, lado: str = "sell_price_min",
+                  agora: Optional[float] = None) -> np.ndarray:
+        """Máscara das células sem preço ou com preço mais velho que `max_idade_min`"""
+        idades = self.idade_min(lado, agora)
+        with np.errstate(invalid="ignore"):
+            return ~(idades <= max_idade_min)
+
+    def fatia(self, item_id: str) -> Optional[Dict[str, np.ndarray]]:
+        """Arrays (qualidade x cidade) de um item, como views da matriz"""
+        posicao = self.posicao(item_id)
+        if posicao is None:
+            return None
+        b, e = posicao
+        cidades = len(self.cidades)
+        return {
+            "sell_price_min": self._venda_min[b, e, :, :cidades],
+            "buy_price_max": self._compra_max[b, e, :, :cidades],
+            "sell_price_min_date": self._data_venda[b, e, :, :cidades],
+            "buy_price_max_date": self._data_compra[b, e, :, :cidades],
+        }
+
+    def _melhor(self, item_id: str, lado: str, qualidade: Optional[int]) -> Optional[dict]:
+        with self._lock:
+            posicao = self.posicao(item_id)
+            if posicao is None:
+                return None
+            b, e = posicao
+            nome_precos, nome_datas = LADOS[lado]
+            precos = getattr(self, nome_precos)[b, e]
+            datas = getattr(self, nome_datas)[b, e]
+            indices = self._melhor_compra if lado == "sell_price_min" else self._melhor_venda
+            plano = int(indices[b, e])
+        n_cidades = precos.shape[1]
+
+        if qualidade is None:
+            if plano < 0:
+                return None
+            q, c = divmod(plano, n_cidades)
+        else:
+            q = qualidade - 1
+            linha = precos[q]
+            if np.isnan(linha).all():
+                return None
+            c = int(np.nanargmin(linha) if lado == "sell_price_min" else np.nanargmax(linha))
+        return {
+            "item_id": item_id,
+            "preco": float(precos[q, c]),
+            "cidade": self.cidades[c],
+            "quality": q + 1,
+            "idade_min": float(self._idades(datas[q, c], None)),
+        }
+
+    def melhor_compra(self, item_id: str, qualidade: Optional[int] = None) -> Optional[dict]:
+        """Onde comprar mais barato (menor ordem de venda) entre cidades e qualidades"""
+        return self._melhor(item_id, "sell_price_min", qualidade)
+
+    def melhor_venda(self, item_id: str, qualidade: Optional[int] = None) -> Optional[dict]:
+        """Onde vender direto mais caro (maior ordem de compra) entre cidades e qualidades"""
+        return self._melhor(item_id, "buy_price_max", qualidade)
+
+    def grupos(self, coluna_venda: str = "sell_price_min", item_ids: Optional[Sequence[str]] = None,
+               max_idade_min: Optional[float] = None):
+        """Matrizes (item/qualidade x cidade) no formato usado pelo ProfitEngine
+
+        Retorna ((itens, qualidades), cidades, compra, venda, idade_compra, idade_venda);
+        preços mais velhos que `max_idade_min` são tratados como ausentes.
+        """
+        with self._lock:
+            if item_ids is None:
+                bases, encantamentos = np.nonzero(self._presente[:len(self.bases)])
+            else:
+                posicoes = [p for p in map(self.posicao, item_ids) if p is not None]
+                bases = np.array([b for b, _ in posicoes], dtype=np.int64)
+                encantamentos = np.array([e for _, e in posicoes], dtype=np.int64)
+
+            cidades = len(self.cidades)
+            nome_venda, nome_data_venda = LADOS[coluna_venda]
+            compra = self._venda_min[bases, encantamentos, :, :cidades].reshape(-1, cidades)
+            venda = getattr(self, nome_venda)[bases, encantamentos, :, :cidades].reshape(-1, cidades)
+            idade_compra = self._idades(self._data_venda[bases, encantamentos, :, :cidades], None).reshape(-1, cidades)
+            idade_venda = self._idades(
+                getattr(self, nome_data_venda)[bases, encantamentos, :, :cidades], None).reshape(-1, cidades)
+
+        if max_idade_min is not None:
+            with np.errstate(invalid="ignore"):
+                compra = np.where(idade_compra > max_idade_min, np.nan, compra)
+                venda = np.where(idade_venda > max_idade_min, np.nan, venda)
+
+        itens = np.array([juntar_id(self.bases[b], int(e)) for b, e in zip(bases, encantamentos)], dtype=object)
+        rotulos = (itens, np.arange(1, QUALIDADES + 1))
+        return rotulos, np.array(self.cidades, dtype=object), compra, venda, idade_compra, idade_venda
+
+    def para_frame(self, item_ids: Optional[Sequence[str]] = None,
+                   cidades: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        """Volta ao formato longo da API (uma linha por célula com algum preço)
+
+        `item_ids` e `cidades` limitam as células exportadas sem montar o frame inteiro.
+        """
+        with self._lock:
+            n_bases, n_cidades = len(self.bases), len(self.cidades)
+            venda = self._venda_min[:n_bases, :, :, :n_cidades]
+            compra = self._compra_max[:n_bases, :, :, :n_cidades]
+            celulas = ~np.isnan(venda) | ~np.isnan(compra)
+            if item_ids is not None:
+                selecionados = np.zeros(celulas.shape[:2], dtype=bool)
+                for posicao in filter(None, map(self.posicao, item_ids)):
+                    selecionados[posicao] = True
+                celulas &= selecionados[:, :, None, None]
+            if cidades is not None:
+                celulas &= np.isin(np.array(self.cidades, dtype=object), list(cidades))
+            b, e, q, c = np.nonzero(celulas)
+            if not len(b):
+                return pd.DataFrame(columns=["item_id", "city", "quality", *LADOS,
+                                             *(f"{coluna}_date" for coluna in LADOS)])
+
+            def datas(nome: str) -> pd.Series:
+                return pd.to_datetime(getattr(self, nome)[b, e, q, c], unit="s")
+
+            return pd.DataFrame({
+                "item_id": [juntar_id(self.bases[base], int(enc)) for base, enc in zip(b, e)],
+                "city": np.array(self.cidades, dtype=object)[c],
+                "quality": q + 1,
+                "sell_price_min": np.nan_to_num(venda[b, e, q, c]),
+                "sell_price_min_date": datas("_data_venda"),
+                "buy_price_max": np.nan_to_num(compra[b, e, q, c]),
+                "buy_price_max_date": datas("_data_compra"),
+            })
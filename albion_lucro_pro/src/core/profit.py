@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+from collections.abc import Mapping
+from typing import Optional, Union
+from core.lazy import lazy_import
+from core.price_matrix import PriceMatrix, segundos_epoca
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+TAXA_MERCADO_PREMIUM = 0.04  # Imposto sobre vendas com premium ativo
+TAXA_MERCADO = 0.08  # Imposto sobre vendas sem premium
+TAXA_SETUP = 0.025  # Taxa para criar uma ordem de venda/compra
+
+COLUNAS_RESULTADO = [
+    "item_id", "quality", "buy_city", "sell_city",
+    "buy_price", "sell_price", "lucro", "margem", "idade_min"
+]
+
+
+class ProfitEngine:
+    """Calcula oportunidades de arbitragem entre cidades sobre o frame de preços em lote
+
+    Todas as combinações (item, qualidade, cidade de compra, cidade de venda) são
+    avaliadas de uma vez com broadcasting do NumPy, sem laços por linha. Aceita
+    o frame longo da API ou uma PriceMatrix, que já está no formato denso.
+    Com várias regiões (coluna "region" no frame, ou um dict região -> PriceMatrix)
+    cada servidor é avaliado separadamente.
+    """
+
+    def __init__(self, premium: bool = True, sell_order: bool = True):
+        self.premium = premium
+        # sell_order=True: revende criando ordem de venda (paga setup)
+        # sell_order=False: vende direto para a maior ordem de compra
+        self.sell_order = sell_order
+
+    @property
+    def taxa_venda(self) -> float:
+        """Fração do preço de venda perdida em impostos e taxas"""
+        taxa = TAXA_MERCADO_PREMIUM if self.premium else TAXA_MERCADO
+        return taxa + (TAXA_SETUP if self.sell_order else 0.0)
+
+    def _matrizes(self, precos: Union[pd.DataFrame, PriceMatrix]):
+        """Converte o frame longo em matrizes (grupo item/qualidade x cidade)"""
+        coluna_venda = "sell_price_min" if self.sell_order else "buy_price_max"
+        if isinstance(precos, PriceMatrix):
+            return precos.grupos(coluna_venda)
+
+        if "quality" not in precos:
+            precos = precos.assign(quality=1)
+
+        itens, itens_unicos = pd.factorize(precos["item_id"])
+        qualidades, qualidades_unicas = pd.factorize(precos["quality"])
+        cidades, cidades_unicas = pd.factorize(precos["city"])
+        grupos = itens * len(qualidades_unicas) + qualidades
+        n_grupos = len(itens_unicos) * len(qualidades_unicas)
+
+        compra = np.full((n_grupos, len(cidades_unicas)), np.nan)
+        venda = np.full_like(compra, np.nan)
+
+        # Preço 0 significa "sem ordens" na Albion Data API
+        compra[grupos, cidades] = precos["sell_price_min"].replace(0, np.nan).to_numpy(dtype=float)
+        venda[grupos, cidades] = precos[coluna_venda].replace(0, np.nan).to_numpy(dtype=float)
+
+        # Idade (minutos) dos preços usados de cada lado, quando a API informa as datas
+        idade_compra = np.full_like(compra, np.nan)
+        idade_venda = np.full_like(compra, np.nan)
+        # Mesma conversão da PriceMatrix: ISO 8601 vetorizado e o sentinela "0001-01-01" como NaN
+        agora = pd.Timestamp.now(tz="UTC").timestamp()
+        for matriz, coluna in ((idade_compra, "sell_price_min_date"), (idade_venda, f"{coluna_venda}_date")):
+            if coluna in precos:
+                matriz[grupos, cidades] = (agora - segundos_epoca(precos[coluna])) / 60
+
+        rotulos = (np.asarray(itens_unicos), np.asarray(qualidades_unicas))
+        return rotulos, np.asarray(cidades_unicas), compra, venda, idade_compra, idade_venda
+
+    def _vazio(self, precos) -> bool:
+        if isinstance(precos, PriceMatrix):
+            return not len(precos)
+        if isinstance(precos, Mapping):
+            return not any(len(matriz) for matriz in precos.values())
+        return precos is None or precos.empty
+
+    def _regional(self, precos) -> bool:
+        return isinstance(precos, Mapping) or (isinstance(precos, pd.DataFrame) and "region" in precos)
+
+    def _por_regiao(self, metodo, precos, top_n: Optional[int], *args) -> pd.DataFrame:
+        # Rotas só fazem sentido dentro de um mesmo servidor
+        if isinstance(precos, Mapping):
+            grupos = [(regiao, matriz) for regiao, matriz in precos.items() if len(matriz)]
+        else:
+            grupos = [(regiao, grupo.drop(columns="region")) for regiao, grupo in precos.groupby("region", sort=False)]
+        por_regiao = [metodo(grupo, top_n, *args).assign(region=regiao) for regiao, grupo in grupos]
+        resultado = pd.concat(por_regiao, ignore_index=True).sort_values(
+            "lucro", ascending=False, kind="stable", ignore_index=True
+        )
+        return resultado.head(top_n) if top_n is not None else resultado
+
+    def _rotas(self, precos, min_lucro: float, min_margem: float):
+        """Lucro e margem de todas as rotas (grupo, cidade de compra, cidade de venda)"""
+        rotulos, cidades, compra, venda, idade_compra, idade_venda = self._matrizes(precos)
+
+        # lucro[g, a, b] = venda líquida na cidade b - custo de compra na cidade a
+        liquido = venda * (1.0 - self.taxa_venda)
+        lucro = liquido[:, None, :] - compra[:, :, None]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            margem = lucro / compra[:, :, None]
+
+        n_cidades = len(cidades)
+        valido = ~np.isnan(lucro) & (lucro > min_lucro) & (margem > min_margem)
+        valido &= ~np.eye(n_cidades, dtype=bool)[None, :, :]
+        return rotulos, cidades, compra, venda, idade_compra, idade_venda, lucro, margem, valido
+
+    def _resultado(self, rotas, indices: np.ndarray) -> pd.DataFrame:
+        """Monta o frame de saída para as rotas (índices achatados de `lucro`)"""
+        (itens, qualidades), cidades, compra, venda, idade_compra, idade_venda, lucro, margem, _ = rotas
+        g, a, b = np.unravel_index(indices, lucro.shape)
+        return pd.DataFrame({
+            "item_id": itens[g // len(qualidades)],
+            "quality": qualidades[g % len(qualidades)],
+            "buy_city": cidades[a],
+            "sell_city": cidades[b],
+            "buy_price": compra[g, a],
+            "sell_price": venda[g, b],
+            "lucro": lucro.ravel()[indices],
+            "margem": margem.ravel()[indices],
+            "idade_min": np.fmax(idade_compra[g, a], idade_venda[g, b]),
+        }, columns=COLUNAS_RESULTADO)
+
+    def opportunities(self, precos: Union[pd.DataFrame, PriceMatrix, Mapping[str, PriceMatrix]],
+                      top_n: Optional[int] = 50, min_lucro: float = 0.0,
+                      min_margem: float = 0.0) -> pd.DataFrame:
+        """Ranqueia as rotas compra->venda mais lucrativas entre todas as cidades"""
+        if self._vazio(precos):
+            return pd.DataFrame(columns=COLUNAS_RESULTADO)
+        if self._regional(precos):
+            return self._por_regiao(self.opportunities, precos, top_n, min_lucro, min_margem)
+
+        rotas = self._rotas(precos, min_lucro, min_margem)
+        lucro, valido = rotas[6], rotas[8]
+
+        indices = np.flatnonzero(valido)
+        if top_n is not None and len(indices) > top_n:
+            lucros = lucro.ravel()[indices]
+            melhores = np.argpartition(-lucros, top_n - 1)[:top_n]
+            indices = indices[melhores]
+        indices = indices[np.argsort(-lucro.ravel()[indices], kind="stable")]
+        return self._resultado(rotas, indices)
+
+    def melhores_por_item(self, precos: Union[pd.DataFrame, PriceMatrix, Mapping[str, PriceMatrix]],
+                          top_n: Optional[int] = None, min_lucro: float = 0.0,
+                          min_margem: float = 0.0) -> pd.DataFrame:
+        """A rota mais lucrativa de cada item (entre qualidades e pares de cidades)
+
+        Equivale a opportunities(top_n=None).drop_duplicates("item_id"), mas
+        escolhe a melhor rota com um argmax por item sobre as matrizes densas,
+        sem ordenar todas as rotas.
+        """
+        if self._vazio(precos):
+            return pd.DataFrame(columns=COLUNAS_RESULTADO)
+        if self._regional(precos):
+            return self._por_regiao(self.melhores_por_item, precos, top_n, min_lucro, min_margem)
+
+        rotas = self._rotas(precos, min_lucro, min_margem)
+        (itens, _), lucro, valido = rotas[0], rotas[6], rotas[8]
+
+        # Uma linha por item: todas as qualidades e pares de cidades lado a lado
+        por_item = np.where(valido, lucro, -np.inf).reshape(len(itens), -1)
+        melhores = por_item.argmax(axis=1)
+        com_rota = np.flatnonzero(np.isfinite(por_item[np.arange(len(itens)), melhores]))
+        indices = com_rota * por_item.shape[1] + melhores[com_rota]
+        indices = indices[np.argsort(-lucro.ravel()[indices], kind="stable")]
+        if top_n is not None:
+            indices = indices[:top_n]
+        return self._resultado(rotas, indices)
@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+from core.api import MAX_WORKERS, AlbionPriceAPI
+from core.cache import PriceCache
+from core.historico import PriceWarehouse
+from core.resilience import TokenBucket
+from core.lazy import lazy_import
+
+pd = lazy_import("pandas")
+
+REGIOES = {
+    "west": "https://west.albion-online-data.com/api/v2/stats",
+    "east": "https://east.albion-online-data.com/api/v2/stats",
+    "europe": "https://europe.albion-online-data.com/api/v2/stats",
+}
+
+
+class RegionalPriceAPI:
+    """Um AlbionPriceAPI por servidor, consultados em paralelo
+
+    Cada região tem sua própria sessão HTTP, limitador de taxa, cache e
+    warehouse, já que os servidores da Albion Data têm limites independentes.
+    """
+
+    def __init__(self, regioes: Optional[Iterable[str]] = None, max_workers: int = MAX_WORKERS,
+                 data_dir: Optional[str] = None, stale_while_revalidate: bool = True):
+        self.apis: Dict[str, AlbionPriceAPI] = {}
+        for regiao in regioes or REGIOES:
+            if regiao not in REGIOES:
+                raise ValueError(f"Região desconhecida: {regiao} (use {', '.join(REGIOES)})")
+            cache = PriceCache(
+                persist_path=str(Path(data_dir) / f"precos_cache_{regiao}.pkl") if data_dir else None,
+                stale_while_revalidate=stale_while_revalidate
+            )
+            warehouse = PriceWarehouse(str(Path(data_dir) / "warehouse" / regiao)) if data_dir else None
+            self.apis[regiao] = AlbionPriceAPI(
+                max_workers=max_workers, cache=cache, warehouse=warehouse,
+                limitador=TokenBucket(), base_url=REGIOES[regiao]
+            )
+        self._executor = ThreadPoolExecutor(max_workers=len(self.apis), thread_name_prefix="albion-regiao")
+
+    @property
+    def regioes(self) -> List[str]:
+        return list(self.apis)
+
+    @property
+    def requisicoes(self) -> int:
+        return sum(api.requisicoes for api in self.apis.values())
+
+    def api(self, regiao: str) -> AlbionPriceAPI:
+        return self.apis[regiao]
+
+    def get_prices_bulk(self, item_ids: Iterable[str], locations: Iterable[str],
+                        qualities: Optional[Iterable[int]] = None,
+                        regioes: Optional[Iterable[str]] = None, forcar: bool = False) -> pd.DataFrame:
+        """Dispara a mesma consulta em lote em todas as regiões ao mesmo tempo"""
+        item_ids, locations = list(item_ids), list(locations)
+        qualities = list(qualities) if qualities else None
+        regioes = list(regioes or self.apis)
+
+        futures = {
+            regiao: self._executor.submit(self.apis[regiao].get_prices_bulk, item_ids, locations, qualities,
+                                          forcar=forcar)
+            for regiao in regioes
+        }
+        frames = []
+        for regiao, future in futures.items():
+            try:
+                df = future.result()
+            except Exception as e:
+                print(f"⚠️ Falha ao buscar preços na região {regiao}: {str(e)}")
+                continue
+            if not df.empty:
+                frames.append(df.assign(region=regiao))
+        return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+    def comparar(self, item_ids: Iterable[str], locations: Iterable[str],
+                 coluna: str = "sell_price_min") -> pd.DataFrame:
+        """Tabela item/cidade/qualidade x região para comparar preços entre servidores"""
+        precos = self.get_prices_bulk(item_ids, locations)
+        if precos.empty:
+            return precos
+        return precos.pivot_table(index=["item_id", "city", "quality"], columns="region",
+                                  values=coluna, aggfunc="first")
@@ -0,0 +1,240 @@
+from __future__ import annotations
+
+import random
+import threading
+import time
+from concurrent.futures import Future
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+from typing import Callable, Dict, Optional
+from urllib.parse import urlsplit
+from core.lazy import lazy_import
+from core.metrics import METRICAS
+
+requests = lazy_import("requests")
+
+# Limite público da Albion Data API: 180 requisições por minuto
+TAXA_PADRAO = 180 / 60
+RAJADA_PADRAO = 10
+TENTATIVAS_PADRAO = 5
+BACKOFF_BASE = 0.5
+BACKOFF_MAX = 30.0
+STATUS_RETENTAVEIS = {429, 500, 502, 503, 504}
+
+
+class CircuitoAberto(Exception):
+    """A API está indisponível e o disjuntor está bloqueando novas requisições"""
+
+
+class TokenBucket:
+    """Limitador de taxa token bucket, seguro entre threads"""
+
+    def __init__(self, taxa: float = TAXA_PADRAO, capacidade: int = RAJADA_PADRAO):
+        self.taxa = taxa
+        self.capacidade = capacidade
+        self._tokens = float(capacidade)
+        self._ultimo = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _repor(self):
+        agora = time.monotonic()
+        self._tokens = min(self.capacidade, self._tokens + (agora - self._ultimo) * self.taxa)
+        self._ultimo = agora
+
+    def acquire(self):
+        """Bloqueia até haver um token disponível"""
+        while True:
+            with self._lock:
+                self._repor()
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                espera = (1 - self._tokens) / self.taxa
+            time.sleep(espera)
+
+    def pausar(self, segundos: float):
+        """Esvazia o balde por `segundos` (usado quando o servidor manda Retry-After)"""
+        with self._lock:
+            self._repor()
+            self._tokens = min(self._tokens, -segundos * self.taxa)
+
+
+class CircuitBreaker:
+    """Abre após `limite` falhas seguidas e libera uma tentativa após `espera` segundos
+
+    Passada a espera o circuito fica "meio aberto": só uma requisição de teste
+    passa, e as demais continuam recusadas até ela chamar sucesso() ou falha().
+    Um teste que não voltar em `espera` segundos é considerado perdido e outro
+    é liberado.
+    """
+
+    def __init__(self, limite: int = 5, espera: float = 60.0):
+        self.limite = limite
+        self.espera = espera
+        self.falhas = 0
+        self._aberto_em: Optional[float] = None
+        self._teste_em: Optional[float] = None  # Início da requisição de teste em andamento
+        self._lock = threading.Lock()
+
+    def _recusar(self, agora: float) -> bool:
+        if self._aberto_em is None:
+            return False
+        if agora - self._aberto_em < self.espera:
+            return True
+        return self._teste_em is not None and agora - self._teste_em < self.espera
+
+    @property
+    def aberto(self) -> bool:
+        """Se uma requisição feita agora seria recusada"""
+        with self._lock:
+            return self._recusar(time.monotonic())
+
+    def verificar(self):
+        """Levanta CircuitoAberto durante a espera e enquanto o teste meio aberto não termina"""
+        with self._lock:
+            agora = time.monotonic()
+            recusar = self._recusar(agora)
+            if not recusar and self._aberto_em is not None:
+                self._teste_em = agora  # Esta chamada é a requisição de teste
+        if recusar:
+            raise CircuitoAberto("Albion Data API indisponível, usando dados em cache")
+
+    def sucesso(self):
+        with self._lock:
+            self.falhas = 0
+            self._aberto_em = None
+            self._teste_em = None
+
+    def falha(self):
+        with self._lock:
+            self.falhas += 1
+            self._teste_em = None
+            if self.falhas >= self.limite:
+                # Também reinicia a espera se a tentativa "meio aberta" falhar
+                self._aberto_em = time.monotonic()
+
+
+# Limitador compartilhado por AlbionPriceAPI e AlbionDataUpdater
+LIMITADOR_PADRAO = TokenBucket()
+
+
+def _retry_after(response: requests.Response) -> Optional[float]:
+    """Interpreta o cabeçalho Retry-After (segundos ou data HTTP)"""
+    valor = response.headers.get("Retry-After")
+    if not valor:
+        return None
+    try:
+        return max(0.0, float(valor))
+    except ValueError:
+        pass
+    try:
+        data = parsedate_to_datetime(valor)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, (data - datetime.now(timezone.utc)).total_seconds())
+
+
+def _endpoint(url: str) -> str:
+    """Rótulo curto da URL para as métricas (prices, history, render, items.json...)"""
+    caminho = urlsplit(url).path
+    if "/item/" in caminho:
+        return "render"  # Um ícone por item: o nome do arquivo não serve de rótulo
+    for nome in ("prices", "history"):
+        if f"/{nome}/" in caminho:
+            return nome
+    return caminho.rsplit("/", 1)[-1] or "raiz"
+
+
+class ClienteHTTP:
+    """Sessão HTTP com limite de taxa, retentativas, coalescência e disjuntor"""
+
+    def __init__(self, session: Optional[requests.Session] = None, limitador: TokenBucket = None,
+                 breaker: CircuitBreaker = None, tentativas: int = TENTATIVAS_PADRAO,
+                 timeout: float = 10, criar_sessao: Optional[Callable[[], requests.Session]] = None):
+        # Sem sessão, ela é criada na primeira requisição (requests só é importado aí)
+        self._session = session
+        self._criar_sessao = criar_sessao
+        self.limitador = limitador or LIMITADOR_PADRAO
+        self.breaker = breaker or CircuitBreaker()
+        self.tentativas = tentativas
+        self.timeout = timeout
+        self.requisicoes = 0
+        self.retentativas = 0
+        self._em_voo: Dict[tuple, Future] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def session(self) -> requests.Session:
+        if self._session is None:
+            with self._lock:
+                if self._session is None:
+                    self._session = self._criar_sessao() if self._criar_sessao else requests.Session()
+        return self._session
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        """GET com limite de taxa e backoff exponencial com jitter"""
+        endpoint = _endpoint(url)
+        try:
+            self.breaker.verificar()
+        except CircuitoAberto:
+            METRICAS.incrementar("http_circuito_aberto_total", endpoint=endpoint)
+            raise
+        kwargs.setdefault("timeout", self.timeout)
+
+        for tentativa in range(self.tentativas):
+            self.limitador.acquire()
+            with self._lock:
+                self.requisicoes += 1
+            inicio = time.perf_counter()
+            try:
+                response = self.session.get(url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                METRICAS.incrementar("http_erros_total", endpoint=endpoint, tipo=type(e).__name__)
+                if tentativa == self.tentativas - 1:
+                    self.breaker.falha()
+                    raise
+                espera = None
+            else:
+                METRICAS.observar("http_requisicao_segundos", time.perf_counter() - inicio, endpoint=endpoint)
+                METRICAS.incrementar("http_respostas_total", endpoint=endpoint, status=response.status_code)
+                if response.status_code not in STATUS_RETENTAVEIS:
+                    self.breaker.sucesso()
+                    return response
+                if tentativa == self.tentativas - 1:
+                    self.breaker.falha()
+                    response.raise_for_status()
+                espera = _retry_after(response)
+                if espera is not None:
+                    self.limitador.pausar(espera)
+                response.close()
+
+            if espera is None:
+                espera = random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** tentativa))
+            with self._lock:
+                self.retentativas += 1
+            METRICAS.incrementar("http_retentativas_total", endpoint=endpoint)
+            time.sleep(espera)
+
+    def get_json(self, url: str, params: dict = None):
+        """GET que devolve JSON; chamadas idênticas simultâneas compartilham a mesma resposta"""
+        chave = (url, tuple(sorted((params or {}).items())))
+        with self._lock:
+            future = self._em_voo.get(chave)
+            dono = future is None
+            if dono:
+                future = self._em_voo[chave] = Future()
+
+        if not dono:
+            METRICAS.incrementar("http_coalescidas_total", endpoint=_endpoint(url))
+            return future.result()
+
+        try:
+            response = self.get(url, params=params)
+            response.raise_for_status()
+            future.set_result(response.json())
+        except BaseException as e:
+            future.set_exception(e)
+        finally:
+            with self._lock:
+                del self._em_voo[chave]
+        return future.result()
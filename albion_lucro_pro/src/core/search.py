@@ -0,0 +1,192 @@
+from __future__ import annotations
+
+import heapq
+import os
+import pickle
+import re
+import unicodedata
+from bisect import bisect_left
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Mapping, Optional, Tuple
+from core.catalogo import Catalogo
+from core.lazy import lazy_import
+
+fuzz = lazy_import("fuzzywuzzy.fuzz")
+
+INDEX_VERSION = 1
+MAX_CANDIDATOS = 300  # Candidatos avaliados com fuzzy após o filtro por trigramas
+SCORE_PREFIXO = 85  # Pontuação mínima para itens que começam com o termo buscado
+
+_NAO_ALFANUMERICO = re.compile(r"[^a-z0-9]+")
+
+
+def normalizar(texto: str) -> str:
+    """Remove acentos, pontuação e caixa para comparação de nomes"""
+    if not texto:
+        return ""
+    decomposto = unicodedata.normalize("NFKD", texto)
+    sem_acentos = "".join(c for c in decomposto if not unicodedata.combining(c))
+    return _NAO_ALFANUMERICO.sub(" ", sem_acentos.lower()).strip()
+
+
+def caminho_indice(db_path: str) -> Path:
+    """Arquivo do índice persistido, ao lado do banco de itens"""
+    return Path(db_path).with_name("indice_busca.pkl")
+
+
+def trigramas(texto: str) -> set:
+    """Gera os trigramas de um texto já normalizado"""
+    texto = f"  {texto} "
+    return {texto[i:i + 3] for i in range(len(texto) - 2)}
+
+
+class SearchIndex:
+    """Índice invertido de trigramas + prefixos sobre os nomes PT-BR e EN-US"""
+
+    def __init__(self):
+        self.item_ids: List[str] = []  # item de cada entrada
+        self.nomes: List[str] = []  # nome normalizado de cada entrada
+        self.trigramas: Dict[str, List[int]] = {}
+        self.prefixos: List[Tuple[str, int]] = []  # (sufixo iniciado em palavra, entrada)
+
+    @classmethod
+    def build(cls, itens: Mapping[str, dict]) -> "SearchIndex":
+        """Constrói o índice a partir do cache de itens"""
+        index = cls()
+        if isinstance(itens, Catalogo):
+            # Lê só as colunas de nomes, sem montar um dict por item
+            nomes = zip(itens.ids, itens.coluna("nome"), itens.coluna("nome_en"))
+        else:
+            nomes = ((item_id, dados.get("nome"), dados.get("nome_en")) for item_id, dados in itens.items())
+        for item_id, *nomes_item in nomes:
+            index.adicionar_item(item_id, *nomes_item)
+        return index.concluir()
+
+    def adicionar_item(self, item_id: str, *nomes: Optional[str]):
+        """Indexa os nomes de um item; concluir() deve ser chamado após o último
+
+        Usado pelo updater para montar o índice na mesma passada do dump.
+        """
+        vistos = set()
+        for nome in nomes:
+            nome = normalizar(nome or "")
+            if nome and nome not in vistos:
+                vistos.add(nome)
+                self._adicionar(item_id, nome)
+
+    def concluir(self) -> "SearchIndex":
+        """Ordena os prefixos para a busca binária"""
+        self.prefixos.sort()
+        return self
+
+    def _adicionar(self, item_id: str, nome: str):
+        entrada = len(self.nomes)
+        self.item_ids.append(item_id)
+        self.nomes.append(nome)
+
+        for tri in trigramas(nome):
+            self.trigramas.setdefault(tri, []).append(entrada)
+
+        # Cada início de palavra vira um prefixo ("longa" encontra "espada longa")
+        self.prefixos.append((nome, entrada))
+        for pos, char in enumerate(nome):
+            if char == " ":
+                self.prefixos.append((nome[pos + 1:], entrada))
+
+    def _por_prefixo(self, termo: str) -> set:
+        entradas = set()
+        pos = bisect_left(self.prefixos, (termo, -1))
+        while (pos < len(self.prefixos) and len(entradas) < MAX_CANDIDATOS
+               and self.prefixos[pos][0].startswith(termo)):
+            entradas.add(self.prefixos[pos][1])
+            pos += 1
+        return entradas
+
+    def _por_trigramas(self, termo: str) -> List[int]:
+        contagem = Counter()
+        for tri in trigramas(termo):
+            postings = self.trigramas.get(tri)
+            if postings:
+                contagem.update(postings)
+        melhores = heapq.nlargest(MAX_CANDIDATOS, contagem.items(), key=lambda par: par[1])
+        return [entrada for entrada, _ in melhores]
+
+    def search(self, nome: str, limite: int = 10, threshold: int = 70) -> List[Tuple[str, int]]:
+        """Retorna até `limite` pares (item_id, similaridade), do mais ao menos similar"""
+        termo = normalizar(nome)
+        if not termo:
+            return []
+
+        melhores: Dict[str, int] = {}
+
+        def registrar(entrada: int, score: int):
+            item_id = self.item_ids[entrada]
+            if score > melhores.get(item_id, -1):
+                melhores[item_id] = score
+
+        prefixados = self._por_prefixo(termo)
+        for entrada in prefixados:
+            alvo = self.nomes[entrada]
+            score = 100 if alvo == termo else max(fuzz.ratio(termo, alvo), SCORE_PREFIXO)
+            registrar(entrada, score)
+
+        for entrada in self._por_trigramas(termo):
+            if entrada in prefixados:
+                continue
+            score = fuzz.ratio(termo, self.nomes[entrada])
+            if score > threshold:
+                registrar(entrada, score)
+
+        return heapq.nlargest(limite, melhores.items(), key=lambda par: (par[1], par[0]))
+
+    def save(self, path: Path, assinatura: Optional[str]):
+        """Persiste o índice ao lado do cache de itens"""
+        tmp_path = Path(path).with_suffix(".tmp")
+        estado = {
+            "versao": INDEX_VERSION,
+            "assinatura": assinatura,
+            "item_ids": self.item_ids,
+            "nomes": self.nomes,
+            "trigramas": self.trigramas,
+            "prefixos": self.prefixos,
+        }
+        with open(tmp_path, "wb") as f:
+            pickle.dump(estado, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: Path, assinatura: Optional[str]) -> Optional["SearchIndex"]:
+        """Carrega o índice persistido se ele corresponder ao cache atual"""
+        try:
+            with open(path, "rb") as f:
+                estado = pickle.load(f)
+        except (FileNotFoundError, EOFError, pickle.UnpicklingError):
+            return None
+
+        if estado.get("versao") != INDEX_VERSION or estado.get("assinatura") != assinatura:
+            return None
+
+        index = cls()
+        index.item_ids = estado["item_ids"]
+        index.nomes = estado["nomes"]
+        index.trigramas = estado["trigramas"]
+        index.prefixos = estado["prefixos"]
+        return index
+
+    @classmethod
+    def load_or_build(cls, itens: Mapping[str, dict], path: Path,
+                      assinatura: Optional[str]) -> "SearchIndex":
+        """Reaproveita o índice em disco ou reconstrói e persiste um novo"""
+        if assinatura is not None:
+            index = cls.load(path, assinatura)
+            if index is not None:
+                return index
+
+        index = cls.build(itens)
+        try:
+            index.save(path, assinatura)
+        except OSError as e:
+            print(f"⚠️ Não foi possível salvar o índice de busca: {str(e)}")
+        return index
+
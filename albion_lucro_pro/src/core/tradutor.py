@@ -1,19 +1,35 @@
-import json
-from fuzzywuzzy import fuzz
 from typing import Dict, List
 from core.database import ItemDatabase
-from core.api import AlbionAPI
+from core.api import AlbionPriceAPI
+from core.catalogo import Catalogo
+from core.metrics import METRICAS
+from core.search import SearchIndex, caminho_indice
 
 class Tradutor:
-    def __init__(self, db: ItemDatabase, api: AlbionAPI):
+    def __init__(self, db: ItemDatabase, api: AlbionPriceAPI = None):
         self.db = db
         self.api = api
-        self.itens = self.db.load_items()
-        self.categorias = self.db.load_categories()
+        self.itens: Catalogo = self.db.load_catalog()
 
-        if self.db.needs_initial_load():
+        if self.db.needs_initial_load() and self.api is not None:
             self._carregar_dados_iniciais()
 
+        self._construir_indice()
+
+    @property
+    def categorias(self) -> Dict[str, str]:
+        """Mapeamento item -> categoria derivado do catálogo"""
+        return self.itens.mapa_categorias()
+
+    @METRICAS.cronometrado("busca.indice")
+    def _construir_indice(self):
+        """Carrega (ou constrói) o índice de busca persistido ao lado do banco de itens"""
+        self.indice = SearchIndex.load_or_build(
+            self.itens,
+            caminho_indice(self.db.db_path),
+            self.db.revisao()
+        )
+
     def _carregar_dados_iniciais(self):
         """Popula os arquivos de cache na primeira execução"""
         print("⏳ Carregando metadados dos itens pela primeira vez...")
@@ -43,23 +59,20 @@ class Tradutor:
             
             # Salva no cache
             self.db.save_all_data(itens_cache, categorias_cache)
-            self.itens = itens_cache
-            self.categorias = categorias_cache
+            self.itens = self.db.load_catalog()
             
             print("✅ Metadados carregados com sucesso!")
         except Exception as e:
             print(f"❌ Erro ao carregar metadados: {str(e)}")
 
+    @METRICAS.cronometrado("busca.fuzzy")
     def buscar_por_nome(self, nome: str) -> List[dict]:
-        """Busca itens por nome (com fuzzy matching)"""
-        resultados = []
-        for item_id, dados in self.itens.items():
-            similaridade = fuzz.ratio(nome.lower(), dados["nome"].lower())
-            if similaridade > 70:  # Threshold ajustável
-                resultados.append({
-                    "id": item_id,
-                    **dados,
-                    "similaridade": similaridade
-                })
-        
-        return sorted(resultados, key=lambda x: x["similaridade"], reverse=True)[:10]  # Top 10
\ No newline at end of file
+        """Busca itens por nome (com fuzzy matching sobre o índice de trigramas)"""
+        return [
+            {
+                "id": item_id,
+                **self.itens[item_id],
+                "similaridade": similaridade
+            }
+            for item_id, similaridade in self.indice.search(nome, limite=10, threshold=70)
+        ]
\ No newline at end of file
@@ -1,94 +1,386 @@
 import json
 import os
-import time
+import tempfile
 from datetime import datetime, timedelta
+from operator import itemgetter
 from pathlib import Path
 import requests
-from typing import Dict, List
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from core.database import ItemDatabase
+from core.metrics import METRICAS
+from core.resilience import ClienteHTTP
+from core.search import SearchIndex, caminho_indice
+
+try:
+    import ijson
+except ImportError:  # Sem ijson o dump é carregado inteiro em memória
+    ijson = None
+
+# Campos comparados para decidir se um item mudou desde a última atualização
+CAMPOS_DIFF = ("nome", "nome_en", "tier", "categoria", "subcategoria", "encantamento", "qualidade")
+CHUNK_SIZE = 1 << 16
+_POR_ID = itemgetter("id")
+
+
+def _somar_repetidos(recursos: List[dict]) -> List[dict]:
+    """Junta um recurso listado mais de uma vez na mesma receita (lista ordenada por ID)
+
+    O banco guarda um recurso por receita; sem somar, a receita gravada
+    diferiria da extraída e o item seria regravado a cada atualização.
+    """
+    unicos = [recursos[0]]
+    for recurso in recursos[1:]:
+        anterior = unicos[-1]
+        if recurso["id"] == anterior["id"]:
+            anterior["quantidade"] += recurso["quantidade"]
+            anterior["artefato"] = anterior["artefato"] or recurso["artefato"]
+        else:
+            unicos.append(recurso)
+    return unicos
+
+
+def extrair_receitas(item: dict) -> List[dict]:
+    """Extrai as receitas (recursos, quantidades, artefatos, foco) de um registro do items.json bruto
+
+    Também serve para os blocos de `enchantments`, que têm o mesmo formato.
+    """
+    requisitos = item.get('craftingrequirements', item.get('CraftingRequirements'))
+    if requisitos is None:
+        return []
+    receitas = []
+    # Laço mais quente do processamento do dump. O dump usa objeto único ou lista
+    # para o mesmo campo; as duas formas são tratadas aqui sem chamadas auxiliares
+    for requisito in requisitos if isinstance(requisitos, list) else (requisitos,):
+        recursos = requisito.get('craftresource')
+        if recursos is None:
+            continue
+        extraidos = []
+        for recurso in recursos if isinstance(recursos, list) else (recursos,):
+            recurso_id = recurso.get('@uniquename')
+            if not recurso_id:
+                continue
+            nivel = recurso.get('@enchantmentlevel')
+            if nivel and nivel != "0":
+                recurso_id = f"{recurso_id}@{nivel}"  # Recurso encantado (ex: T4_PLANKS_LEVEL1@1)
+            extraidos.append({
+                "id": recurso_id,
+                "quantidade": int(recurso.get('@count', 1)),
+                # Artefatos e similares não entram no retorno de recursos
+                "artefato": recurso.get('@maxreturnamount') == "0" or "_ARTEFACT_" in recurso_id,
+            })
+        if extraidos:
+            if len(extraidos) > 1:
+                extraidos = _somar_repetidos(sorted(extraidos, key=_POR_ID))
+            receitas.append({
+                "silver": int(requisito.get('@silver', 0)),
+                "focus": int(requisito.get('@craftingfocus', 0)),
+                "quantidade": int(requisito.get('@amountcrafted', 1)),
+                "recursos": extraidos,
+            })
+    return receitas
+
+
+def _como_lista(valor) -> list:
+    """O dump usa objeto único ou lista para o mesmo campo"""
+    if valor is None:
+        return []
+    return valor if isinstance(valor, list) else [valor]
+
+
+def _registro_bruto(prefixo: str) -> bool:
+    """Prefixos ijson dos registros do items.json bruto: items.<tipo> ou items.<tipo>.item"""
+    partes = prefixo.split(".")
+    return partes[0] == "items" and (len(partes) == 2 or (len(partes) == 3 and partes[2] == "item"))
+
+
+def receitas_por_id(registros: Iterable[dict]) -> Dict[str, List[dict]]:
+    """Receitas do items.json bruto indexadas pelo UniqueName do dump formatado
+
+    O bruto traz as variantes encantadas dentro do item base (`enchantments`).
+    Equipamentos usam o ID BASE@N e recursos refinados BASE_LEVELN@N no dump
+    formatado; as duas chaves são geradas e a junção por ID usa a que existir.
+    """
+    receitas: Dict[str, List[dict]] = {}
+    for registro in registros:
+        base = registro.get('@uniquename')
+        if not base:
+            continue
+        extraidas = extrair_receitas(registro)
+        if extraidas:
+            receitas[base] = extraidas
+        encantamentos = (registro.get('enchantments') or {}).get('enchantment')
+        for encantamento in _como_lista(encantamentos):
+            nivel = encantamento.get('@enchantmentlevel')
+            extraidas = extrair_receitas(encantamento)
+            if nivel and extraidas:
+                receitas[f"{base}@{nivel}"] = receitas[f"{base}_LEVEL{nivel}@{nivel}"] = extraidas
+    return receitas
+
+
+def processar_registro(item: dict, receitas: Optional[List[dict]] = None) -> dict:
+    """Extrai os campos relevantes de um registro do dump formatado
+
+    As receitas vêm do items.json bruto (receitas_por_id); o formatado não as tem.
+    """
+    item_id = item['UniqueName']
+    nomes = item.get('LocalizedNames') or {}
+    return {
+        "id": item_id,
+        "nome": nomes.get('PT-BR', item_id),
+        "nome_en": nomes.get('EN-US', ''),
+        "tier": f"T{item.get('Tier', '?')}",
+        "categoria": item.get('ItemType'),
+        "subcategoria": item.get('ItemGroup'),
+        "encantamento": item.get('EnchantmentLevel', 0),
+        "qualidade": item.get('Quality'),
+        "img_url": f"https://render.albiononline.com/v1/item/{item_id}.png",
+        "receitas": receitas if receitas is not None else extrair_receitas(item),
+    }
+
+
+def assinatura(dados: dict, receitas: List[dict]) -> tuple:
+    """Campos comparados com o banco para decidir se o item mudou"""
+    return tuple(str(dados.get(campo)) for campo in CAMPOS_DIFF) + (receitas,)
+
+
+def _escrever_atomico(path: Path, conteudo: str):
+    """Escreve em um arquivo temporário e renomeia sobre o destino"""
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(conteudo)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
 
 class AlbionDataUpdater:
-    def __init__(self, db_path: str = "./data"):
+    def __init__(self, db_path: str = "./data", db: ItemDatabase = None):
         self.db_path = db_path
-        self.items_file = Path(db_path) / "itens.json"
-        self.categories_file = Path(db_path) / "categorias.json"
+        self.db = db or ItemDatabase(str(Path(db_path) / "albion.db"))
         self.last_update_file = Path(db_path) / "last_update.txt"
         self.data_url = "https://raw.githubusercontent.com/ao-data/ao-bin-dumps/master/formatted/items.json"
+        # O formatado só tem nomes e índices; as receitas vêm do dump bruto
+        self.receitas_url = "https://raw.githubusercontent.com/ao-data/ao-bin-dumps/master/items.json"
         self.update_interval = timedelta(days=1)  # Verifica atualizações diariamente
+        # Prefixo de meta -> (ETag, Last-Modified) do último download
+        self._cabecalhos_pendentes: Dict[str, Tuple[Optional[str], Optional[str]]] = {}
+        self.http = ClienteHTTP(requests.Session())  # Compartilha o limitador com a AlbionPriceAPI
 
     def needs_update(self) -> bool:
         """Verifica se precisa atualizar baseado no último update"""
         if not self.last_update_file.exists():
             return True
-            
+
         with open(self.last_update_file, "r") as f:
             last_update = datetime.fromisoformat(f.read())
         return datetime.now() - last_update > self.update_interval
 
-    def download_all_items(self) -> List[dict]:
-        """Baixa todos os itens do repositório oficial"""
+    def _baixar(self, url: str, meta: str, condicional: bool = True) -> Optional[Path]:
+        """Baixa `url` para um arquivo temporário, ou None se não mudou (HTTP 304)"""
+        headers = {}
+        etag = self.db.get_meta(f"{meta}_etag")
+        last_modified = self.db.get_meta(f"{meta}_last_modified")
+        if condicional and etag:
+            headers["If-None-Match"] = etag
+        if condicional and last_modified:
+            headers["If-Modified-Since"] = last_modified
+
+        with self.http.get(url, headers=headers, stream=True, timeout=60) as response:
+            if response.status_code == 304:
+                return None
+            response.raise_for_status()
+
+            fd, tmp_path = tempfile.mkstemp(dir=self.db_path, prefix=f".{meta}.", suffix=".json")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                        f.write(chunk)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+
+            self._cabecalhos_pendentes[meta] = (
+                response.headers.get("ETag"),
+                response.headers.get("Last-Modified")
+            )
+        return Path(tmp_path)
+
+    @METRICAS.cronometrado("updater.download_all_items")
+    def download_all_items(self, condicional: bool = True) -> Optional[Path]:
+        """Baixa o dump formatado (nomes), ou None se não mudou (HTTP 304)"""
         print("⏳ Baixando metadados completos do Albion...")
-        response = requests.get(self.data_url)
-        response.raise_for_status()
-        return response.json()
+        return self._baixar(self.data_url, "dump", condicional)
 
-    def process_items(self, items_data: List[dict]) -> Dict[str, dict]:
-        """Processa todos os itens e extrai campos relevantes"""
-        processed = {}
-        
+    @METRICAS.cronometrado("updater.download_recipes")
+    def download_recipes(self, condicional: bool = True) -> Optional[Path]:
+        """Baixa o items.json bruto (receitas), ou None se não mudou (HTTP 304)"""
+        print("⏳ Baixando receitas de fabricação...")
+        return self._baixar(self.receitas_url, "receitas", condicional)
+
+    def iter_items(self, dump_path: Path) -> Iterator[dict]:
+        """Percorre os itens do dump sem carregá-lo inteiro (quando ijson está disponível)"""
+        with open(dump_path, "rb") as f:
+            if ijson is not None:
+                yield from ijson.items(f, "item")
+            else:
+                yield from json.load(f)
+
+    def iter_registros_brutos(self, bruto_path: Path) -> Iterator[dict]:
+        """Percorre os registros do items.json bruto, agrupados por tipo sob "items"
+
+        Cada tipo (equipmentitem, simpleitem, weapon...) é uma lista de registros
+        ou um objeto único. Com ijson, só um registro fica montado por vez.
+        """
+        with open(bruto_path, "rb") as f:
+            if ijson is None:
+                for tipo in json.load(f).get("items", {}).values():
+                    if isinstance(tipo, (dict, list)):
+                        yield from _como_lista(tipo)
+                return
+
+            construtor, profundidade = None, 0
+            for prefixo, evento, valor in ijson.parse(f):
+                if construtor is None:
+                    if evento != "start_map" or not _registro_bruto(prefixo):
+                        continue
+                    construtor = ijson.ObjectBuilder()
+                construtor.event(evento, valor)
+                if evento in ("start_map", "start_array"):
+                    profundidade += 1
+                elif evento in ("end_map", "end_array"):
+                    profundidade -= 1
+                    if profundidade == 0:
+                        yield construtor.value
+                        construtor = None
+
+    @METRICAS.cronometrado("updater.load_recipes")
+    def ler_receitas(self, bruto_path: Optional[Path]) -> Optional[Dict[str, List[dict]]]:
+        """Receitas do items.json bruto por ID (None sem o arquivo)"""
+        if bruto_path is None:
+            return None
+        return receitas_por_id(self.iter_registros_brutos(bruto_path))
+
+    def processar(self, items_data: Iterable[dict], atuais: Optional[Dict[str, tuple]] = None,
+                  receitas: Optional[Dict[str, List[dict]]] = None,
+                  indice: Optional[SearchIndex] = None) -> Tuple[List[dict], List[str]]:
+        """Processa o dump em uma passada, na ordem do dump: (itens, IDs vistos)
+
+        Consome o iterador conforme o ijson lê o arquivo, então só os itens
+        extraídos ficam em memória. Com `atuais` (assinaturas do banco), só os
+        itens alterados são retornados. `receitas` (de ler_receitas) é juntado
+        por ID; sem ele, as receitas são lidas do próprio registro. Com `indice`,
+        os nomes de todos os itens vistos são indexados nesta mesma passada.
+
+        Roda em um processo só: enviar os registros a um pool custa mais em
+        serialização (pickle) do que extrair os campos aqui mesmo.
+        """
+        processados, vistos = [], []
         for item in items_data:
             try:
-                item_id = item['UniqueName']
-                processed[item_id] = {
-                    "id": item_id,
-                    "nome": item.get('LocalizedNames', {}).get('PT-BR', item_id),
-                    "nome_en": item.get('LocalizedNames', {}).get('EN-US', ''),
-                    "tier": f"T{item.get('Tier', '?')}",
-                    "categoria": item.get('ItemType'),
-                    "subcategoria": item.get('ItemGroup'),
-                    "encantamento": item.get('EnchantmentLevel', 0),
-                    "qualidade": item.get('Quality'),
-                    "img_url": f"https://render.albiononline.com/v1/item/{item_id}.png",
-                    "last_updated": datetime.now().isoformat()
-                }
+                dados = processar_registro(
+                    item, receitas.get(item['UniqueName'], []) if receitas is not None else None
+                )
             except Exception as e:
                 print(f"⚠️ Erro processando item {item.get('UniqueName')}: {str(e)}")
-        
+                # Registro malformado não é remoção: o item guardado no banco é mantido
+                if isinstance(item, dict) and item.get('UniqueName'):
+                    vistos.append(item['UniqueName'])
+                    guardado = (atuais or {}).get(item['UniqueName'])
+                    if indice is not None and guardado is not None:
+                        # Nomes do banco (as assinaturas começam por nome e nome_en, ver CAMPOS_DIFF)
+                        indice.adicionar_item(item['UniqueName'], *(n for n in guardado[:2] if n != "None"))
+                continue
+            vistos.append(dados["id"])
+            if indice is not None:
+                indice.adicionar_item(dados["id"], dados["nome"], dados["nome_en"])
+            if atuais is None or atuais.get(dados["id"]) != assinatura(dados, dados["receitas"]):
+                processados.append(dados)
+        return processados, vistos
+
+    @METRICAS.cronometrado("updater.process_items")
+    def process_items(self, items_data: Iterable[dict],
+                      receitas: Optional[Dict[str, List[dict]]] = None) -> Dict[str, dict]:
+        """Processa todos os itens e extrai campos relevantes"""
+        agora = datetime.now().isoformat()
+        processed = {}
+        for dados in self.processar(items_data, receitas=receitas)[0]:
+            dados["last_updated"] = agora
+            processed[dados["id"]] = dados
         return processed
 
+    @METRICAS.cronometrado("updater.diff_items")
+    def diff_items(self, items_data: Iterable[dict], receitas: Optional[Dict[str, List[dict]]] = None,
+                   indice: Optional[SearchIndex] = None) -> Tuple[Dict[str, dict], List[str]]:
+        """Compara o dump com o banco e retorna (inserções/atualizações, remoções)"""
+        receitas_atuais = self.db.load_recipes()
+        atuais = {
+            item_id: assinatura(dados, receitas_atuais.get(item_id, []))
+            for item_id, dados in self.db.load_items().items()
+        }
+        agora = datetime.now().isoformat()
+
+        alterados, vistos = self.processar(items_data, atuais, receitas, indice)
+        upserts = {}
+        for dados in alterados:
+            dados["last_updated"] = agora
+            upserts[dados["id"]] = dados
+
+        vistos = set(vistos)
+        deletes = [item_id for item_id in atuais if item_id not in vistos]
+        return upserts, deletes
+
+    def _marcar_atualizado(self):
+        _escrever_atomico(self.last_update_file, datetime.now().isoformat())
+
+    @METRICAS.cronometrado("updater.update_if_needed")
     def update_if_needed(self) -> bool:
-        """Executa atualização completa se necessário"""
+        """Executa atualização incremental se necessário"""
         if not self.needs_update():
             return False
 
+        dump_path = bruto_path = None
         try:
             # Cria diretório se não existir
             os.makedirs(self.db_path, exist_ok=True)
-            
-            # Baixa e processa dados
-            items_data = self.download_all_items()
-            processed_items = self.process_items(items_data)
-            
-            # Extrai categorias
-            categories = {
-                item_id: data['categoria'] 
-                for item_id, data in processed_items.items()
-                if data.get('categoria')
-            }
-            
-            # Salva arquivos
-            with open(self.items_file, 'w', encoding='utf-8') as f:
-                json.dump(processed_items, f, indent=4, ensure_ascii=False)
-            
-            with open(self.categories_file, 'w', encoding='utf-8') as f:
-                json.dump(categories, f, indent=4, ensure_ascii=False)
-            
-            # Atualiza timestamp
-            with open(self.last_update_file, 'w') as f:
-                f.write(datetime.now().isoformat())
-            
-            print(f"✅ Dados atualizados! {len(processed_items)} itens processados.")
-            return True
-            
+
+            # Requisições condicionais: sem mudanças upstream não há mais nada a fazer
+            self._cabecalhos_pendentes = {}
+            bruto_path = self.download_recipes()
+            dump_path = self.download_all_items()
+            if dump_path is None and bruto_path is None:
+                self._marcar_atualizado()
+                print("✅ Metadados já estão atualizados.")
+                return False
+            # O diff precisa dos dois arquivos: baixa de novo o que não mudou
+            if dump_path is None:
+                dump_path = self.download_all_items(condicional=False)
+            if bruto_path is None:
+                bruto_path = self.download_recipes(condicional=False)
+
+            indice = SearchIndex()
+            upserts, deletes = self.diff_items(self.iter_items(dump_path), self.ler_receitas(bruto_path), indice)
+            self.db.apply_changes(upserts, deletes)
+            if upserts or deletes:
+                # Índice montado na passada do diff, gravado com a nova revisão: a
+                # interface o carrega pronto em vez de reconstruí-lo na abertura
+                indice.concluir().save(caminho_indice(self.db.db_path), self.db.revisao())
+
+            for meta, (etag, last_modified) in self._cabecalhos_pendentes.items():
+                self.db.set_meta(f"{meta}_etag", etag)
+                self.db.set_meta(f"{meta}_last_modified", last_modified)
+            # Snapshot binário lido pela interface na abertura
+            self.db.write_snapshot()
+            self._marcar_atualizado()
+
+            print(f"✅ Dados atualizados! {len(upserts)} itens alterados, {len(deletes)} removidos.")
+            return bool(upserts or deletes)
+
         except Exception as e:
             print(f"❌ Falha na atualização: {str(e)}")
-            return False
\ No newline at end of file
+            return False
+        finally:
+            for path in (dump_path, bruto_path):
+                if path is not None and path.exists():
+                    path.unlink()
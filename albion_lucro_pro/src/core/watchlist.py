@@ -0,0 +1,230 @@
+from __future__ import annotations
+
+import json
+import os
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from core.api import AlbionPriceAPI
+from core.lazy import lazy_import
+from core.metrics import METRICAS
+from core.price_matrix import PriceMatrix
+from core.profit import ProfitEngine
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+CIDADES_PADRAO = ["Caerleon", "Bridgewatch", "Thetford", "Fort Sterling", "Martlock", "Lymhurst"]
+INTERVALO_PADRAO = 60  # Segundos entre consultas
+MARGEM_ALERTA = 0.10  # Alerta quando a margem da melhor rota passa deste valor
+VARIACAO_MINIMA = 0.05  # Variação de preço que faz a linha ser reenviada para a interface
+
+# Melhor rota de cada item vigiado (uma linha por item)
+COLUNAS_SNAPSHOT = ["quality", "buy_city", "sell_city", "buy_price", "sell_price", "lucro", "margem", "idade_min"]
+
+
+class Watchlist:
+    """Itens vigiados consultados em lote, entregando só as linhas que mudaram
+
+    Cada verificação faz uma única busca em lote (o custo cresce com o número
+    de requisições, não de itens) e compara a melhor rota de cada item com a
+    última versão publicada. Só vão para a interface os itens cuja rota mudou,
+    cujo preço variou mais que `variacao_minima` ou cuja margem cruzou
+    `margem_alerta`; os alertas também são gravados em um log JSON lines.
+
+    As respostas são mescladas em uma PriceMatrix por região (rotas nunca
+    cruzam servidores): se parte de uma consulta falhar, os itens afetados
+    continuam com o último preço conhecido.
+    """
+
+    def __init__(self, api: AlbionPriceAPI, engine: Optional[ProfitEngine] = None,
+                 path: Optional[str] = "./data/watchlist.json",
+                 log_path: Optional[str] = "./data/alertas.jsonl",
+                 cidades: Optional[List[str]] = None, margem_alerta: float = MARGEM_ALERTA,
+                 variacao_minima: float = VARIACAO_MINIMA, precos: Optional[PriceMatrix] = None):
+        self.api = api
+        self.engine = engine or ProfitEngine()
+        self.path = Path(path) if path else None
+        self.log_path = Path(log_path) if log_path else None
+        self.cidades = list(cidades or CIDADES_PADRAO)
+        self.margem_alerta = margem_alerta
+        self.variacao_minima = variacao_minima
+        self.item_ids: List[str] = []
+        # Região -> matriz, criadas no primeiro uso (evita importar o NumPy na abertura);
+        # "" é a API de uma região só (frames sem a coluna "region")
+        self._precos: Dict[str, PriceMatrix] = {"": precos} if precos is not None else {}
+        self._publicado: Optional[pd.DataFrame] = None  # Última versão entregue de cada linha
+        self._lock = threading.Lock()
+        self.carregar()
+
+    # ---------- itens vigiados ----------
+
+    def carregar(self):
+        if self.path is None or not self.path.exists():
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                dados = json.load(f)
+        except json.JSONDecodeError:
+            return
+        self.item_ids = list(dict.fromkeys(dados.get("itens", [])))
+        self.cidades = dados.get("cidades") or self.cidades
+
+    def salvar(self):
+        """Persiste os itens e cidades vigiados (escrita atômica)"""
+        if self.path is None:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"itens": self.item_ids, "cidades": self.cidades}, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.path)
+
+    def adicionar(self, item_ids: Iterable[str]) -> int:
+        """Passa a vigiar os itens; retorna quantos eram novos"""
+        with self._lock:
+            antes = len(self.item_ids)
+            self.item_ids = list(dict.fromkeys([*self.item_ids, *item_ids]))
+            novos = len(self.item_ids) - antes
+        if novos:
+            self.salvar()
+        return novos
+
+    def remover(self, item_ids: Iterable[str]):
+        remover = set(item_ids)
+        with self._lock:
+            self.item_ids = [item_id for item_id in self.item_ids if item_id not in remover]
+            if self._publicado is not None:
+                self._publicado = self._publicado.drop(index=list(remover), errors="ignore")
+        self.salvar()
+
+    def __len__(self) -> int:
+        return len(self.item_ids)
+
+    def __contains__(self, item_id: str) -> bool:
+        return item_id in self.item_ids
+
+    def matriz(self, regiao: str = "") -> PriceMatrix:
+        with self._lock:
+            matriz = self._precos.get(regiao)
+            if matriz is None:
+                matriz = self._precos[regiao] = PriceMatrix(self.cidades)
+            return matriz
+
+    @property
+    def precos(self) -> PriceMatrix:
+        """Matriz da API de uma região só (a usada pela interface)"""
+        return self.matriz()
+
+    def _mesclar(self, precos: pd.DataFrame):
+        if "region" not in precos:
+            self.precos.atualizar(precos)
+            return
+        for regiao, grupo in precos.groupby("region", sort=False):
+            self.matriz(regiao).atualizar(grupo)
+
+    # ---------- verificação ----------
+
+    def _snapshot(self, item_ids: List[str]) -> pd.DataFrame:
+        """Melhor rota de cada item vigiado (NaN para itens sem rota lucrativa)"""
+        with self._lock:
+            regionais = {regiao: matriz for regiao, matriz in self._precos.items() if regiao}
+        # Com várias regiões, a melhor rota de cada item entre elas (cada rota dentro de um servidor)
+        melhores = self.engine.melhores_por_item(regionais or self.precos)
+        melhores = melhores.drop_duplicates("item_id").set_index("item_id")
+        return melhores.reindex(index=pd.Index(item_ids, name="item_id"), columns=COLUNAS_SNAPSHOT)
+
+    def _variacao(self, atual: pd.Series, anterior: pd.Series) -> pd.Series:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return ((atual - anterior).abs() / anterior).fillna(0.0)
+
+    def diff(self, atual: pd.DataFrame) -> Tuple[pd.DataFrame, List[dict]]:
+        """Compara com a última versão publicada: (linhas alteradas, alertas)"""
+        if self._publicado is None:
+            anterior = pd.DataFrame(index=atual.index, columns=COLUNAS_SNAPSHOT)
+            novo = pd.Series(True, index=atual.index)
+        else:
+            anterior = self._publicado.reindex(atual.index)
+            novo = pd.Series(~atual.index.isin(self._publicado.index), index=atual.index)
+
+        margem_atual = atual["margem"].astype(float)
+        margem_anterior = anterior["margem"].astype(float)
+        acima = margem_atual >= self.margem_alerta
+        estava_acima = margem_anterior >= self.margem_alerta
+
+        rota_mudou = ((atual["buy_city"].fillna("") != anterior["buy_city"].fillna(""))
+                      | (atual["sell_city"].fillna("") != anterior["sell_city"].fillna("")))
+        variacao = np.maximum(
+            self._variacao(atual["buy_price"].astype(float), anterior["buy_price"].astype(float)),
+            self._variacao(atual["sell_price"].astype(float), anterior["sell_price"].astype(float)),
+        )
+        moveu = (variacao > self.variacao_minima) & ~rota_mudou
+        mudou = novo | rota_mudou | moveu | (acima != estava_acima)
+
+        agora = datetime.now().isoformat(timespec="seconds")
+        alertas = []
+        for item_id in atual.index[acima & ~estava_acima]:
+            linha = atual.loc[item_id]
+            alertas.append({
+                "timestamp": agora, "item_id": item_id, "tipo": "margem",
+                "mensagem": f"{item_id}: margem {linha['margem']:.1%} "
+                            f"({linha['buy_city']} -> {linha['sell_city']}, lucro {linha['lucro']:,.0f})",
+                **{coluna: linha[coluna] for coluna in ("buy_city", "sell_city", "buy_price", "sell_price", "margem")},
+            })
+        for item_id in atual.index[moveu & acima]:
+            alertas.append({
+                "timestamp": agora, "item_id": item_id, "tipo": "preco",
+                "mensagem": f"{item_id}: preço variou {variacao[item_id]:.1%} (margem {margem_atual[item_id]:.1%})",
+                "variacao": float(variacao[item_id]),
+            })
+
+        # Linhas abaixo dos limites mantêm a versão publicada, para a variação acumular
+        mascara = np.broadcast_to(mudou.to_numpy()[:, None], atual.shape)
+        self._publicado = atual.where(mascara, anterior)
+        return atual[mudou].reset_index(), alertas
+
+    def _registrar_alertas(self, alertas: List[dict]):
+        if not alertas or self.log_path is None:
+            return
+        self.log_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.log_path, "a", encoding="utf-8") as f:
+            for alerta in alertas:
+                f.write(json.dumps(alerta, ensure_ascii=False, default=str) + "\n")
+
+    @METRICAS.cronometrado("watchlist.verificar")
+    def verificar(self) -> Tuple[pd.DataFrame, List[dict]]:
+        """Consulta todos os itens vigiados em lote e retorna (linhas alteradas, alertas)"""
+        with self._lock:
+            item_ids = list(self.item_ids)
+        if not item_ids:
+            return pd.DataFrame(columns=["item_id", *COLUNAS_SNAPSHOT]), []
+
+        # forcar=True: a watchlist quer o preço atual, não o que ainda está no TTL do cache
+        self._mesclar(self.api.get_prices_bulk(item_ids, self.cidades, forcar=True))
+        atual = self._snapshot(item_ids)
+        with self._lock:
+            alteradas, alertas = self.diff(atual)
+        self._registrar_alertas(alertas)
+        METRICAS.incrementar("watchlist_linhas_alteradas_total", len(alteradas))
+        METRICAS.incrementar("watchlist_alertas_total", len(alertas))
+        return alteradas, alertas
+
+    def publicado(self) -> pd.DataFrame:
+        """Última versão entregue de todas as linhas (para redesenhar a tabela do zero)"""
+        with self._lock:
+            if self._publicado is None:
+                return pd.DataFrame(columns=["item_id", *COLUNAS_SNAPSHOT])
+            return self._publicado.reset_index()
+
+    def executar(self, on_mudancas: Callable[[pd.DataFrame, List[dict]], None],
+                 intervalo: float = INTERVALO_PADRAO, parar: Optional[threading.Event] = None):
+        """Loop de consulta para uso sem interface (bloqueia até `parar` ser sinalizado)"""
+        parar = parar or threading.Event()
+        while not parar.is_set():
+            try:
+                on_mudancas(*self.verificar())
+            except Exception as e:
+                print(f"⚠️ Falha ao verificar a watchlist: {str(e)}")
+            parar.wait(intervalo)
@@ -1,22 +1,191 @@
+from __future__ import annotations
+
+import importlib.util
+from typing import Optional, Tuple
+
 import customtkinter as ctk
 from tkinter import messagebox
 from core.api import AlbionPriceAPI
-from core.database import AlbionDatabase
+from core.database import ItemDatabase
 from core.tradutor import Tradutor
+from core.profit import ProfitEngine
+from core.facets import FacetIndex
+from core.icones import IconService
+from core.metrics import METRICAS, PERFILADOR
+from core.price_matrix import PriceMatrix
+from core.watchlist import INTERVALO_PADRAO, Watchlist
 from gui.components import FiltrosFrame
+from gui.icones import IconesTabela
+from gui.metricas import PainelMetricas
+from gui.tabela import TabelaVirtual
+from gui.worker import BackgroundWorker
+from core.lazy import lazy_import
+
+pd = lazy_import("pandas")
+
+LOTE_EXIBICAO = 25  # Itens por requisição ao exibir resultados em streaming
+MAX_VARREDURA = 500  # Itens consultados pelo botão de atualizar preços
+ICONES_DISPONIVEIS = importlib.util.find_spec("PIL") is not None  # CTkImage depende do Pillow
+
+COLUNAS_TABELA = [
+    ("nome", "Item", 260, None),
+    ("tier", "Tier", 50, None),
+    ("quality", "Q", 35, lambda q: f"{q:.0f}"),
+    ("buy_city", "Compra em", 110, None),
+    ("buy_price", "Preço compra", 105, lambda v: f"{v:,.0f}"),
+    ("sell_city", "Venda em", 110, None),
+    ("sell_price", "Preço venda", 105, lambda v: f"{v:,.0f}"),
+    ("lucro", "Lucro", 95, lambda v: f"{v:,.0f}"),
+    ("margem", "Margem", 75, lambda v: f"{v:.1%}"),
+    ("idade_min", "Idade", 70, lambda v: f"{v / 60:.1f} h" if v >= 60 else f"{v:.0f} min"),
+]
 
 class AlbionLucroApp(ctk.CTk):
-    def __init__(self, api: AlbionPriceAPI, db: AlbionDatabase, tradutor: Tradutor):
+    def __init__(self, api: AlbionPriceAPI, db: ItemDatabase, tradutor: Optional[Tradutor] = None):
         super().__init__()
         self.api = api
         self.db = db
-        self.tradutor = tradutor
+        # Sem tradutor, o catálogo é carregado em segundo plano depois que a janela aparece
+        self.tradutor: Optional[Tradutor] = None
+        self.facetas: Optional[FacetIndex] = None
+        self.profit = ProfitEngine()
+        self.watchlist = Watchlist(api, self.profit)
+        self._precos: Optional[PriceMatrix] = None
+        self.servico_icones = IconService() if ICONES_DISPONIVEIS else None
+        self._pendentes = 0
+        self._em_voo: set = set()  # Itens com lote de preços na fila da geração atual
+        self._consultados: set = set()  # Itens com preços já buscados para _cidades_consultadas
+        self._cidades_consultadas: set = set()
+        self._modo_watchlist = False  # Tabela mostrando a watchlist (recebe só as linhas alteradas)
+        self._verificando = False
         
         self.title("Albion Lucro Pro")
         self.geometry("1200x800")
         ctk.set_appearance_mode("dark")
         
         self._setup_ui()
+        self.worker = BackgroundWorker(self)
+        self.protocol("WM_DELETE_WINDOW", self._fechar)
+
+        if tradutor is not None:
+            self._on_catalogo_carregado((tradutor, FacetIndex.build(tradutor.itens)))
+        else:
+            self._carregar_catalogo()
+        self.after(INTERVALO_PADRAO * 1000, self._verificar_watchlist)
+
+    @property
+    def pronto(self) -> bool:
+        """True quando o catálogo e o índice de busca já estão carregados"""
+        return self.tradutor is not None
+
+    @property
+    def precos(self) -> PriceMatrix:
+        """Todos os preços recebidos nas buscas, mesclados lote a lote"""
+        if self._precos is None:
+            self._precos = PriceMatrix()
+        return self._precos
+
+    def _montar_catalogo(self) -> Tuple[Tradutor, FacetIndex]:
+        """Roda no worker: lê o snapshot do catálogo, o índice de busca e as facetas"""
+        tradutor = Tradutor(self.db)
+        return tradutor, FacetIndex.build(tradutor.itens)
+
+    def _carregar_catalogo(self):
+        self.btn_buscar.configure(state="disabled")
+        self.status.configure(text="⏳ Carregando catálogo...")
+        self.worker.submit(
+            self._montar_catalogo,
+            on_result=self._on_catalogo_carregado,
+            on_error=lambda e: self.status.configure(text=f"❌ Falha ao carregar o catálogo: {str(e)}"),
+            persistente=True
+        )
+
+    def _on_catalogo_carregado(self, catalogo: tuple):
+        self.tradutor, self.facetas = catalogo
+        self._atualizar_contagens(self.filtros.get_filtros())
+        self.btn_buscar.configure(state="normal")
+        self.status.configure(text=f"✅ {len(self.tradutor.itens)} itens no catálogo")
+
+    # ---------- watchlist ----------
+
+    def _vigiar_resultados(self):
+        """Adiciona os itens da tabela atual à watchlist"""
+        if self._modo_watchlist or not len(self.tabela.dados):
+            return
+        novos = self.watchlist.adicionar(self.tabela.dados.index)
+        self.status.configure(text=f"⭐ {novos} itens adicionados à watchlist ({len(self.watchlist)} no total)")
+        if novos:
+            self._verificar_watchlist(reagendar=False)
+
+    def _com_nomes(self, linhas: pd.DataFrame) -> pd.DataFrame:
+        """Junta nome e tier do catálogo às linhas da watchlist"""
+        linhas = linhas.copy()
+        itens = self.tradutor.itens if self.pronto else {}
+        linhas["nome"] = [itens[i]["nome"] if i in itens else i for i in linhas["item_id"]]
+        linhas["tier"] = [itens[i]["tier"] if i in itens else None for i in linhas["item_id"]]
+        return linhas
+
+    def _mostrar_watchlist(self):
+        """Troca a tabela para a watchlist; a partir daí só as linhas alteradas são redesenhadas"""
+        self._nova_geracao()
+        self._modo_watchlist = True
+        self.tabela.set_dados(self._com_nomes(self.watchlist.publicado()))
+        self.status.configure(text=f"👁 Watchlist: {len(self.watchlist)} itens")
+        if len(self.tabela.dados) < len(self.watchlist):
+            self._verificar_watchlist(reagendar=False)
+
+    def _verificar_watchlist(self, reagendar: bool = True):
+        """Consulta a watchlist em segundo plano (uma verificação por vez)"""
+        if len(self.watchlist) and not self._verificando:
+            self._verificando = True
+            self.worker.submit(
+                self.watchlist.verificar,
+                on_result=self._on_watchlist,
+                on_error=self._on_watchlist_erro,
+                persistente=True
+            )
+        if reagendar:
+            self.after(INTERVALO_PADRAO * 1000, self._verificar_watchlist)
+
+    def _on_watchlist(self, resultado: tuple):
+        """Roda na thread do Tk: entrega à tabela apenas as linhas que mudaram"""
+        self._verificando = False
+        alteradas, alertas = resultado
+        if self._modo_watchlist and len(alteradas):
+            with METRICAS.cronometrar("gui.watchlist"):
+                self.tabela.atualizar_linhas(self._com_nomes(alteradas))
+        if alertas:
+            extra = f" (+{len(alertas) - 1})" if len(alertas) > 1 else ""
+            self.status.configure(text=f"🔔 {alertas[-1]['mensagem']}{extra}")
+        elif self._modo_watchlist:
+            self.status.configure(text=f"👁 Watchlist: {len(self.watchlist)} itens, {len(alteradas)} alterados")
+
+    def _on_watchlist_erro(self, erro: Exception):
+        self._verificando = False
+        print(f"⚠️ Falha ao verificar a watchlist: {str(erro)}")
+
+    # ---------- linhas visíveis ----------
+
+    def _on_linhas_visiveis(self, janela: pd.DataFrame):
+        """Só as linhas visíveis pedem ícone e preço; o que saiu da tela é cancelado"""
+        if self.icones is not None:
+            self.icones.carregar(janela.index)
+        if self._modo_watchlist or not self.pronto:
+            return
+        faltando = [item_id for item_id in janela.index
+                    if item_id not in self._consultados and item_id not in self._em_voo
+                    and item_id in self.tradutor.itens]
+        if faltando:
+            self._consultar_precos([{"id": item_id, **self.tradutor.itens[item_id]} for item_id in faltando])
+
+    def _icone(self, item_id: str):
+        return self.icones.foto(item_id)
+
+    def _fechar(self):
+        if self.servico_icones is not None:
+            self.servico_icones.fechar()
+        self.worker.shutdown()
+        self.destroy()
 
     def _setup_ui(self):
         # Configuração do grid principal
@@ -51,58 +220,232 @@ class AlbionLucroApp(ctk.CTk):
         )
         self.btn_buscar.pack(side="left", padx=5, pady=5)
         
+        self.btn_vigiar = ctk.CTkButton(
+            self.search_frame,
+            text="⭐",
+            width=40,
+            command=self._vigiar_resultados
+        )
+        self.btn_vigiar.pack(side="left", padx=5, pady=5)
+        
+        self.btn_atualizar = ctk.CTkButton(
+            self.search_frame,
+            text="🔄",
+            width=40,
+            command=self._atualizar_precos
+        )
+        self.btn_atualizar.pack(side="left", padx=5, pady=5)
+        
+        self.btn_watchlist = ctk.CTkButton(
+            self.search_frame,
+            text="👁 Watchlist",
+            width=100,
+            command=self._mostrar_watchlist
+        )
+        self.btn_watchlist.pack(side="left", padx=5, pady=5)
+        
+        self.btn_metricas = ctk.CTkButton(
+            self.search_frame,
+            text="📊",
+            width=40,
+            command=self._abrir_metricas
+        )
+        self.btn_metricas.pack(side="left", padx=5, pady=5)
+        self.painel_metricas = None
+        
         # Área de Resultados
         self.result_frame = ctk.CTkFrame(self.main_frame)
         self.result_frame.grid(row=1, column=0, padx=5, pady=5, sticky="nsew")
         self.result_frame.grid_columnconfigure(0, weight=1)
         self.result_frame.grid_rowconfigure(0, weight=1)
         
-        self.text = ctk.CTkTextbox(self.result_frame, state="disabled")
-        self.text.grid(row=0, column=0, padx=5, pady=5, sticky="nsew")
+        self.tabela = TabelaVirtual(self.result_frame, COLUNAS_TABELA, chave="item_id",
+                                    on_clique=self._mostrar_melhores_precos,
+                                    on_linhas_visiveis=self._on_linhas_visiveis,
+                                    icone=self._icone if self.servico_icones else None)
+        self.tabela.grid(row=0, column=0, padx=5, pady=5, sticky="nsew")
+        self.icones = None
+        if self.servico_icones is not None:
+            self.icones = IconesTabela(self.tabela, self.servico_icones, on_prontos=self.tabela.atualizar_icones)
+        
+        self.status = ctk.CTkLabel(self.result_frame, text="", anchor="w")
+        self.status.grid(row=1, column=0, padx=5, pady=(0, 5), sticky="ew")
+
+    def _abrir_metricas(self):
+        if self.painel_metricas is not None and self.painel_metricas.winfo_exists():
+            self.painel_metricas.focus()
+            return
+        self.painel_metricas = PainelMetricas(self)
 
     def _buscar_item(self):
         termo = self.entry.get().strip()
+        if not self.pronto:
+            return
         if not termo:
             messagebox.showwarning("Aviso", "Digite um nome para buscar!")
             return
         
-        try:
-            resultados = self.tradutor.buscar_por_nome(termo)
-            
-            if not resultados:
-                messagebox.showinfo("Info", "Nenhum item encontrado com esse nome")
-                return
-                
-            self._exibir_resultados(resultados)
-            
-        except Exception as e:
-            messagebox.showerror("Erro", f"Falha na busca:\n{str(e)}")
+        # Uma nova busca cancela qualquer busca/varredura ainda em andamento
+        self._nova_geracao()
+        self._modo_watchlist = False
+        PERFILADOR.finalizar()
+        PERFILADOR.iniciar("busca")
+        self._limpar_resultados(f"🔎 Buscando \"{termo}\"...\n")
+        self.worker.submit(
+            self.tradutor.buscar_por_nome, termo,
+            on_result=self._on_busca_concluida,
+            on_error=lambda e: messagebox.showerror("Erro", f"Falha na busca:\n{str(e)}")
+        )
+
+    def _on_busca_concluida(self, resultados: list):
+        if not resultados:
+            PERFILADOR.finalizar()
+            self._limpar_resultados()
+            messagebox.showinfo("Info", "Nenhum item encontrado com esse nome")
+            return
+        
+        self._exibir_resultados(resultados)
+
+    def _limpar_resultados(self, mensagem: str = ""):
+        self.tabela.limpar()
+        self.status.configure(text=mensagem)
+
+    def _nova_geracao(self):
+        """Descarta os lotes de preço em andamento junto com a geração do worker"""
+        self.worker.nova_geracao()
+        self._em_voo.clear()
+        self._pendentes = 0
+
+    def _cidades(self) -> list:
+        return self.filtros.get_cidades_selecionadas() or ["Caerleon"]  # Default
+
+    @staticmethod
+    def _linhas(itens: list, melhores: pd.DataFrame) -> pd.DataFrame:
+        """Linhas da tabela: dados do catálogo + a melhor rota de cada item"""
+        return pd.DataFrame([
+            {"item_id": item['id'], "nome": item['nome'], "tier": item['tier'],
+             "categoria": item['categoria']}
+            for item in itens
+        ]).join(melhores.set_index("item_id"), on="item_id")
+
+    def _buscar_lote(self, itens: list, cidades: list) -> tuple:
+        """Roda no worker: busca preços de um lote e monta as linhas da tabela"""
+        precos = self.api.get_prices_bulk([item['id'] for item in itens], cidades)
+        with METRICAS.cronometrar("gui.montar_linhas"):
+            self.precos.atualizar(precos)
+            linhas = self._linhas(itens, self.profit.melhores_por_item(precos))
+        return precos, linhas
+
+    def _mostrar_itens(self, itens: list):
+        """Preenche a tabela só com o que já está na memória: catálogo e preços já recebidos"""
+        cidades = self._cidades()
+        if not set(cidades) <= self._cidades_consultadas:
+            # Cidade nova: os preços já buscados não a incluem
+            self._consultados.clear()
+            self._cidades_consultadas = set(cidades)
+        if not itens:
+            self.tabela.limpar()
+            return
+        with METRICAS.cronometrar("gui.montar_linhas"):
+            conhecidos = self.precos.para_frame([item['id'] for item in itens], cidades)
+            self.tabela.set_dados(self._linhas(itens, self.profit.melhores_por_item(conhecidos)))
+
+    def _consultar_precos(self, itens: list):
+        """Busca os preços em segundo plano, atualizando as linhas a cada lote que chega"""
+        cidades = self._cidades()
+        self._em_voo.update(item['id'] for item in itens)
+        for inicio in range(0, len(itens), LOTE_EXIBICAO):
+            lote = itens[inicio:inicio + LOTE_EXIBICAO]
+            self._pendentes += 1
+            self.worker.submit(
+                self._buscar_lote, lote, cidades,
+                on_result=self._exibir_lote,
+                on_error=lambda e, ids=[item['id'] for item in lote]: self._lote_falhou(ids, e)
+            )
 
     def _exibir_resultados(self, resultados: list):
-        """Exibe os resultados na interface"""
-        cidades = self.filtros.get_cidades_selecionadas()
-        if not cidades:
-            cidades = ["Caerleon"]  # Default
-        
-        self.text.configure(state="normal")
-        self.text.delete("1.0", "end")
-        
-        for item in resultados[:5]:  # Limita a 5 resultados
-            try:
-                precos = self.api.get_prices(item['id'], ",".join(cidades))
-                
-                self.text.insert("end", f"📦 {item['nome']} (T{item['tier']})\n")
-                self.text.insert("end", f"🔹 Categoria: {item['categoria']}\n")
-                self.text.insert("end", f"📍 Preços em {', '.join(cidades)}:\n")
-                self.text.insert("end", f"{precos.to_string()}\n\n")
-                
-            except Exception as e:
-                self.text.insert("end", f"⚠️ Erro ao buscar preços para {item['nome']}: {str(e)}\n\n")
-        
-        self.text.configure(state="disabled")
+        """Mostra os itens encontrados e busca os preços de todos"""
+        self._mostrar_itens(resultados)
+        self.status.configure(text=f"⏳ Buscando preços de {len(resultados)} itens...")
+        # As linhas visíveis já foram pedidas pelo _on_linhas_visiveis
+        self._consultar_precos([item for item in resultados if item['id'] not in self._em_voo])
+
+    def _atualizar_precos(self):
+        """Botão 🔄: busca de novo os preços dos itens da tabela (até MAX_VARREDURA)"""
+        if not self.pronto or self._modo_watchlist or not len(self.tabela.dados):
+            return
+        item_ids = [item_id for item_id in self.tabela.dados.index[:MAX_VARREDURA]
+                    if item_id not in self._em_voo and item_id in self.tradutor.itens]
+        PERFILADOR.finalizar()
+        PERFILADOR.iniciar("varredura")
+        self.status.configure(text=f"⏳ Atualizando preços de {len(item_ids)} itens...")
+        self._consultados.difference_update(item_ids)
+        self._consultar_precos([{"id": item_id, **self.tradutor.itens[item_id]} for item_id in item_ids])
+
+    def _exibir_lote(self, lote: tuple):
+        """Roda na thread do Tk: atualiza só as linhas do lote recebido"""
+        precos, linhas = lote
+        self._em_voo.difference_update(linhas["item_id"])
+        self._consultados.update(linhas["item_id"])
+        with PERFILADOR.capturar(), METRICAS.cronometrar("gui.renderizar"):
+            self.facetas.marcar_disponibilidade(precos)
+            if not self._modo_watchlist:
+                # Itens que saíram da tabela (novo filtro) só alimentam a matriz de preços
+                self.tabela.atualizar_linhas(linhas[linhas["item_id"].isin(self.tabela.dados.index)])
+        self._lote_concluido()
+
+    def _lote_falhou(self, item_ids: list, erro: Exception):
+        self._em_voo.difference_update(item_ids)  # Voltam a ser pedidos quando aparecerem na tela
+        self._lote_concluido(f"⚠️ Erro ao buscar preços: {str(erro)}")
+
+    def _lote_concluido(self, erro: str = None):
+        self._pendentes -= 1
+        if erro:
+            self.status.configure(text=erro)
+        elif self._pendentes <= 0:
+            self.status.configure(text=f"✅ {len(self.tabela.dados)} itens")
+        if self._pendentes <= 0:
+            PERFILADOR.finalizar()
+
+    def _mostrar_melhores_precos(self, item_id: str):
+        """Melhor compra e venda direta do item clicado, entre cidades e qualidades"""
+        precos = self.watchlist.precos if self._modo_watchlist else self.precos
+        compra, venda = precos.melhor_compra(item_id), precos.melhor_venda(item_id)
+        if compra is None and venda is None:
+            self.status.configure(text=f"{item_id}: sem preços")
+            return
+        partes = [item_id]
+        if compra is not None:
+            partes.append(f"🛒 comprar por {compra['preco']:,.0f} em {compra['cidade']} (Q{compra['quality']})")
+        if venda is not None:
+            partes.append(f"💰 vender direto por {venda['preco']:,.0f} em {venda['cidade']} (Q{venda['quality']})")
+        self.status.configure(text="  ·  ".join(partes))
+
+    def _selecao_facetas(self, filtros: dict) -> dict:
+        """Converte os filtros do painel para a seleção do FacetIndex"""
+        selecao = {"cidade": filtros["cidades"]}
+        for faceta in ("categoria", "tier", "encantamento"):
+            if filtros[faceta] != "Todos":
+                selecao[faceta] = [filtros[faceta]]
+        return selecao
+
+    def _atualizar_contagens(self, filtros: dict):
+        contagens = self.facetas.contagens(**self._selecao_facetas(filtros))
+        ordens = {faceta: self.facetas.valores(faceta) for faceta in ("categoria", "tier", "encantamento")}
+        self.filtros.set_contagens(contagens, ordens)
 
     def _aplicar_filtros(self, filtros: dict):
-        """Aplica os filtros selecionados"""
-        print("Filtros aplicados:", filtros)
-        # Aqui você pode implementar a lógica de filtragem
-        # Exemplo: self.db.get_items_by_category(filtros['categoria'])
\ No newline at end of file
+        """Aplica os filtros localmente (máscaras das facetas + preços já em memória)
+
+        Nenhuma requisição sai daqui: a tabela pede os preços só das linhas que
+        ficarem visíveis, e o botão 🔄 atualiza os demais.
+        """
+        if not self.pronto:
+            return
+        item_ids = self.facetas.filtrar(**self._selecao_facetas(filtros))
+        self._atualizar_contagens(filtros)
+        
+        self._nova_geracao()
+        self._modo_watchlist = False
+        self._mostrar_itens([{"id": item_id, **self.tradutor.itens[item_id]} for item_id in item_ids])
+        self.status.configure(text=f"✅ {len(item_ids)} itens (🔄 atualiza os preços)")
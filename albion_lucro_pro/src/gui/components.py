@@ -1,55 +1,111 @@
 import customtkinter as ctk
-from typing import Callable, List
+from typing import Callable, Dict, List
+
+DEBOUNCE_MS = 250  # Espera após a última mudança antes de reaplicar os filtros
+TODOS = "Todos"
 
 class FiltrosFrame(ctk.CTkFrame):
     def __init__(self, master, on_filter_change: Callable):
         super().__init__(master)
         self.on_filter_change = on_filter_change
+        self._debounce_id = None
+        # faceta -> rótulo exibido -> valor real (ex: "T4 (120)" -> "T4")
+        self._rotulos: Dict[str, Dict[str, object]] = {"categoria": {}, "tier": {}, "encantamento": {}}
         self._setup_ui()
 
     def _setup_ui(self):
         # Configuração do grid
         self.grid_columnconfigure(0, weight=1)
         self.grid_columnconfigure(1, weight=1)
-        
+
         # Filtro de Categoria
         ctk.CTkLabel(self, text="Categoria:").grid(row=0, column=0, padx=5, pady=5, sticky="w")
-        self.categoria_var = ctk.StringVar(value="Todos")
-        categorias = ["Todos", "Armas", "Armaduras", "Consumíveis", "Materiais"]
-        ctk.CTkOptionMenu(self, variable=self.categoria_var, values=categorias,
-                         command=lambda _: self._notify_change()).grid(row=0, column=1, padx=5, pady=5, sticky="ew")
+        self.categoria_var = ctk.StringVar(value=TODOS)
+        self.categoria_menu = ctk.CTkOptionMenu(self, variable=self.categoria_var, values=[TODOS],
+                                                command=lambda _: self._notify_change())
+        self.categoria_menu.grid(row=0, column=1, padx=5, pady=5, sticky="ew")
 
         # Filtro de Tier
         ctk.CTkLabel(self, text="Tier:").grid(row=1, column=0, padx=5, pady=5, sticky="w")
-        self.tier_var = ctk.StringVar(value="Todos")
-        tiers = ["Todos"] + [f"T{i}" for i in range(4, 9)]
-        ctk.CTkOptionMenu(self, variable=self.tier_var, values=tiers,
-                         command=lambda _: self._notify_change()).grid(row=1, column=1, padx=5, pady=5, sticky="ew")
+        self.tier_var = ctk.StringVar(value=TODOS)
+        tiers = [TODOS] + [f"T{i}" for i in range(4, 9)]
+        self.tier_menu = ctk.CTkOptionMenu(self, variable=self.tier_var, values=tiers,
+                                           command=lambda _: self._notify_change())
+        self.tier_menu.grid(row=1, column=1, padx=5, pady=5, sticky="ew")
+
+        # Filtro de Encantamento
+        ctk.CTkLabel(self, text="Encantamento:").grid(row=2, column=0, padx=5, pady=5, sticky="w")
+        self.encantamento_var = ctk.StringVar(value=TODOS)
+        encantamentos = [TODOS] + [str(i) for i in range(0, 5)]
+        self.encantamento_menu = ctk.CTkOptionMenu(self, variable=self.encantamento_var,
+                                                   values=encantamentos,
+                                                   command=lambda _: self._notify_change())
+        self.encantamento_menu.grid(row=2, column=1, padx=5, pady=5, sticky="ew")
 
         # Filtro de Cidades
-        ctk.CTkLabel(self, text="Cidades:").grid(row=2, column=0, padx=5, pady=5, sticky="w")
+        ctk.CTkLabel(self, text="Cidades:").grid(row=3, column=0, padx=5, pady=5, sticky="w")
         self.cidades_frame = ctk.CTkFrame(self)
-        self.cidades_frame.grid(row=2, column=1, padx=5, pady=5, sticky="ew")
-        
+        self.cidades_frame.grid(row=3, column=1, padx=5, pady=5, sticky="ew")
+
         cidades = ["Caerleon", "Bridgewatch", "Thetford", "Fort Sterling", "Martlock"]
         self.cidade_vars = {}
-        
+        self.cidade_checks = {}
+
         for i, cidade in enumerate(cidades):
             var = ctk.BooleanVar(value=True)
             cb = ctk.CTkCheckBox(self.cidades_frame, text=cidade, variable=var,
                                 command=self._notify_change)
             cb.grid(row=i, column=0, padx=5, pady=2, sticky="w")
             self.cidade_vars[cidade] = var
+            self.cidade_checks[cidade] = cb
 
-    def _notify_change(self):
-        """Notifica sobre mudanças nos filtros"""
-        filtros = {
-            "categoria": self.categoria_var.get(),
-            "tier": self.tier_var.get(),
-            "cidades": [cidade for cidade, var in self.cidade_vars.items() if var.get()]
+    def _valor(self, faceta: str, var: ctk.StringVar):
+        rotulo = var.get()
+        if rotulo == TODOS:
+            return TODOS
+        return self._rotulos[faceta].get(rotulo, rotulo)
+
+    def get_filtros(self) -> dict:
+        """Retorna os filtros selecionados com os valores reais (sem contagens)"""
+        return {
+            "categoria": self._valor("categoria", self.categoria_var),
+            "tier": self._valor("tier", self.tier_var),
+            "encantamento": self._valor("encantamento", self.encantamento_var),
+            "cidades": self.get_cidades_selecionadas()
         }
-        self.on_filter_change(filtros)
+
+    def _notify_change(self):
+        """Notifica sobre mudanças nos filtros (agrupando mudanças rápidas)"""
+        if self._debounce_id is not None:
+            self.after_cancel(self._debounce_id)
+        self._debounce_id = self.after(DEBOUNCE_MS, self._disparar)
+
+    def _disparar(self):
+        self._debounce_id = None
+        self.on_filter_change(self.get_filtros())
+
+    def _atualizar_menu(self, faceta: str, menu: ctk.CTkOptionMenu, var: ctk.StringVar,
+                        contagens: Dict[object, int], ordem: List):
+        selecionado = self._valor(faceta, var)
+        rotulos = {f"{valor} ({contagens.get(valor, 0)})": valor for valor in ordem}
+        self._rotulos[faceta] = rotulos
+        menu.configure(values=[TODOS] + list(rotulos))
+        for rotulo, valor in rotulos.items():
+            if str(valor) == str(selecionado):
+                var.set(rotulo)
+
+    def set_contagens(self, contagens: Dict[str, Dict[object, int]], ordens: Dict[str, List]):
+        """Mostra ao lado de cada opção quantos itens ela retornaria"""
+        self._atualizar_menu("categoria", self.categoria_menu, self.categoria_var,
+                             contagens["categoria"], ordens["categoria"])
+        self._atualizar_menu("tier", self.tier_menu, self.tier_var,
+                             contagens["tier"], ordens["tier"])
+        self._atualizar_menu("encantamento", self.encantamento_menu, self.encantamento_var,
+                             contagens["encantamento"], ordens["encantamento"])
+        for cidade, cb in self.cidade_checks.items():
+            if cidade in contagens["cidade"]:
+                cb.configure(text=f"{cidade} ({contagens['cidade'][cidade]})")
 
     def get_cidades_selecionadas(self) -> List[str]:
         """Retorna a lista de cidades selecionadas"""
-        return [cidade for cidade, var in self.cidade_vars.items() if var.get()]
\ No newline at end of file
+        return [cidade for cidade, var in self.cidade_vars.items() if var.get()]
@@ -0,0 +1,73 @@
+import queue
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+import customtkinter as ctk
+from core.icones import IconService
+from gui.worker import POLL_MS
+
+MAX_IMAGENS = 300  # CTkImage mantidas vivas (o Tk descarta imagens sem referência)
+
+
+class IconesTabela:
+    """Ícones para a TabelaVirtual: LRU de CTkImage criadas na thread do Tk
+
+    O IconService baixa e reduz os ícones no pool dele; as miniaturas prontas
+    chegam por uma fila drenada pelo loop do Tk, onde viram CTkImage. Depois de
+    cada leva, `on_prontos` é chamado uma vez para a tabela redesenhar os ícones.
+    """
+
+    def __init__(self, widget, servico: IconService, on_prontos: Callable[[], None],
+                 max_imagens: int = MAX_IMAGENS):
+        self.widget = widget
+        self.servico = servico
+        self.on_prontos = on_prontos
+        self.max_imagens = max_imagens
+        self._imagens: "OrderedDict[str, ctk.CTkImage]" = OrderedDict()
+        # PhotoImage já escalada por item: (escala, tema, foto); refeita só quando escala ou tema mudam
+        self._fotos: Dict[str, Tuple[float, str, object]] = {}
+        self._prontos: "queue.Queue" = queue.Queue()
+        self.widget.after(POLL_MS, self._drenar)
+
+    def carregar(self, item_ids: Iterable[str]):
+        """Pede os ícones das linhas visíveis que ainda não têm imagem"""
+        faltando = [item_id for item_id in item_ids if item_id not in self._imagens]
+        for item_id in faltando:
+            # Miniatura ainda em memória no serviço: só falta criar a imagem do Tk
+            miniatura = self.servico.obter(item_id)
+            if miniatura is not None:
+                self._prontos.put((item_id, miniatura))
+        self.servico.solicitar(faltando, lambda item_id, miniatura: self._prontos.put((item_id, miniatura)))
+
+    def _drenar(self):
+        """Roda na thread do Tk: cria as CTkImage das miniaturas que chegaram"""
+        novos = 0
+        try:
+            while True:
+                item_id, miniatura = self._prontos.get_nowait()
+                if miniatura is None or item_id in self._imagens:
+                    continue
+                self._imagens[item_id] = ctk.CTkImage(light_image=miniatura, dark_image=miniatura,
+                                                      size=miniatura.size)
+                novos += 1
+        except queue.Empty:
+            pass
+        while len(self._imagens) > self.max_imagens:
+            item_id, _ = self._imagens.popitem(last=False)
+            self._fotos.pop(item_id, None)
+        if novos:
+            self.on_prontos()
+        if self.widget.winfo_exists():
+            self.widget.after(POLL_MS, self._drenar)
+
+    def foto(self, item_id: str) -> Optional[object]:
+        """PhotoImage do ícone na escala e no tema atuais do widget, ou None se não carregou"""
+        imagem = self._imagens.get(item_id)
+        if imagem is None:
+            return None
+        self._imagens.move_to_end(item_id)
+        escala, tema = self.widget._get_widget_scaling(), self.widget._get_appearance_mode()
+        cache = self._fotos.get(item_id)
+        if cache is None or cache[:2] != (escala, tema):
+            cache = self._fotos[item_id] = (escala, tema, imagem.create_scaled_photo_image(escala, tema))
+        return cache[2]
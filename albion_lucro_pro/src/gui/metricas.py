@@ -0,0 +1,88 @@
+import customtkinter as ctk
+from core.metrics import METRICAS, PERFILADOR, Metricas, Perfilador
+
+ATUALIZACAO_MS = 1000
+
+
+class PainelMetricas(ctk.CTkToplevel):
+    """Janela com tempos por operação, HTTP e cache, atualizada a cada segundo"""
+
+    def __init__(self, master, metricas: Metricas = METRICAS, perfilador: Perfilador = PERFILADOR):
+        super().__init__(master)
+        self.metricas = metricas
+        self.perfilador = perfilador
+        self.title("Métricas")
+        self.geometry("560x520")
+        self.grid_columnconfigure(0, weight=1)
+        self.grid_rowconfigure(0, weight=1)
+
+        self.texto = ctk.CTkTextbox(self, font=("Courier", 12), wrap="none")
+        self.texto.grid(row=0, column=0, columnspan=3, padx=10, pady=(10, 5), sticky="nsew")
+
+        self.btn_perfil = ctk.CTkButton(self, text="🔬 Perfilar próxima busca", command=self._armar_perfil)
+        self.btn_perfil.grid(row=1, column=0, padx=10, pady=(0, 10), sticky="w")
+        ctk.CTkButton(self, text="💾 Exportar JSON", command=self._exportar).grid(
+            row=1, column=1, padx=5, pady=(0, 10))
+        ctk.CTkButton(self, text="Zerar", width=70, command=self._zerar).grid(
+            row=1, column=2, padx=10, pady=(0, 10))
+
+        self._atualizar()
+
+    def _armar_perfil(self):
+        self.perfilador.armar()
+        self.btn_perfil.configure(text="🔬 Aguardando a próxima busca...")
+
+    def _exportar(self):
+        path = "./data/metricas.json"
+        self.metricas.salvar_json(path)
+        self.title(f"Métricas — salvo em {path}")
+
+    def _zerar(self):
+        self.metricas.limpar()
+        self._atualizar(reagendar=False)
+
+    def _linhas(self) -> list:
+        resumo = self.metricas.resumo()
+        linhas = [f"{'Operação':<28}{'n':>6}{'média':>10}{'p95':>10}"]
+        for nome in ("operacao_segundos", "http_requisicao_segundos"):
+            for serie in sorted(resumo["histogramas"].get(nome, []),
+                                key=lambda s: -s["soma_s"]):
+                rotulo = serie["rotulos"].get("operacao") or f"http {serie['rotulos'].get('endpoint')}"
+                linhas.append(f"{rotulo:<28}{serie['contagem']:>6}"
+                              f"{serie['media_ms']:>8.1f}ms{serie['p95_ms']:>8.1f}ms")
+
+        linhas.append("")
+        linhas.append("HTTP")
+        for serie in resumo["contadores"].get("http_respostas_total", []):
+            rotulos = serie["rotulos"]
+            linhas.append(f"  {rotulos['endpoint']:<20} {rotulos['status']:>5}  {serie['valor']:>8.0f}")
+        for nome, titulo in (("http_retentativas_total", "retentativas"), ("http_erros_total", "erros de conexão"),
+                             ("http_coalescidas_total", "coalescidas"),
+                             ("http_circuito_aberto_total", "bloqueadas pelo disjuntor")):
+            total = self.metricas.contador(nome)
+            if total:
+                linhas.append(f"  {titulo:<27}{total:>8.0f}")
+
+        taxas = resumo["medidores"].get("cache_taxa_acerto", [])
+        if taxas:
+            linhas.append("")
+            linhas.append("Cache")
+            for serie in taxas:
+                linhas.append(f"  acertos {serie['valor']:.1%}  ({serie['rotulos'].get('origem')})")
+
+        if self.perfilador.ultimo is not None:
+            linhas.append("")
+            linhas.append(f"Último perfil: {self.perfilador.ultimo}")
+        return linhas
+
+    def _atualizar(self, reagendar: bool = True):
+        if not self.winfo_exists():
+            return
+        self.texto.configure(state="normal")
+        self.texto.delete("1.0", "end")
+        self.texto.insert("end", "\n".join(self._linhas()))
+        self.texto.configure(state="disabled")
+        if not self.perfilador.armado and not self.perfilador.ativo:
+            self.btn_perfil.configure(text="🔬 Perfilar próxima busca")
+        if reagendar:
+            self.after(ATUALIZACAO_MS, self._atualizar)
@@ -0,0 +1,251 @@
+from __future__ import annotations
+
+import tkinter as tk
+import customtkinter as ctk
+from typing import Callable, Dict, List, Optional, Tuple
+from core.lazy import lazy_import
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+ALTURA_LINHA = 24
+LARGURA_ICONE = ALTURA_LINHA  # Coluna de ícones (quando a tabela recebe `icone`)
+ALTURA_CABECALHO = 28
+CORES = {
+    "fundo": ("gray92", "gray14"),
+    "zebra": ("gray86", "gray18"),
+    "cabecalho": ("gray78", "gray25"),
+    "texto": ("gray10", "#DCE4EE"),
+}
+
+# (coluna do DataFrame, título, largura em pixels, formatador)
+Coluna = Tuple[str, str, int, Optional[Callable]]
+
+
+def _formatar(valor, formatador: Optional[Callable]) -> str:
+    if valor is None or (isinstance(valor, float) and np.isnan(valor)):
+        return "—"
+    return formatador(valor) if formatador else str(valor)
+
+
+class TabelaVirtual(ctk.CTkFrame):
+    """Tabela que desenha apenas as linhas visíveis de um DataFrame
+
+    O canvas mantém um conjunto fixo de itens de texto (um por célula visível)
+    e só troca o conteúdo deles ao rolar, ordenar ou atualizar, então o custo
+    de desenho não depende do número de linhas.
+    """
+
+    def __init__(self, master, colunas: List[Coluna], chave: str = "chave",
+                 on_linhas_visiveis: Optional[Callable[[pd.DataFrame], None]] = None,
+                 on_clique: Optional[Callable[[str], None]] = None,
+                 icone: Optional[Callable[[str], Optional[object]]] = None, **kwargs):
+        super().__init__(master, **kwargs)
+        self.colunas = colunas
+        self.chave = chave
+        self.on_linhas_visiveis = on_linhas_visiveis
+        self.on_clique = on_clique
+        self.icone = icone  # chave -> PhotoImage já carregada (ou None); nunca faz I/O
+        self._x0 = LARGURA_ICONE if icone is not None else 0
+
+        # O DataFrame vazio só é criado no primeiro uso: a tabela aparece sem importar o pandas
+        self._dados: Optional[pd.DataFrame] = None
+        self._ordem = ()  # posições de self.dados na ordem exibida
+        self._ordenar_por: Optional[str] = None
+        self._ascendente = True
+        self._topo = 0  # primeira linha visível
+        self._celulas: List[List[int]] = []  # ids de texto do canvas por linha do pool
+        self._fundos: List[int] = []
+        self._icones: List[int] = []  # ids de imagem do canvas por linha do pool
+        self._chaves_exibidas: List = []
+        self._fotos: List = []  # Referências às imagens exibidas (o Tk apaga imagens sem referência)
+
+        self.grid_columnconfigure(0, weight=1)
+        self.grid_rowconfigure(1, weight=1)
+
+        cor = self._apply_appearance_mode
+        self.cabecalho = tk.Canvas(self, height=ALTURA_CABECALHO, highlightthickness=0,
+                                   bg=cor(CORES["cabecalho"]))
+        self.cabecalho.grid(row=0, column=0, sticky="ew")
+        self.canvas = tk.Canvas(self, highlightthickness=0, bg=cor(CORES["fundo"]))
+        self.canvas.grid(row=1, column=0, sticky="nsew")
+        self.scrollbar = ctk.CTkScrollbar(self, command=self._on_scrollbar)
+        self.scrollbar.grid(row=0, column=1, rowspan=2, sticky="ns")
+
+        self._desenhar_cabecalho()
+        self.canvas.bind("<Configure>", lambda _: self._recriar_pool())
+        self.canvas.bind("<Button-1>", self._on_clique)
+        for widget in (self.canvas, self.cabecalho):
+            widget.bind("<MouseWheel>", self._on_roda)
+            widget.bind("<Button-4>", lambda _: self._rolar(-3))
+            widget.bind("<Button-5>", lambda _: self._rolar(3))
+
+    @property
+    def dados(self) -> pd.DataFrame:
+        if self._dados is None:
+            self._dados = pd.DataFrame(columns=[c[0] for c in self.colunas] + [self.chave]).set_index(self.chave)
+        return self._dados
+
+    @dados.setter
+    def dados(self, dados: pd.DataFrame):
+        self._dados = dados
+
+    # ---------- desenho ----------
+
+    def _desenhar_cabecalho(self):
+        self.cabecalho.delete("all")
+        x = self._x0
+        for coluna, titulo, largura, _ in self.colunas:
+            if coluna == self._ordenar_por:
+                titulo += " ▲" if self._ascendente else " ▼"
+            tag = f"col_{coluna}"
+            self.cabecalho.create_text(x + 6, ALTURA_CABECALHO // 2, text=titulo, anchor="w",
+                                       fill=self._apply_appearance_mode(CORES["texto"]), tags=tag)
+            self.cabecalho.tag_bind(tag, "<Button-1>", lambda _, c=coluna: self.ordenar(c))
+            x += largura
+
+    def _linhas_visiveis(self) -> int:
+        return max(1, self.canvas.winfo_height() // ALTURA_LINHA + 1)
+
+    def _recriar_pool(self):
+        """Cria um item de texto por célula visível (só muda quando a janela é redimensionada)"""
+        self.canvas.delete("all")
+        self._celulas, self._fundos, self._icones = [], [], []
+        cor_texto = self._apply_appearance_mode(CORES["texto"])
+        largura_total = max(self.canvas.winfo_width(), self._x0 + sum(c[2] for c in self.colunas))
+
+        for linha in range(self._linhas_visiveis()):
+            y = linha * ALTURA_LINHA
+            cor = CORES["zebra"] if linha % 2 else CORES["fundo"]
+            self._fundos.append(self.canvas.create_rectangle(
+                0, y, largura_total, y + ALTURA_LINHA, width=0, fill=self._apply_appearance_mode(cor)
+            ))
+            if self.icone is not None:
+                self._icones.append(self.canvas.create_image(LARGURA_ICONE // 2, y + ALTURA_LINHA // 2))
+            x, celulas = self._x0, []
+            for _, _, largura, _ in self.colunas:
+                celulas.append(self.canvas.create_text(x + 6, y + ALTURA_LINHA // 2, anchor="w",
+                                                       text="", fill=cor_texto))
+                x += largura
+            self._celulas.append(celulas)
+        self._renderizar()
+
+    def _renderizar(self):
+        """Preenche o pool com as linhas a partir de self._topo"""
+        total = len(self._ordem)
+        visiveis = len(self._celulas)
+        self._topo = max(0, min(self._topo, max(0, total - visiveis + 1)))
+
+        janela, valores = None, []
+        if total:
+            posicoes = self._ordem[self._topo:self._topo + visiveis]
+            janela = self.dados.iloc[posicoes]
+            valores = [janela[coluna].to_numpy() if coluna in janela else [None] * len(janela)
+                       for coluna, _, _, _ in self.colunas]
+        exibidas = len(janela) if janela is not None else 0
+        self._chaves_exibidas = list(janela.index) if exibidas else []
+
+        for linha, celulas in enumerate(self._celulas):
+            for indice, (celula, (_, _, _, formatador)) in enumerate(zip(celulas, self.colunas)):
+                texto = _formatar(valores[indice][linha], formatador) if linha < exibidas else ""
+                self.canvas.itemconfigure(celula, text=texto)
+
+        self.atualizar_icones()
+
+        if total:
+            self.scrollbar.set(self._topo / total, min(1.0, (self._topo + visiveis) / total))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+        if self.on_linhas_visiveis is not None and exibidas:
+            self.on_linhas_visiveis(janela)
+
+    def atualizar_icones(self):
+        """Redesenha só os ícones das linhas exibidas (chamado quando novos ícones chegam)"""
+        if self.icone is None:
+            return
+        self._fotos = []
+        for linha, item in enumerate(self._icones):
+            foto = self.icone(self._chaves_exibidas[linha]) if linha < len(self._chaves_exibidas) else None
+            self.canvas.itemconfigure(item, image=foto if foto is not None else "")
+            if foto is not None:
+                self._fotos.append(foto)
+
+    def _on_clique(self, event):
+        posicao = self._topo + event.y // ALTURA_LINHA
+        if self.on_clique is not None and posicao < len(self._ordem):
+            self.on_clique(self.dados.index[self._ordem[posicao]])
+
+    # ---------- rolagem ----------
+
+    def _rolar(self, linhas: int):
+        self._topo += linhas
+        self._renderizar()
+
+    def _on_roda(self, event):
+        self._rolar(-3 if event.delta > 0 else 3)
+
+    def _on_scrollbar(self, acao, valor=None, unidade=None):
+        if acao == "moveto":
+            self._topo = int(float(valor) * len(self._ordem))
+            self._renderizar()
+        elif acao == "scroll":
+            passo = len(self._celulas) if unidade == "pages" else 1
+            self._rolar(int(valor) * passo)
+
+    # ---------- dados ----------
+
+    def _reordenar(self):
+        if self._ordenar_por is None or self._ordenar_por not in self.dados:
+            self._ordem = np.arange(len(self.dados))
+            return
+        coluna = self.dados[self._ordenar_por]
+        if pd.api.types.is_numeric_dtype(coluna):
+            chaves = coluna.to_numpy(dtype=float)
+        else:
+            chaves = coluna.astype(str).str.lower().to_numpy()
+        ordem = np.argsort(chaves, kind="stable")
+        if not self._ascendente:
+            ordem = ordem[::-1]
+        # Valores ausentes sempre no fim
+        ausentes = pd.isna(coluna.to_numpy()[ordem])
+        self._ordem = np.concatenate([ordem[~ausentes], ordem[ausentes]])
+
+    def ordenar(self, coluna: str):
+        """Ordena pela coluna (clicar de novo inverte a ordem), sem buscar dados de novo"""
+        if self._ordenar_por == coluna:
+            self._ascendente = not self._ascendente
+        else:
+            self._ordenar_por, self._ascendente = coluna, True
+        self._reordenar()
+        self._desenhar_cabecalho()
+        self._renderizar()
+
+    def set_dados(self, dados: pd.DataFrame):
+        """Substitui todo o conteúdo da tabela"""
+        self.dados = dados.set_index(self.chave) if self.chave in dados else dados
+        self._topo = 0
+        self._reordenar()
+        self._renderizar()
+
+    def atualizar_linhas(self, linhas: pd.DataFrame):
+        """Atualiza no lugar as linhas existentes (pela chave) e acrescenta as novas"""
+        if linhas is None or linhas.empty:
+            return
+        linhas = linhas.set_index(self.chave) if self.chave in linhas else linhas
+        linhas = linhas[~linhas.index.duplicated(keep="last")]
+
+        existentes = linhas.index.intersection(self.dados.index)
+        if len(existentes):
+            self.dados.loc[existentes, linhas.columns] = linhas.loc[existentes]
+        novas = linhas.loc[linhas.index.difference(self.dados.index, sort=False)]
+        if len(novas):
+            self.dados = pd.concat([self.dados, novas]) if len(self.dados) else novas.copy()
+
+        self._reordenar()
+        self._renderizar()
+
+    def limpar(self):
+        if self._dados is None:
+            return
+        self.set_dados(self._dados.iloc[0:0])
@@ -0,0 +1,79 @@
+import queue
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, List, Optional
+from core.metrics import PERFILADOR
+
+POLL_MS = 30  # Intervalo com que o loop do Tk drena os resultados prontos
+
+
+class BackgroundWorker:
+    """Executa tarefas fora do loop do Tk e entrega os resultados na thread da interface
+
+    Cada busca abre uma nova "geração": tarefas de gerações antigas são canceladas
+    (se ainda não começaram) e seus resultados são descartados ao chegar.
+    """
+
+    def __init__(self, widget, max_workers: int = 4):
+        self.widget = widget
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="albion-worker")
+        self.geracao = 0
+        self._pendentes: List[Future] = []
+        self._resultados: "queue.Queue" = queue.Queue()
+        self._agendar()
+
+    def _agendar(self):
+        self.widget.after(POLL_MS, self._drenar)
+
+    def _drenar(self):
+        """Roda na thread do Tk: entrega os resultados prontos da geração atual"""
+        try:
+            while True:
+                geracao, callback, valor = self._resultados.get_nowait()
+                if geracao in (None, self.geracao) and callback is not None:
+                    try:
+                        callback(valor)
+                    except Exception as e:
+                        print(f"⚠️ Erro ao atualizar a interface: {str(e)}")
+        except queue.Empty:
+            pass
+        self._agendar()
+
+    def nova_geracao(self) -> int:
+        """Cancela o trabalho em andamento e inicia uma nova geração"""
+        self.geracao += 1
+        for future in self._pendentes:
+            future.cancel()
+        self._pendentes = []
+        return self.geracao
+
+    def submit(self, fn: Callable, *args, on_result: Optional[Callable] = None,
+               on_error: Optional[Callable] = None, persistente: bool = False, **kwargs) -> Future:
+        """Agenda `fn` no pool; os callbacks rodam depois na thread do Tk
+
+        Tarefas persistentes (ex: carga do catálogo) não pertencem a nenhuma
+        geração e não são canceladas por nova_geracao().
+        """
+        geracao = None if persistente else self.geracao
+
+        def tarefa():
+            if geracao is not None and geracao != self.geracao:
+                return
+            try:
+                # Sem sessão de perfil aberta, capturar() não faz nada
+                with PERFILADOR.capturar():
+                    valor = fn(*args, **kwargs)
+            except Exception as e:
+                self._resultados.put((geracao, on_error, e))
+            else:
+                self._resultados.put((geracao, on_result, valor))
+
+        future = self.executor.submit(tarefa)
+        if persistente:
+            return future
+        self._pendentes = [f for f in self._pendentes if not f.done()]
+        self._pendentes.append(future)
+        return future
+
+    def shutdown(self):
+        self.nova_geracao()
+        self.executor.shutdown(wait=False, cancel_futures=True)
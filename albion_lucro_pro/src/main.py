@@ -1,7 +1,9 @@
 from dotenv import load_dotenv
 from core.api import AlbionPriceAPI
-from core.database import AlbionDatabase
-from core.tradutor import Tradutor
+from core.cache import PriceCache
+from core.historico import PriceWarehouse
+from core.database import ItemDatabase
+from core.metrics import METRICAS, ServidorMetricas
 from gui.app import AlbionLucroApp
 
 def setup_environment():
@@ -11,18 +13,35 @@ def setup_environment():
     import os
     os.makedirs("./data", exist_ok=True)
 
+def setup_metricas():
+    """Exporta as métricas se configurado no .env
+
+    ALBION_METRICS_PORT: endpoint local /metrics (Prometheus) e /metrics.json
+    ALBION_METRICS_JSON: arquivo JSON gravado ao fechar o aplicativo
+    """
+    import os
+    import atexit
+    porta = os.getenv("ALBION_METRICS_PORT")
+    if porta:
+        servidor = ServidorMetricas(METRICAS, int(porta))
+        print(f"📊 Métricas em {servidor.url}")
+    destino = os.getenv("ALBION_METRICS_JSON")
+    if destino:
+        atexit.register(METRICAS.salvar_json, destino)
+
 def main():
     try:
         # Configuração inicial
         setup_environment()
+        setup_metricas()
         
         # Inicializa serviços
-        db = AlbionDatabase()
-        api = AlbionPriceAPI()
-        tradutor = Tradutor(db)
+        db = ItemDatabase()
+        cache = PriceCache(persist_path="./data/precos_cache.pkl", stale_while_revalidate=True)
+        api = AlbionPriceAPI(cache=cache, warehouse=PriceWarehouse("./data/warehouse"))
         
-        # Inicia a aplicação
-        app = AlbionLucroApp(api, db, tradutor)
+        # Inicia a aplicação; catálogo e índice de busca carregam com a janela já aberta
+        app = AlbionLucroApp(api, db)
         app.mainloop()
         
     except Exception as e: